@@ -0,0 +1,588 @@
+import argparse
+import math
+import time
+import tracemalloc
+import numpy as np
+from navigation_system import NavigationSystem
+from topological_mapping import HybridMap
+from greedy_algorithm import GreedyBestFirst
+from incremental_planner import DStarLite
+
+# Performans ölçümleri - her ölçüm sabit bir tohum (seed) ile tekrarlanabilir
+# Kullanım: python benchmark.py [ölçüm_adı ...]
+
+
+def lawnmower_path(width, height, lane_spacing, step):
+    # Alanı şeritler halinde tarayan robot yolu (x, y) noktaları üretir
+    y = lane_spacing / 2
+    direction = 1
+    while y < height:
+        xs = np.arange(0.5, width - 0.5, step)
+        for x in (xs if direction > 0 else xs[::-1]):
+            yield float(x), float(y)
+        y += lane_spacing
+        direction = -direction
+
+
+def benchmark_node_lookup(checkpoints=(1000, 10000, 100000), window=2000, seed=0):
+    # Görev uzadıkça update_position + plan_path benzeri sorguların adım süresi
+    # Adım süresinin node sayısından bağımsız (düz) kalması beklenir
+    rng = np.random.default_rng(seed)
+    side = math.ceil(math.sqrt(max(checkpoints) * 1.3)) + 4
+    nav = NavigationSystem(side, side, resolution=1.0)
+    goal = (side - 1.0, side - 1.0)
+    nav.set_goal(*goal)
+    results = []
+    pending = list(checkpoints)
+    timings = []
+    for x, y in lawnmower_path(side, side, lane_spacing=1.1, step=0.35):
+        x += rng.uniform(-0.05, 0.05)
+        y += rng.uniform(-0.05, 0.05)
+        start = time.perf_counter()
+        nav.update_position(x, y, 0.0)
+        # plan_path'in başlangıç ve hedef sorguları
+        nav.hybrid_map.find_nearest_node(x, y)
+        nav.hybrid_map.find_nearest_node(*goal)
+        timings.append(time.perf_counter() - start)
+        if len(nav.hybrid_map.nodes) >= pending[0]:
+            recent = np.array(timings[-window:]) * 1e6
+            results.append({'nodes': len(nav.hybrid_map.nodes),
+                             'mean_us': float(recent.mean()),
+                             'p99_us': float(np.percentile(recent, 99))})
+            pending.pop(0)
+            if not pending:
+                break
+    for row in results:
+        print(f"node_lookup  nodes={row['nodes']:>7}  ortalama={row['mean_us']:.1f}us  p99={row['p99_us']:.1f}us")
+    return results
+
+
+def build_roadmap(num_nodes, seed=0, wall_fraction=0.25):
+    # Yaklaşık num_nodes nodeli, duvar parçalarıyla delinmiş titreşimli kafes grafı
+    # Nodeler 1m aralıklıdır; add_node 2m içindeki komşuları otomatik bağlar
+    rng = np.random.default_rng(seed)
+    side = int(math.ceil(math.sqrt(num_nodes / (1 - wall_fraction))))
+    blocked = np.zeros((side, side), dtype=bool)
+    # Rastgele yatay/dikey duvar parçaları (ortasında geçit bırakılarak)
+    while blocked.mean() < wall_fraction:
+        row, col = rng.integers(0, side, 2)
+        length = int(rng.integers(side // 8 + 2, side // 2 + 3))
+        if rng.random() < 0.5:
+            blocked[row, col:col + length] = True
+        else:
+            blocked[row:row + length, col] = True
+        blocked[row, col] = False
+    blocked[0, 0] = blocked[-1, -1] = False
+    hybrid_map = HybridMap(side, side, resolution=float(side))
+    for row in range(side):
+        for col in range(side):
+            if not blocked[row, col]:
+                jitter = rng.uniform(-0.15, 0.15, 2)
+                hybrid_map.add_node(col + jitter[0], row + jitter[1])
+    return hybrid_map
+
+
+def benchmark_planner_modes(sizes=(1000, 10000, 100000), queries=5, seed=0):
+    # Her arama modu için açılan düğüm sayısı, süre ve yol maliyeti
+    # 1M node için: benchmark_planner_modes(sizes=(1_000_000,))
+    rng = np.random.default_rng(seed)
+    results = []
+    for size in sizes:
+        hybrid_map = build_roadmap(size, seed)
+        planner = GreedyBestFirst(hybrid_map)
+        node_ids = np.array(list(hybrid_map.nodes))
+        pairs = [tuple(rng.choice(node_ids, 2, replace=False)) for _ in range(queries)]
+        for mode in GreedyBestFirst.MODES:
+            expansions, seconds, cost = 0, 0.0, 0.0
+            for start_id, goal_id in pairs:
+                begin = time.perf_counter()
+                path = planner.find_path(int(start_id), int(goal_id), mode=mode)
+                seconds += time.perf_counter() - begin
+                expansions += planner.last_expansions
+                if path:
+                    cost += sum(planner.heuristic(a, b) for a, b in zip(path, path[1:]))
+            row = {'nodes': len(hybrid_map.nodes), 'mode': mode,
+                   'expansions': expansions / queries, 'ms': seconds / queries * 1e3,
+                   'path_cost': cost / queries}
+            results.append(row)
+            print(f"planner  nodes={row['nodes']:>7}  mod={mode:<14}  açılan={row['expansions']:>9.0f}  "
+                  f"süre={row['ms']:8.2f}ms  yol={row['path_cost']:8.1f}m")
+    return results
+
+
+def benchmark_replanning(size=50000, change_sizes=(1, 4, 16, 64), seed=0):
+    # Robotun önündeki kenarlar engellendiğinde D* Lite onarımı ile A*'ın sıfırdan
+    # planlamasının karşılaştırması; onarım maliyeti değişiklik boyutuyla ölçeklenmeli
+    rng = np.random.default_rng(seed)
+    hybrid_map = build_roadmap(size, seed)
+    astar = GreedyBestFirst(hybrid_map, mode='astar')
+    node_ids = [int(node_id) for node_id in hybrid_map.nodes]
+    while True:
+        start_id, goal_id = (int(v) for v in rng.choice(node_ids, 2, replace=False))
+        path = astar.find_path(start_id, goal_id)
+        if path and len(path) > 2 * max(change_sizes):
+            break
+    results = []
+    for changes in change_sizes:
+        planner = DStarLite(hybrid_map)
+        path = planner.find_path(start_id, goal_id)
+        # Sensörler sadece robotun çevresini gördüğü için engeller yolun başındaki
+        # kenarlarda ortaya çıkar: ilk 2 * changes kenardan 'changes' tanesini engelle
+        picks = rng.choice(min(len(path) - 1, 2 * changes), changes, replace=False)
+        for index in picks:
+            planner.block_edge(path[index], path[index + 1])
+        begin = time.perf_counter()
+        planner.find_path(start_id, goal_id)
+        repair_ms = (time.perf_counter() - begin) * 1e3
+        begin = time.perf_counter()
+        astar.find_path(start_id, goal_id)
+        scratch_ms = (time.perf_counter() - begin) * 1e3
+        row = {'changes': changes, 'dstar_expansions': planner.last_expansions, 'dstar_ms': repair_ms,
+               'astar_expansions': astar.last_expansions, 'astar_ms': scratch_ms}
+        results.append(row)
+        print(f"replan  değişiklik={changes:>3}  D*Lite açılan={row['dstar_expansions']:>7} ({repair_ms:7.2f}ms)  "
+              f"A* açılan={row['astar_expansions']:>7} ({scratch_ms:7.2f}ms)")
+        # Sonraki ölçüm için engelleri kaldır
+        for node1_id, node2_id in list(hybrid_map.blocked_edges):
+            hybrid_map.set_edge_blocked(node1_id, node2_id, False)
+        hybrid_map.listeners.remove(planner)
+    return results
+
+
+def benchmark_graph_memory(sizes=(10000, 100000), seed=0):
+    # Yol haritasının kurulum süresi ve belleği: toplam (tracemalloc, uzamsal indeks dahil)
+    # ve GraphStore dizileri (node ve kenar başına bayt); ayrıca sıkıştırılmış komşuluk
+    # (CSR) dışa aktarım süresi
+    results = []
+    for size in sizes:
+        tracemalloc.start()
+        begin = time.perf_counter()
+        hybrid_map = build_roadmap(size, seed)
+        build_s = time.perf_counter() - begin
+        traced, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        graph = hybrid_map.graph
+        report = graph.memory_report()
+        begin = time.perf_counter()
+        graph.csr()
+        csr_ms = (time.perf_counter() - begin) * 1e3
+        row = {'nodes': report['nodes'], 'edges': report['edges'], 'build_s': build_s,
+               'total_mb': traced / 1e6, 'total_bytes_per_node': traced / max(report['nodes'], 1),
+               'csr_ms': csr_ms, 'report': report}
+        results.append(row)
+        print(f"graph_memory  nodes={row['nodes']:>7}  kenar={row['edges']:>8}  kurulum={build_s:6.2f}s  "
+              f"toplam={row['total_mb']:7.1f}MB ({row['total_bytes_per_node']:5.0f}B/node)  "
+              f"graf: node={report['bytes_per_node']:4.1f}B  kenar={report['bytes_per_edge']:4.1f}B  "
+              f"csr={csr_ms:6.1f}ms")
+    return results
+
+
+def benchmark_path_tree(size=50000, goals=3, steps=60, block_every=10, seed=0):
+    # Sabit hedefe robot ilerlerken her adımda yeniden sorgulama: sıfırdan arama (greedy, A*)
+    # ile hedef başına önbelleklenmiş en kısa yol ağacı; her block_every adımda robotun
+    # önündeki bir kenar engellenir (ağaçta sadece ilgili alt ağaç onarılır). Hedefler
+    # sırayla dönüşümlü sorgulanır (LRU önbellekte birden fazla ağaç)
+    from path_tree_cache import PathTreeCache
+    rng = np.random.default_rng(seed)
+    hybrid_map = build_roadmap(size, seed)
+    astar = GreedyBestFirst(hybrid_map, mode='astar')
+    node_ids = [int(node_id) for node_id in hybrid_map.nodes]
+    missions = []
+    while len(missions) < goals:
+        start_id, goal_id = (int(v) for v in rng.choice(node_ids, 2, replace=False))
+        path = astar.find_path(start_id, goal_id)
+        if path and len(path) > steps + 2:
+            missions.append(path)
+
+    planners = {'greedy': GreedyBestFirst(hybrid_map), 'astar': astar,
+                'path_tree': PathTreeCache(hybrid_map, capacity=goals)}
+    totals = {name: [0.0, 0] for name in planners}
+    for step in range(steps):
+        for path in missions:
+            start_id, goal_id = path[step], path[-1]
+            if step and step % block_every == 0:
+                hybrid_map.set_edge_blocked(path[step + 1], path[step + 2], True)
+            for name, planner in planners.items():
+                begin = time.perf_counter()
+                planner.find_path(start_id, goal_id)
+                totals[name][0] += time.perf_counter() - begin
+                totals[name][1] += planner.last_expansions
+    for node1_id, node2_id in list(hybrid_map.blocked_edges):
+        hybrid_map.set_edge_blocked(node1_id, node2_id, False)
+
+    queries = steps * goals
+    results = []
+    for name, (seconds, expansions) in totals.items():
+        row = {'nodes': len(hybrid_map.nodes), 'planner': name, 'ms': seconds / queries * 1e3,
+               'expansions': expansions / queries}
+        results.append(row)
+        print(f"path_tree  nodes={row['nodes']:>7}  planlayıcı={name:<10}  "
+              f"sorgu başına={row['ms']:8.3f}ms  açılan={row['expansions']:>9.1f}")
+    stats = planners['path_tree'].stats()
+    print(f"path_tree  önbellek: {stats['queries']} sorgu, {stats['hits']} isabet, "
+          f"{stats['builds']} kurulum, geçersizleşen node={stats['invalidated']}")
+    return results
+
+
+def benchmark_fleet(size=50000, robots=8, fires=64, worker_counts=(0, 1, 2, 4), seed=0):
+    # Robot x yangın maliyet matrisi (FleetPlanner): seri ve süreç havuzlu çözüm süresi,
+    # saniyede çözülen çift ve anlık görüntünün paylaşılan belleğe yazılma süresi
+    # Havuz başlatma süresi ölçüme dahil değildir; ölçeklenme çekirdek sayısıyla sınırlıdır
+    import os
+    from fleet_planner import FleetPlanner
+    rng = np.random.default_rng(seed)
+    hybrid_map = build_roadmap(size, seed)
+    node_ids = np.array(list(hybrid_map.nodes))
+    start_ids = rng.choice(node_ids, robots, replace=False).tolist()
+    goal_ids = rng.choice(node_ids, fires, replace=False).tolist()
+    results = []
+    for workers in worker_counts:
+        begin = time.perf_counter()
+        planner = FleetPlanner(hybrid_map, workers=workers)
+        setup_ms = (time.perf_counter() - begin) * 1e3
+        with planner:
+            costs, _ = planner.cost_matrix(start_ids, goal_ids)
+        row = {'nodes': len(hybrid_map.nodes), 'workers': workers, 'cpus': os.cpu_count(),
+               'seconds': planner.last_seconds, 'pairs_per_second': costs.size / planner.last_seconds,
+               'expansions': planner.last_expansions, 'setup_ms': setup_ms,
+               'reachable': int(np.isfinite(costs).sum())}
+        results.append(row)
+        print(f"fleet  nodes={row['nodes']:>7}  işçi={workers}  (çekirdek={row['cpus']})  "
+              f"{robots}x{fires} matris={row['seconds']:6.2f}s  çift/s={row['pairs_per_second']:7.0f}  "
+              f"açılan={row['expansions']:>8}  kurulum={setup_ms:7.1f}ms  erişilebilir={row['reachable']}")
+    return results
+
+
+def benchmark_grid_storage(side=200.0, resolution=0.1, ticks=200, beams=360, seed=0):
+    # Depolama türlerinin tarama+bozunma süresi ve bellek kullanımı
+    # Robot haritanın küçük bir bölgesinde dolaşır (büyük sahaların tipik durumu)
+    from occupancy_grid import OccupancyGrid
+    configs = [('probability', None), ('log_odds', None),
+               ('tiled', {'cell_type': 'float32'}), ('tiled', {'cell_type': 'int16'}),
+               ('tiled', {'cell_type': 'uint8'})]
+    angles = np.linspace(0, 2 * math.pi, beams, endpoint=False)
+    results = []
+    for storage, options in configs:
+        rng = np.random.default_rng(seed)
+        grid = OccupancyGrid(side, side, resolution, storage, options)
+        timings = []
+        for tick in range(ticks):
+            position = (side / 2 + 10 * math.cos(tick / 30), side / 2 + 10 * math.sin(tick / 30))
+            distances = rng.uniform(0.5, 4.5, beams)
+            begin = time.perf_counter()
+            grid.update_from_sensor_data(position, (angles, distances))
+            grid.apply_time_decay()
+            timings.append(time.perf_counter() - begin)
+        report = grid.memory_report()
+        name = storage + (f"/{options['cell_type']}" if options else '')
+        row = {'storage': name, 'ms': float(np.mean(timings) * 1e3),
+               'mb': report['reserved_bytes'] / 1e6, 'report': report}
+        results.append(row)
+        detail = ''
+        if 'bytes_per_tile' in report:
+            detail = f"  döşeme={report['allocated_tiles']}x{report['bytes_per_tile']}B"
+        print(f"grid_storage  {name:<16}  adım={row['ms']:6.2f}ms  bellek={row['mb']:8.2f}MB{detail}")
+    return results
+
+
+def benchmark_navigation_loop(ticks=400, memory_ticks=50, seed=0):
+    # Simülasyonda tam navigasyon döngüsü: aşama başına gecikme yüzdelikleri,
+    # saniyede adım ve bellek (tracemalloc tepe değeri, ayrı kısa bir çalıştırmada)
+    # Temel yapılandırmadan her seferinde tek bir parametre değiştirilir
+    from simulation import build_world, Simulation
+    base = {'size': 30.0, 'resolution': 0.1, 'sensors': 36, 'nodes': 800, 'robot_radius': None,
+            'pyramid': False}
+    sweeps = [('size', (20.0, 40.0, 80.0)), ('resolution', (0.2, 0.05)),
+              ('sensors', (8, 360)), ('nodes', (300, 3200)), ('robot_radius', (0.2,)),
+              ('pyramid', (True,))]
+    configs = [dict(base)]
+    for key, values in sweeps:
+        configs.extend(dict(base, **{key: value}) for value in values)
+
+    def make(config):
+        world = build_world('mixed', config['size'], config['size'], seed=seed)
+        return Simulation(world, num_sensors=config['sensors'], num_nodes=config['nodes'],
+                          resolution=config['resolution'], seed=seed,
+                          robot_radius=config['robot_radius'], pyramid=config['pyramid'])
+
+    results = []
+    for config in configs:
+        summary = make(config).run(ticks)
+        tracemalloc.start()
+        make(config).run(memory_ticks)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        stages = summary['stages']
+        row = dict(config, ticks_per_second=summary['ticks_per_second'],
+                   tick_p99_ms=summary['tick_p99_ms'], peak_mb=peak / 1e6,
+                   stages={stage: stats['p99_ms'] for stage, stats in stages.items()})
+        results.append(row)
+        print(f"navigation  boyut={config['size']:>4.0f}m  çözünürlük={config['resolution']:<5}  "
+              f"sensör={config['sensors']:>4}  node={config['nodes']:>5}  yarıçap={config['robot_radius']}  "
+              f"piramit={config['pyramid']:d}  "
+              f"adım/s={row['ticks_per_second']:7.0f}  p99={row['tick_p99_ms']:6.2f}ms  "
+              f"bellek={row['peak_mb']:7.1f}MB  "
+              + '  '.join(f"{stage}={p99:.2f}" for stage, p99 in row['stages'].items()))
+    return results
+
+
+def benchmark_segment_checks(side=200.0, resolution=0.1, walls=40, counts=(1, 100, 5000),
+                             lengths=(2.0, 20.0, 100.0), seed=0):
+    # Çoğu boş haritada segment engel kontrolü: hücre örneklemesi (segment_footprint ile
+    # aynı, 10cm adımlarla; tüm segmentlerin örnekleri tek vektörel okumayla, path_footprint
+    # gibi) ve doluluk piramidi (kabadan inceye) karşılaştırması. Piramit muhafazakârdır:
+    # 'yanlış_boş' örneklemenin dolu bulduğu ama piramidin boş dediği segment sayısıdır (0
+    # olmalı); uyumsuzluklar hücre köşesine yakın geçip örneklemenin atladığı segmentlerdir
+    from occupancy_grid import OccupancyGrid
+    rng = np.random.default_rng(seed)
+    grid = OccupancyGrid(side, side, resolution)
+    for _ in range(walls):
+        x, y = rng.uniform(0, side - 10, 2)
+        xs = x + np.arange(0, 10, resolution / 2)
+        grid.update_cells(xs, np.full(xs.size, y), True, 0.95)
+    pyramid = grid.enable_pyramid()
+
+    def sampled_free(x0, y0, x1, y1, chunk=1 << 20):
+        steps = (np.hypot(x1 - x0, y1 - y0) / 0.1).astype(np.int64) + 1
+        free = np.ones(x0.size, dtype=bool)
+        # Bellek sınırı için segmentler en fazla ~chunk örnekli gruplar halinde
+        group = max(1, chunk // int(steps.max()))
+        for begin in range(0, x0.size, group):
+            end = min(begin + group, x0.size)
+            counts = steps[begin:end]
+            segment = np.repeat(np.arange(begin, end), counts)
+            starts = np.cumsum(counts) - counts
+            ratios = (np.arange(segment.size) - np.repeat(starts, counts)) / steps[segment]
+            cells = grid.world_to_flat(x0[segment] + ratios * (x1[segment] - x0[segment]),
+                                       y0[segment] + ratios * (y1[segment] - y0[segment]))
+            free[begin:end] = ~np.logical_or.reduceat(grid.occupied_cells(cells), starts)
+        return free
+
+    results = []
+    for count in counts:
+        for length in lengths:
+            x0, y0 = rng.uniform(0, side, (2, count))
+            angle = rng.uniform(0, 2 * math.pi, count)
+            x1 = np.clip(x0 + length * np.cos(angle), 0, side - 1e-6)
+            y1 = np.clip(y0 + length * np.sin(angle), 0, side - 1e-6)
+            begin = time.perf_counter()
+            expected = sampled_free(x0, y0, x1, y1)
+            sampled_ms = (time.perf_counter() - begin) * 1e3
+            begin = time.perf_counter()
+            free = pyramid.segments_free(x0, y0, x1, y1)
+            pyramid_ms = (time.perf_counter() - begin) * 1e3
+            agreement = float((free == expected).mean())
+            false_free = int((free & ~expected).sum())
+            results.append({'count': count, 'length': length, 'sampled_ms': sampled_ms,
+                            'pyramid_ms': pyramid_ms, 'agreement': agreement, 'false_free': false_free})
+            print(f"segment_checks  segment={count:>5}  uzunluk={length:>5.0f}m  "
+                  f"örnekleme={sampled_ms:8.2f}ms  piramit={pyramid_ms:7.2f}ms  "
+                  f"uyum={agreement:.4f}  yanlış_boş={false_free}")
+    return results
+
+
+def benchmark_ray_tables(scans=200, sensor_counts=(36, 360, 1440), subdivisions=4, seed=0):
+    # Tarama başına ışın izleme süresi: kesin izleme ile önceden hesaplanmış ışın tabloları;
+    # tablo kurulum süresi ve belleği, iki yöntemin ürettiği hücre güncellemelerinin örtüşmesi
+    from occupancy_grid import OccupancyGrid
+    from ray_tables import RayTable
+    rng = np.random.default_rng(seed)
+    results = []
+    for num_sensors in sensor_counts:
+        angles = np.linspace(-math.pi, math.pi, num_sensors, endpoint=False)
+        poses = rng.uniform(5.0, 25.0, (scans, 2))
+        distances = np.where(rng.random((scans, num_sensors)) < 0.1, np.nan,
+                             rng.uniform(0.2, 4.5, (scans, num_sensors)))
+        grid = OccupancyGrid(30.0, 30.0, 0.1)
+
+        def trace_all():
+            begin = time.perf_counter()
+            traced = [grid.trace_scans([(pose, (angles, scan))]) for pose, scan in zip(poses, distances)]
+            return traced, (time.perf_counter() - begin) / scans * 1e3
+
+        exact, exact_ms = trace_all()
+        begin = time.perf_counter()
+        table = RayTable(angles, grid.resolution, subdivisions=subdivisions)
+        build_ms = (time.perf_counter() - begin) * 1e3
+        grid.ray_table = table
+        tabled, table_ms = trace_all()
+        same = total = 0
+        for (cells_a, delta_a, _), (cells_b, delta_b, _) in zip(exact, tabled):
+            updates_a = set(zip(cells_a.tolist(), delta_a.tolist()))
+            updates_b = set(zip(cells_b.tolist(), delta_b.tolist()))
+            same += len(updates_a & updates_b)
+            total += len(updates_a | updates_b)
+        row = {'sensors': num_sensors, 'exact_ms': exact_ms, 'table_ms': table_ms, 'build_ms': build_ms,
+               'table_mb': table.memory_bytes() / 1e6, 'agreement': same / max(total, 1)}
+        results.append(row)
+        print(f"ray_tables  sensör={num_sensors:>5}  kesin={exact_ms:6.3f}ms  tablo={table_ms:6.3f}ms  "
+              f"kurulum={build_ms:6.1f}ms  bellek={row['table_mb']:5.1f}MB  örtüşme={row['agreement']:.3f}")
+    return results
+
+
+def benchmark_sensor_pipeline(scans=600, sensor_counts=(36, 360, 1440), seed=0):
+    # Sensörler haritalamadan hızlı yayın yaptığında taramaları işleme hızı:
+    # senkron update_sensor_data ile arka plan hattı (kuyruk + tarama birleştirme)
+    from simulation import build_world
+    from sensor_pipeline import SensorPipeline
+    world = build_world('mixed', 30.0, 30.0, seed=seed)
+    poses = world.random_free_positions(scans)
+    results = []
+    for num_sensors in sensor_counts:
+        angles = np.linspace(-math.pi, math.pi, num_sensors, endpoint=False)
+        readings = [world.cast_rays(x, y, angles, 4.0, 0.02) for x, y in poses]
+
+        nav = NavigationSystem(30.0, 30.0, num_sensors=num_sensors)
+        begin = time.perf_counter()
+        for (x, y), scan in zip(poses, readings):
+            nav.current_position = (float(x), float(y))
+            nav.update_sensor_data(scan)
+        sync_seconds = time.perf_counter() - begin
+
+        nav = NavigationSystem(30.0, 30.0, num_sensors=num_sensors)
+        pipeline = SensorPipeline(nav)
+        pipeline.start()
+        begin = time.perf_counter()
+        for (x, y), scan in zip(poses, readings):
+            pipeline.submit(scan, (x, y))
+        pipeline.flush()
+        async_seconds = time.perf_counter() - begin
+        pipeline.stop()
+        stats = pipeline.stats()
+        row = {'sensors': num_sensors, 'sync_scans_per_second': scans / sync_seconds,
+               'async_scans_per_second': scans / async_seconds, 'mean_batch': stats['mean_batch'],
+               'max_latency_ms': stats['max_latency_ms']}
+        results.append(row)
+        print(f"sensor_pipeline  sensör={num_sensors:>5}  senkron={row['sync_scans_per_second']:7.0f} tarama/s  "
+              f"hat={row['async_scans_per_second']:7.0f} tarama/s  ortalama parti={row['mean_batch']:.2f}  "
+              f"en uzun gecikme={row['max_latency_ms']:.1f}ms")
+    return results
+
+
+def benchmark_roadmap(ticks=1500, nodes=800, seeds=(0, 1, 2, 3), radii=(None, 0.2)):
+    # Rastgele yerleştirilmiş nodeler ile otomatik yol haritasının (roadmap_builder.py)
+    # karşılaştırması: yeniden planlama ve geçersiz yol sayıları, planlama + tazeleme süresi, ulaşılan hedef
+    # ve saniyede adım (her yapılandırma aynı tohumlarla)
+    from simulation import build_world, Simulation
+    from instrumentation import Instrumentation
+    results = []
+    for robot_radius in radii:
+        for roadmap in (False, True):
+            row = {'robot_radius': robot_radius, 'roadmap': roadmap, 'replans': 0, 'invalid_paths': 0,
+                   'plan_ms': 0.0, 'refresh_ms': 0.0, 'goals': 0, 'elapsed_s': 0.0}
+            for seed in seeds:
+                world = build_world('mixed', 30.0, 30.0, seed=seed)
+                instrumentation = Instrumentation()
+                simulation = Simulation(world, num_nodes=nodes, seed=seed, robot_radius=robot_radius,
+                                        roadmap=roadmap, instrumentation=instrumentation)
+                begin = time.perf_counter()
+                summary = simulation.run(ticks)
+                row['elapsed_s'] += time.perf_counter() - begin
+                snapshot = instrumentation.snapshot()
+                row['replans'] += snapshot['counters'].get('nav.replans', 0)
+                row['invalid_paths'] += snapshot['counters'].get('nav.invalid_paths', 0)
+                for key, name in (('plan_ms', 'planner.find_path'), ('refresh_ms', 'roadmap.refresh')):
+                    timing = snapshot['timings_ms'].get(name, {})
+                    row[key] += timing.get('mean', 0.0) * timing.get('count', 0)
+                row['goals'] += summary['goals_reached']
+            row['ticks_per_second'] = ticks * len(seeds) / row['elapsed_s']
+            results.append(row)
+            print(f"roadmap  yarıçap={str(robot_radius):<4}  otomatik={roadmap:d}  "
+                  f"yeniden planlama={row['replans']:>4}  geçersiz yol={row['invalid_paths']:>4}  "
+                  f"planlama={row['plan_ms']:6.1f}ms  tazeleme={row['refresh_ms']:6.1f}ms  "
+                  f"hedef={row['goals']:>2}  adım/s={row['ticks_per_second']:6.0f}")
+    return results
+
+
+def benchmark_replay(ticks=2000, batches=(1, 4, 8), seed=0):
+    # Kaydedilmiş bir simülasyon görevinin (mission_log.py) gerçek zamandan bağımsız oynatılması:
+    # verim, kayda göre hızlanma ve kayıttaki yol / grid çıktılarından farklar
+    # batch=1 birebir tekrar (fark beklenmez), batch > 1 taramaları partilerle uygular
+    import os
+    import tempfile
+    from simulation import build_world, Simulation
+    from mission_log import MissionReplay
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'gorev.navlog')
+        world = build_world('mixed', 30.0, 30.0, seed=seed)
+        simulation = Simulation(world, num_nodes=800, seed=seed, record=path)
+        simulation.run(ticks)
+        simulation.close()
+        log_bytes = os.path.getsize(path)
+        for batch in batches:
+            summary = MissionReplay(path, batch=batch).run()
+            row = {'batch': batch, 'log_bytes': log_bytes, **{key: summary[key] for key in (
+                'navigations_per_second', 'speedup', 'path_checks', 'path_mismatches',
+                'grid_checks', 'grid_mismatches')}}
+            results.append(row)
+            print(f"replay  parti={batch}  kayıt={log_bytes / 1024:.0f}KiB  "
+                  f"adım/s={row['navigations_per_second']:6.0f}  hızlanma={row['speedup']:.1f}x  "
+                  f"yol farkı={row['path_mismatches']}/{row['path_checks']}  "
+                  f"grid farkı={row['grid_mismatches']}/{row['grid_checks']}")
+    return results
+
+
+def benchmark_moving_obstacles(ticks=1500, seeds=tuple(range(8)), worlds=('open', 'mixed', 'corridors'), movers=12):
+    # Hareketli engellerin grid'e işaretlenmesi ile tahmin katmanında izlenmesinin
+    # (obstacle_tracker.py) karşılaştırması: yeniden planlama, geçersiz yol, bekleme, çarpışma
+    # Hedef sayıları 1500 adımda küçük ve yörüngeye çok bağlı: az tohumla karşılaştırılmamalı
+    from simulation import build_world, Simulation
+    from instrumentation import Instrumentation
+    results = []
+    for world_kind in worlds:
+        for tracker in (False, True):
+            row = {'world': world_kind, 'tracker': tracker, 'replans': 0, 'invalid_paths': 0,
+                   'yields': 0, 'collisions': 0, 'goals': 0, 'tracker_ms': 0.0, 'elapsed_s': 0.0}
+            for seed in seeds:
+                instrumentation = Instrumentation()
+                world = build_world(world_kind, 30.0, 30.0, seed=seed, movers=movers)
+                simulation = Simulation(world, num_nodes=800, seed=seed, instrumentation=instrumentation,
+                                        tracker=tracker)
+                begin = time.perf_counter()
+                summary = simulation.run(ticks)
+                row['elapsed_s'] += time.perf_counter() - begin
+                snapshot = instrumentation.snapshot()
+                row['replans'] += snapshot['counters'].get('nav.replans', 0)
+                row['invalid_paths'] += snapshot['counters'].get('nav.invalid_paths', 0)
+                row['yields'] += snapshot['counters'].get('nav.yields', 0)
+                timing = snapshot['timings_ms'].get('tracker.update', {})
+                row['tracker_ms'] += timing.get('mean', 0.0) / len(seeds)
+                row['collisions'] += summary['collisions']
+                row['goals'] += summary['goals_reached']
+            row['ticks_per_second'] = ticks * len(seeds) / row['elapsed_s']
+            results.append(row)
+            print(f"moving_obstacles  dünya={world_kind:<9}  takipçi={tracker:d}  "
+                  f"yeniden planlama={row['replans']:>4}  geçersiz yol={row['invalid_paths']:>4}  "
+                  f"bekleme={row['yields']:>5}  çarpışma={row['collisions']:>3}  hedef={row['goals']:>2}  "
+                  f"takipçi={row['tracker_ms']:.3f}ms  adım/s={row['ticks_per_second']:6.0f}")
+    return results
+
+
+BENCHMARKS = {
+    'node_lookup': benchmark_node_lookup,
+    'planner': benchmark_planner_modes,
+    'replan': benchmark_replanning,
+    'graph_memory': benchmark_graph_memory,
+    'path_tree': benchmark_path_tree,
+    'fleet': benchmark_fleet,
+    'grid_storage': benchmark_grid_storage,
+    'navigation': benchmark_navigation_loop,
+    'segment_checks': benchmark_segment_checks,
+    'sensor_pipeline': benchmark_sensor_pipeline,
+    'ray_tables': benchmark_ray_tables,
+    'roadmap': benchmark_roadmap,
+    'replay': benchmark_replay,
+    'moving_obstacles': benchmark_moving_obstacles,
+}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Navigasyon performans ölçümleri')
+    parser.add_argument('names', nargs='*', help='Çalıştırılacak ölçümler (varsayılan: hepsi)')
+    args = parser.parse_args()
+    unknown = [name for name in args.names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Bilinmeyen ölçüm: {', '.join(unknown)} (seçenekler: {', '.join(BENCHMARKS)})")
+    for name in args.names or BENCHMARKS:
+        BENCHMARKS[name]()
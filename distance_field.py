@@ -0,0 +1,155 @@
+import numpy as np
+
+
+# Artımlı güncellenen engel mesafe alanı (dinamik brushfire, Lau vd.)
+# Her hücre için en yakın dolu hücre ve ona olan Öklid mesafesi tutulur.
+# Grid'in doluluk eşiği geçişleri (OccupancyGrid.add_change_listener) ile:
+#   - yeni dolu hücrelerden bir "alçalma" (lower) dalgası yayılır,
+#   - boşalan hücrelere bağlı bölgeler bir "yükselme" (raise) dalgasıyla temizlenir
+#     ve sınırdaki geçerli hücrelerden yeniden doldurulur.
+# Dalgalar tek tek hücre yerine cephe (frontier) dizileri halinde vektörel işlenir.
+# Geçişler biriktirilir ve ilk sorguda tek seferde uygulanır (tarama ve bozunma
+# aynı adımda tek bir güncellemeye düşer). Yayılım max_distance ile sınırlıdır;
+# daha uzak hücreler 'inf' kalır.
+# Diziler bir hücrelik kenar payıyla tutulur: kenar hücrelerinin mesafesi 0 ve
+# engeli yok (-1) olduğu için dalgalar onlara hiç yayılmaz, sınır kontrolü gerekmez.
+# Not: alan yoğun dizilerle tutulur (hücre başına 9 bayt), döşemeli depolamada da.
+class DistanceField:
+    def __init__(self, occupancy_grid, max_distance=1.0):
+        self.grid = occupancy_grid
+        self.resolution = occupancy_grid.resolution
+        self.cells_x = occupancy_grid.cells_x
+        self.cells_y = occupancy_grid.cells_y
+        self.max_distance = max_distance
+        self.max_cells = max_distance / self.resolution
+
+        # Kenar paylı düzen: iç indeks = (y + 1) * stride + (x + 1)
+        self.stride = self.cells_x + 2
+        steps = [(dy, dx) for dy in (-1, 0, 1) for dx in (-1, 0, 1) if dy or dx]
+        self.offset_y = np.array([dy for dy, _ in steps])
+        self.offset_x = np.array([dx for _, dx in steps])
+        self.offsets = self.offset_y * self.stride + self.offset_x
+        padded = (self.cells_y + 2, self.stride)
+        self.distance = np.zeros(padded, dtype=np.float32)  # Hücre cinsinden mesafe
+        self.distance[1:-1, 1:-1] = np.inf
+        self.distance = self.distance.ravel()
+        self.nearest = np.full(self.distance.size, -1, dtype=np.int32)  # En yakın engel (iç indeks)
+        self.is_obstacle = np.zeros(self.distance.size, dtype=bool)
+
+        self._pending = []  # Henüz uygulanmamış geçiş yapan grid hücreleri
+
+        # Mevcut dolu hücrelerle başlat, sonra geçişleri dinle
+        occupied = np.flatnonzero(occupancy_grid.to_probability().ravel() >= occupancy_grid.occupied_threshold)
+        self.update(self._internal(occupied), np.empty(0, dtype=np.int64))
+        occupancy_grid.add_change_listener(self)
+
+    def _internal(self, flat_indices):
+        # Grid düz indeksini kenar paylı iç indekse çevir
+        grid_y, grid_x = np.divmod(np.asarray(flat_indices, dtype=np.int64), self.cells_x)
+        return (grid_y + 1) * self.stride + grid_x + 1
+
+    def on_cells_changed(self, became_occupied, became_free):
+        self._pending.append(became_occupied)
+        self._pending.append(became_free)
+
+    def flush(self):
+        # Biriken geçişleri uygula; son durum grid'den okunur (aynı partide
+        # dolup boşalan hücreler birbirini götürür)
+        if not self._pending:
+            return
+        cells = np.unique(np.concatenate(self._pending))
+        self._pending = []
+        occupied = self.grid.occupied_cells(cells)
+        internal = self._internal(cells)
+        self.update(internal[occupied], internal[~occupied])
+
+    def update(self, added, removed):
+        # Eklenen ve kaldırılan engel hücreleriyle (iç indeksler) alanı onar
+        added = added[~self.is_obstacle[added]]
+        removed = removed[self.is_obstacle[removed]]
+        if not added.size and not removed.size:
+            return
+        self.is_obstacle[added] = True
+        self.is_obstacle[removed] = False
+        self.distance[added] = 0.0
+        self.nearest[added] = added
+        seeds = [added]
+
+        # Yükselme dalgası: kaldırılan engellere bağlı hücreleri temizle
+        if removed.size:
+            self.distance[removed] = np.inf
+            self.nearest[removed] = -1
+            frontier = removed
+            while frontier.size:
+                neighbors = np.unique((frontier[:, None] + self.offsets).ravel())
+                reference = self.nearest[neighbors]
+                known = reference >= 0
+                invalid = known & ~self.is_obstacle[reference]
+                # Geçerli bir engele bağlı sınır hücreleri alçalma dalgasını başlatır
+                seeds.append(neighbors[known & ~invalid])
+                frontier = neighbors[invalid]
+                self.distance[frontier] = np.inf
+                self.nearest[frontier] = -1
+
+        # Alçalma dalgası: engellerden mesafeyi yay, sadece iyileşen hücreler devam eder
+        frontier = np.unique(np.concatenate(seeds))
+        while frontier.size:
+            nearest = self.nearest[frontier]
+            neighbors = (frontier[:, None] + self.offsets).ravel()
+            obstacles = np.repeat(nearest, self.offsets.size)
+            # Komşunun engele uzaklığı = cephe hücresinin engele göre konumu + komşu ofseti
+            # (saklanan tiple aynı yuvarlama, aksi halde aynı değer sürekli 'iyileşir')
+            frontier_y, frontier_x = np.divmod(frontier, self.stride)
+            nearest_y, nearest_x = np.divmod(nearest, self.stride)
+            dy = (frontier_y - nearest_y)[:, None] + self.offset_y
+            dx = (frontier_x - nearest_x)[:, None] + self.offset_x
+            distances = np.sqrt(dy * dy + dx * dx).astype(np.float32).ravel()
+            better = (distances < self.distance[neighbors]) & (distances <= self.max_cells)
+            neighbors, obstacles, distances = neighbors[better], obstacles[better], distances[better]
+            # Aynı komşuya birden fazla öneri: en kısa olan kazanır (eşitlikte herhangi biri)
+            np.minimum.at(self.distance, neighbors, distances)
+            won = self.distance[neighbors] == distances
+            self.nearest[neighbors[won]] = obstacles[won]
+            frontier = np.unique(neighbors[won])
+
+    def clearance_cells(self, flat_indices):
+        # Düz indeksli grid hücrelerinin en yakın engele mesafesi (metre, max_distance ile sınırlı)
+        self.flush()
+        return np.minimum(self.distance[self._internal(flat_indices)] * self.resolution, self.max_distance)
+
+    def clearance(self, x, y):
+        # Dünya koordinatındaki noktanın en yakın engele mesafesi (metre) - tek okuma
+        self.flush()
+        grid_x = min(max(int(x / self.resolution), 0), self.cells_x - 1)
+        grid_y = min(max(int(y / self.resolution), 0), self.cells_y - 1)
+        distance = float(self.distance[(grid_y + 1) * self.stride + grid_x + 1])
+        return min(distance * self.resolution, self.max_distance)
+
+    def segments_clear(self, x0, y0, x1, y1, radius=0.0):
+        # Doğru parçalarının tamamı robot yarıçapından daha açık mı (küre izleme)
+        # Bir noktanın açıklığı c ise c - yarıçap kadar ilerisi de güvenlidir;
+        # bu yüzden engellerden uzak parçalar birkaç okumayla kontrol edilir.
+        # Tüm parçalar aynı anda (vektörel) ilerletilir.
+        self.flush()
+        x0, y0, x1, y1 = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (x0, y0, x1, y1))
+        length = np.hypot(x1 - x0, y1 - y0)
+        safe_length = np.where(length > 0, length, 1.0)
+        t = np.zeros(length.shape)
+        clear = np.ones(length.shape, dtype=bool)
+        active = np.arange(length.size)
+        res = self.resolution
+        while active.size:
+            ratio = t[active] / safe_length[active]
+            xs = x0[active] + ratio * (x1[active] - x0[active])
+            ys = y0[active] + ratio * (y1[active] - y0[active])
+            grid_x = np.clip((xs / res).astype(np.int64), 0, self.cells_x - 1)
+            grid_y = np.clip((ys / res).astype(np.int64), 0, self.cells_y - 1)
+            c = np.minimum(self.distance[(grid_y + 1) * self.stride + grid_x + 1] * res, self.max_distance)
+            blocked = c <= radius
+            clear[active[blocked]] = False
+            # Hücre çözünürlüğü payı bırakarak ilerle (en az bir hücre)
+            step = np.maximum(c - radius - res, res)
+            finished = blocked | (t[active] >= length[active])
+            t[active] = np.minimum(t[active] + step, length[active])
+            active = active[~finished]
+        return clear
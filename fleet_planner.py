@@ -0,0 +1,230 @@
+import heapq
+import multiprocessing
+import os
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+INF = float('inf')
+
+# Paylaşılan bellekteki graf dizileri: ad -> (dtype, memoryview biçimi)
+_SNAPSHOT_ARRAYS = {'offsets': (np.int64, 'q'), 'targets': (np.int32, 'i'),
+                    'lengths': (np.float64, 'd'), 'usable': (np.uint8, 'B')}
+
+# İşçi sürecindeki (veya seri çalışmada bu süreçteki) bağlı anlık görüntü
+_attached = {}
+
+
+# HybridMap grafının salt okunur anlık görüntüsü (paylaşılan bellek)
+# CSR komşuluk (offsets, targets, lengths) ve kenar başına kullanılabilirlik bayrağı
+# (engelli kenar / node değil) ayrı SharedMemory bloklarına bir kez yazılır; işçilere
+# sadece blok adları (descriptor) gönderilir, diziler kopyalanmaz veya pickle edilmez.
+# Engeller grafın kenar bayraklarında zaten yansıdığı için grid paylaşılmaz.
+class GraphSnapshot:
+    def __init__(self, hybrid_map):
+        graph = hybrid_map.graph
+        offsets, targets, lengths = graph.csr()
+        sources = np.repeat(np.arange(graph.num_nodes), np.diff(offsets))
+        usable = np.ones(targets.size, dtype=np.uint8)
+        if hybrid_map.blocked_nodes:
+            blocked_nodes = np.fromiter(hybrid_map.blocked_nodes, dtype=np.int64)
+            usable[np.isin(sources, blocked_nodes) | np.isin(targets, blocked_nodes)] = 0
+        if hybrid_map.blocked_edges:
+            # Engelli kenarlar (küçük ID, büyük ID) anahtarlarıyla, iki yön birden
+            keys = np.minimum(sources, targets) * graph.num_nodes + np.maximum(sources, targets)
+            blocked_keys = np.array([node1_id * graph.num_nodes + node2_id
+                                     for node1_id, node2_id in hybrid_map.blocked_edges], dtype=np.int64)
+            usable[np.isin(keys, blocked_keys)] = 0
+
+        self.num_nodes = graph.num_nodes
+        self.blocks = {}
+        self.descriptor = {}
+        for name, values in (('offsets', offsets), ('targets', targets), ('lengths', lengths),
+                             ('usable', usable)):
+            dtype, _ = _SNAPSHOT_ARRAYS[name]
+            values = np.ascontiguousarray(values, dtype=dtype)
+            # Boş dizi için de geçerli bir blok (SharedMemory sıfır boyut kabul etmez)
+            block = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            np.ndarray(values.shape, dtype=dtype, buffer=block.buf)[:] = values
+            self.blocks[name] = block
+            self.descriptor[name] = (block.name, values.size)
+
+    def close(self):
+        # Blokları serbest bırak (işçiler kapatıldıktan sonra çağrılmalı)
+        _detach()
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+
+def _attach(descriptor):
+    # Anlık görüntü bloklarına bağlan; diziler memoryview olarak (tek eleman erişimi
+    # Python sayısı döndürür, arama döngüsü numpy skalerlerinden hızlıdır)
+    _detach()
+    for name, (block_name, size) in descriptor.items():
+        block = shared_memory.SharedMemory(name=block_name)
+        _, view_format = _SNAPSHOT_ARRAYS[name]
+        itemsize = np.dtype(_SNAPSHOT_ARRAYS[name][0]).itemsize
+        _attached[name] = block.buf[:size * itemsize].cast(view_format)
+        _attached[name + '_block'] = block
+
+
+def _detach():
+    for name in _SNAPSHOT_ARRAYS:
+        view = _attached.pop(name, None)
+        if view is not None:
+            view.release()
+            _attached.pop(name + '_block').close()
+
+
+def _solve_goal(task):
+    # Hedeften geriye Dijkstra: görevin tüm başlangıçları kesinleşince durur
+    # Dönüş: (hedef, başlangıç başına maliyet, başlangıç başına yol veya None, açılan)
+    goal_id, start_ids = task
+    offsets, targets = _attached['offsets'], _attached['targets']
+    lengths, usable = _attached['lengths'], _attached['usable']
+    dist = {goal_id: 0.0}
+    parent = {}
+    settled = set()
+    remaining = set(start_ids)
+    heap = [(0.0, goal_id)]
+    expansions = 0
+    while heap and remaining:
+        cost, node_id = heapq.heappop(heap)
+        if node_id in settled:
+            continue
+        settled.add(node_id)
+        remaining.discard(node_id)
+        expansions += 1
+        for k in range(offsets[node_id], offsets[node_id + 1]):
+            if not usable[k]:
+                continue
+            neighbor_id = targets[k]
+            candidate = cost + lengths[k]
+            if candidate < dist.get(neighbor_id, INF):
+                dist[neighbor_id] = candidate
+                parent[neighbor_id] = node_id
+                heapq.heappush(heap, (candidate, neighbor_id))
+
+    costs, paths = [], []
+    for start_id in start_ids:
+        if start_id not in settled:
+            costs.append(INF)
+            paths.append(None)
+            continue
+        path = [start_id]
+        while path[-1] != goal_id:
+            path.append(parent[path[-1]])
+        costs.append(dist[start_id])
+        paths.append(path)
+    return goal_id, costs, paths, expansions
+
+
+# Çok robotlu / çok hedefli toplu planlama (süreç havuzu)
+# Birçok (başlangıç, hedef) çifti HybridMap'in salt okunur anlık görüntüsü üzerinde
+# paralel çözülür. Çiftler hedefe göre gruplanır: her hedef için tek bir geriye Dijkstra
+# o hedefe giden tüm başlangıçların maliyetini ve yolunu verir (robot x yangın maliyet
+# matrisi min(robot, yangın) aramayla). Yollar en kısa yoldur.
+# workers=0: havuz açılmaz, aynı süreçte seri çözülür. Harita değiştiyse update_snapshot().
+# Kullanım:
+#   with FleetPlanner(hybrid_map) as planner:
+#       costs, paths = planner.cost_matrix(robot_node_ids, fire_node_ids)
+class FleetPlanner:
+    def __init__(self, hybrid_map, workers=None):
+        self.map = hybrid_map
+        self.workers = os.cpu_count() if workers is None else workers
+        if self.workers < 0:
+            raise ValueError("İşçi sayısı negatif olamaz")
+        self.snapshot = None
+        self.pool = None
+
+        # Son çağrının istatistikleri
+        self.last_expansions = 0
+        self.last_seconds = 0.0
+        self.update_snapshot()
+
+    def update_snapshot(self):
+        # Haritanın güncel durumunu yeni bir anlık görüntüye al (havuz yeniden başlatılır)
+        self.close()
+        self.snapshot = GraphSnapshot(self.map)
+        if self.workers:
+            self.pool = multiprocessing.Pool(self.workers, initializer=_attach,
+                                             initargs=(self.snapshot.descriptor,))
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.close()
+            self.pool.join()
+            self.pool = None
+        if self.snapshot is not None:
+            self.snapshot.close()
+            self.snapshot = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def plan_pairs(self, pairs):
+        # (başlangıç, hedef) node ID çiftleri için [(maliyet, yol veya None), ...] (aynı sırayla)
+        pairs = [(int(start_id), int(goal_id)) for start_id, goal_id in pairs]
+        by_goal = {}
+        for start_id, goal_id in pairs:
+            by_goal.setdefault(goal_id, []).append(start_id)
+        solved = self._solve({goal_id: list(dict.fromkeys(start_ids))
+                              for goal_id, start_ids in by_goal.items()})
+        return [solved[start_id, goal_id] for start_id, goal_id in pairs]
+
+    def cost_matrix(self, start_ids, goal_ids):
+        # (len(start_ids), len(goal_ids)) maliyet matrisi (erişilemeyen: inf) ve
+        # paths[i][j]: start_ids[i] -> goal_ids[j] yolu (veya None)
+        start_ids = [int(start_id) for start_id in start_ids]
+        goal_ids = [int(goal_id) for goal_id in goal_ids]
+        unique_starts = list(dict.fromkeys(start_ids))
+        unique_goals = list(dict.fromkeys(goal_ids))
+        # Kenarlar iki yönlü ve simetrik: başlangıçlar daha azsa aramalar başlangıçlardan
+        # yapılır (arama sayısı min(robot, yangın)), yollar ters çevrilir
+        reverse = len(unique_starts) < len(unique_goals)
+        if reverse:
+            solved = self._solve({start_id: unique_goals for start_id in unique_starts})
+        else:
+            solved = self._solve({goal_id: unique_starts for goal_id in unique_goals})
+        costs = np.full((len(start_ids), len(goal_ids)), INF)
+        paths = [[None] * len(goal_ids) for _ in start_ids]
+        for i, start_id in enumerate(start_ids):
+            for j, goal_id in enumerate(goal_ids):
+                if reverse:
+                    cost, path = solved[goal_id, start_id]
+                    path = path[::-1] if path is not None else None
+                else:
+                    cost, path = solved[start_id, goal_id]
+                costs[i, j], paths[i][j] = cost, path
+        return costs, paths
+
+    def _solve(self, tasks):
+        # Hedef başına görevleri çöz: (başlangıç, hedef) -> (maliyet, yol)
+        if self.snapshot is None:
+            raise ValueError("Planlayıcı kapatıldı")
+        for node_id in (*tasks, *(start_id for start_ids in tasks.values() for start_id in start_ids)):
+            if not 0 <= node_id < self.snapshot.num_nodes:
+                raise ValueError(f"Geçersiz node ID: {node_id}")
+        begin = time.perf_counter()
+        items = list(tasks.items())
+        if self.pool is None:
+            _attach(self.snapshot.descriptor)  # Seri: bu süreçte (başka planlayıcı bağlı olabilir)
+            results = map(_solve_goal, items)
+        else:
+            # Görevler işçilere küçük parçalar halinde dağıtılır (yük dengesi)
+            chunksize = max(1, len(items) // (4 * self.workers))
+            results = self.pool.imap_unordered(_solve_goal, items, chunksize)
+        solved = {}
+        expansions = 0
+        for goal_id, costs, paths, goal_expansions in results:
+            expansions += goal_expansions
+            for start_id, cost, path in zip(tasks[goal_id], costs, paths):
+                solved[start_id, goal_id] = (cost, path)
+        self.last_expansions = expansions
+        self.last_seconds = time.perf_counter() - begin
+        return solved
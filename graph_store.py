@@ -0,0 +1,225 @@
+import math
+import operator
+from array import array
+from collections.abc import Mapping
+import numpy as np
+
+
+# Topolojik graf için dizi tabanlı depolama
+# Node koordinatları düz float64 dizilerinde, komşuluk tek bir kenar havuzunda tutulur.
+# Her node havuzda kendine ait bir blok (başlangıç, kapasite) kullanır; blok dolunca
+# iki katı kapasiteyle havuzun sonuna taşınır (amortize O(1) ekleme). Taşınan blokların
+# boş bıraktığı yer, havuz büyümeden önce sıkıştırılarak geri kazanılır.
+# Kenar uzunlukları eklemede bir kez hesaplanır ve saklanır.
+# Node ID'leri 0'dan başlayan ardışık tam sayılardır (node silinmez).
+# Diziler array.array'dir: tek eleman erişimi Python sayısı döndürür (arama döngüleri
+# numpy skalerlerinden hızlıdır) ve bellek düzeni numpy ile aynıdır (np.frombuffer).
+# Node i'nin komşuları: targets[edge_start[i]:edge_start[i] + degree[i]] (ekleme sırasıyla)
+# Vektörel işlemler ve kayıt için csr() sıkıştırılmış komşuluk (CSR) kopyası döndürür.
+class GraphStore:
+    def __init__(self):
+        self.num_nodes = 0
+        self.num_arcs = 0  # Yönlü kenar sayısı (her bağlantı iki yönlüdür)
+        self.version = 0   # Graf her değiştiğinde artar (önbellek geçersizleştirme)
+
+        # Node dizileri
+        self.xs = array('d')
+        self.ys = array('d')
+        self.edge_start = array('q')  # Bloğun havuzdaki başı
+        self.degree = array('i')      # Bloktaki kenar sayısı
+        self.block_size = array('i')  # Bloğun kapasitesi
+
+        # Kenar havuzu
+        self.targets = array('i')
+        self.lengths = array('d')
+        self.pool_garbage = 0  # Taşınan blokların boş bıraktığı yer
+
+        self._csr = None
+        self._csr_version = -1
+
+    @property
+    def num_edges(self):
+        return self.num_arcs // 2
+
+    def add_node(self, x, y):
+        # Yeni node ekle, ID'sini döndür
+        self.xs.append(x)
+        self.ys.append(y)
+        self.edge_start.append(0)
+        self.degree.append(0)
+        self.block_size.append(0)
+        self.num_nodes += 1
+        self.version += 1
+        return self.num_nodes - 1
+
+    def has_arc(self, node1_id, node2_id):
+        start = self.edge_start[node1_id]
+        return node2_id in self.targets[start:start + self.degree[node1_id]]
+
+    def add_arc(self, node1_id, node2_id, length, check=True):
+        # node1 -> node2 yönlü kenarı ekle; zaten varsa False
+        if check and self.has_arc(node1_id, node2_id):
+            return False
+        degree = self.degree[node1_id]
+        if degree == self.block_size[node1_id]:
+            self._move_block(node1_id, max(8, 2 * degree))
+        position = self.edge_start[node1_id] + degree
+        self.targets[position] = node2_id
+        self.lengths[position] = length
+        self.degree[node1_id] = degree + 1
+        self.num_arcs += 1
+        self.version += 1
+        return True
+
+    def add_edge(self, node1_id, node2_id, length=None, check=True):
+        # İki yönlü bağlantı ekle (uzunluk verilmezse koordinatlardan); yeni ise True
+        if length is None:
+            length = math.sqrt((self.xs[node1_id] - self.xs[node2_id])**2 +
+                               (self.ys[node1_id] - self.ys[node2_id])**2)
+        added = self.add_arc(node1_id, node2_id, length, check)
+        return self.add_arc(node2_id, node1_id, length, check) or added
+
+    def _move_block(self, node_id, capacity):
+        # Node'un bloğunu havuzun sonunda daha büyük bir yere taşı
+        if self.pool_garbage * 2 > len(self.targets):
+            self._compact()
+        old_start, degree = self.edge_start[node_id], self.degree[node_id]
+        new_start = len(self.targets)
+        self.targets.extend(self.targets[old_start:old_start + degree])
+        self.lengths.extend(self.lengths[old_start:old_start + degree])
+        self.targets.frombytes(bytes(self.targets.itemsize * (capacity - degree)))
+        self.lengths.frombytes(bytes(self.lengths.itemsize * (capacity - degree)))
+        self.pool_garbage += self.block_size[node_id]
+        self.edge_start[node_id] = new_start
+        self.block_size[node_id] = capacity
+
+    def _gather(self):
+        # Blokların dolu kısımlarının havuzdaki indeksleri (node sırasıyla) ve sahipleri
+        edge_start = np.frombuffer(self.edge_start, dtype=np.int64)
+        degree = np.frombuffer(self.degree, dtype=np.int32).astype(np.int64)
+        owner = np.repeat(np.arange(self.num_nodes), degree)
+        offset = np.arange(owner.size) - np.repeat(np.cumsum(degree) - degree, degree)
+        return edge_start[owner] + offset, owner, offset
+
+    def _compact(self):
+        # Taşınan blokların bıraktığı boşlukları kapat (blok kapasiteleri korunur)
+        sizes = np.frombuffer(self.block_size, dtype=np.int32).astype(np.int64)
+        new_start = np.zeros(self.num_nodes, dtype=np.int64)
+        np.cumsum(sizes[:-1], out=new_start[1:])
+        source, owner, offset = self._gather()
+        destination = new_start[owner] + offset
+        targets = np.zeros(int(sizes.sum()), dtype=np.int32)
+        lengths = np.zeros(targets.size)
+        targets[destination] = np.frombuffer(self.targets, dtype=np.int32)[source]
+        lengths[destination] = np.frombuffer(self.lengths)[source]
+        self.targets = array('i', targets.tobytes())
+        self.lengths = array('d', lengths.tobytes())
+        self.edge_start = array('q', new_start.tobytes())
+        self.pool_garbage = 0
+
+    def neighbors(self, node_id):
+        # Node'un komşu ID'leri ve kenar uzunlukları (kopya)
+        start = self.edge_start[node_id]
+        end = start + self.degree[node_id]
+        return self.targets[start:end], self.lengths[start:end]
+
+    def csr(self):
+        # (offsets, targets, lengths) sıkıştırılmış komşuluk numpy dizileri (kopya)
+        # node i'nin komşuları targets[offsets[i]:offsets[i + 1]]; ekleme sırası korunur
+        if self._csr_version != self.version:
+            offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(np.frombuffer(self.degree, dtype=np.int32), out=offsets[1:])
+            source, _, _ = self._gather()
+            self._csr = (offsets, np.frombuffer(self.targets, dtype=np.int32)[source],
+                         np.frombuffer(self.lengths)[source])
+            self._csr_version = self.version
+        return self._csr
+
+    def coordinates(self):
+        # Node koordinatları (N, 2) numpy dizisi olarak (kopya)
+        return np.column_stack((np.frombuffer(self.xs), np.frombuffer(self.ys)))
+
+    @classmethod
+    def from_csr(cls, xs, ys, offsets, targets, lengths):
+        # CSR dizilerinden graf kur (ör. diskten yüklenen harita); her blok tam dolu başlar
+        store = cls()
+        offsets = np.asarray(offsets, dtype=np.int64)
+        degree = np.diff(offsets).astype(np.int32)
+        store.xs = array('d', np.asarray(xs, dtype=np.float64).tobytes())
+        store.ys = array('d', np.asarray(ys, dtype=np.float64).tobytes())
+        store.edge_start = array('q', offsets[:-1].tobytes())
+        store.degree = array('i', degree.tobytes())
+        store.block_size = array('i', degree.tobytes())
+        store.targets = array('i', np.asarray(targets, dtype=np.int32).tobytes())
+        store.lengths = array('d', np.asarray(lengths, dtype=np.float64).tobytes())
+        store.num_nodes = len(store.xs)
+        store.num_arcs = len(store.targets)
+        return store
+
+    def memory_report(self):
+        # Ayrılmış bellek (bayt): node dizileri, kenar havuzu ve havuzdaki boş yer
+        node_bytes = sum(len(values) * values.itemsize for values in
+                         (self.xs, self.ys, self.edge_start, self.degree, self.block_size))
+        edge_bytes = sum(len(values) * values.itemsize for values in (self.targets, self.lengths))
+        return {'nodes': self.num_nodes, 'edges': self.num_edges,
+                'node_bytes': node_bytes, 'edge_bytes': edge_bytes,
+                'bytes_per_node': node_bytes / max(self.num_nodes, 1),
+                'bytes_per_edge': edge_bytes / max(self.num_edges, 1),
+                'pool_slots': len(self.targets), 'pool_garbage': self.pool_garbage}
+
+
+# Topolojik haritalama için node (Niijima vd. [14]): tek bir node'un GraphStore üzerindeki
+# hafif görünümü (x, y, connections, add_connection, get_connections)
+class NodeView:
+    __slots__ = ('store', 'id')
+
+    def __init__(self, store, node_id):
+        self.store = store
+        self.id = node_id
+
+    @property
+    def x(self):
+        return self.store.xs[self.id]
+
+    @property
+    def y(self):
+        return self.store.ys[self.id]
+
+    @property
+    def connections(self):
+        # Bağlantılı node ID'leri ve aralarındaki mesafeler
+        return list(zip(*self.store.neighbors(self.id)))
+
+    @property
+    def connected_ids(self):
+        return set(self.store.neighbors(self.id)[0])
+
+    def add_connection(self, target_id, distance):
+        # Başka bir node'a (tek yönlü) bağlantı ekle; bağlantı zaten varsa eklenmez
+        self.store.add_arc(self.id, target_id, distance)
+
+    def get_connections(self):
+        return self.connections
+
+
+# HybridMap.nodes için salt okunur sözlük arayüzü: node ID -> NodeView
+class NodeMapping(Mapping):
+    def __init__(self, store):
+        self.store = store
+
+    def __getitem__(self, node_id):
+        if node_id not in self:
+            raise KeyError(node_id)
+        return NodeView(self.store, operator.index(node_id))
+
+    def __contains__(self, node_id):
+        try:
+            return 0 <= operator.index(node_id) < self.store.num_nodes
+        except TypeError:
+            return False
+
+    def __len__(self):
+        return self.store.num_nodes
+
+    def __iter__(self):
+        return iter(range(self.store.num_nodes))
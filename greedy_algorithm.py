@@ -1,70 +1,154 @@
 import math
+import time
+import heapq
 
 # Greedy Best-First Search algoritması
 # Ateşin konumunu bildiğimiz için hedefe direkt yönelme yaklaşımı daha uygun
+# Aynı sınıf A* ve ağırlıklı A* modlarını da destekler:
+#   'greedy'         : f = h          (en hızlı, yol kalitesi garantisiz)
+#   'astar'          : f = g + h      (en kısa yol)
+#   'weighted_astar' : f = g + w * h  (yol maliyeti en fazla w kat en kısa yol)
 class GreedyBestFirst:
-    def __init__(self, hybrid_map):
+    MODES = ('greedy', 'astar', 'weighted_astar')
+
+    def __init__(self, hybrid_map, mode='greedy', weight=1.5):
         self.map = hybrid_map
-    
+        if mode not in self.MODES:
+            raise ValueError(f"Bilinmeyen arama modu: {mode}")
+        self.mode = mode
+        self.weight = weight  # Ağırlıklı A* için alt-optimallik sınırı (w >= 1)
+
+        # Hedef başına sezgisel değer önbelleği (node koordinatları değişmez)
+        self._h_goal = None
+        self._h_cache = {}
+
+        # Son aramanın istatistikleri
+        self.last_expansions = 0
+        
+        # İsteğe bağlı ölçüm katmanı (bkz. instrumentation.py)
+        self.instrumentation = None
+
     # Düz çizgi mesafesi hesaplama (Öklid)
     def heuristic(self, node_id, goal_id):
-        node = self.map.nodes[node_id]
-        goal = self.map.nodes[goal_id]
-        return math.sqrt((node.x - goal.x)**2 + (node.y - goal.y)**2)
+        graph = self.map.graph
+        return math.sqrt((graph.xs[node_id] - graph.xs[goal_id])**2 +
+                         (graph.ys[node_id] - graph.ys[goal_id])**2)
+
+    def _heuristic_table(self, goal_id):
+        # Hedef değiştiyse önbelleği sıfırla
+        if goal_id != self._h_goal:
+            self._h_goal = goal_id
+            self._h_cache = {}
+        return self._h_cache
+
+    # Seçilen modda öncelik kuyruğu ile yol bulma
+    def find_path(self, start_id, goal_id, mode=None, weight=None):
+        if self.instrumentation is None:
+            return self._search(start_id, goal_id, mode, weight)
+        begin = time.perf_counter()
+        path = self._search(start_id, goal_id, mode, weight)
+        self.instrumentation.record('planner.find_path', time.perf_counter() - begin)
+        self.instrumentation.count('planner.searches')
+        self.instrumentation.count('planner.expansions', self.last_expansions)
+        if path is None:
+            self.instrumentation.count('planner.failures')
+        return path
     
-    # Greedy Best-First Search kullanarak yol bulma
-    def find_path(self, start_id, goal_id):
+    def _search(self, start_id, goal_id, mode, weight):
         # Hata kontrolü
         if start_id not in self.map.nodes or goal_id not in self.map.nodes:
             print("Başlangıç veya hedef düğüm geçersiz")
+            self.last_expansions = 0
             return None
-        
+
+        mode = mode or self.mode
+        if mode not in self.MODES:
+            raise ValueError(f"Bilinmeyen arama modu: {mode}")
+        # Sezgisel ağırlığı ve g (yol maliyeti) katsayısı
+        if mode == 'greedy':
+            g_factor, h_weight = 0.0, 1.0
+        elif mode == 'astar':
+            g_factor, h_weight = 1.0, 1.0
+        else:
+            g_factor, h_weight = 1.0, self.weight if weight is None else weight
+
+        # Arama doğrudan graf dizileri üzerinde yapılır (bkz. GraphStore)
+        graph = self.map.graph
+        xs, ys = graph.xs, graph.ys
+        edge_start, degree = graph.edge_start, graph.degree
+        targets, lengths = graph.targets, graph.lengths
+        goal_x, goal_y = xs[goal_id], ys[goal_id]
+        h_cache = self._heuristic_table(goal_id)
+        # Engellenmiş kenar/node yoksa kontrol tamamen atlanır
+        has_blocked = bool(self.map.blocked_edges or self.map.blocked_nodes)
+        is_edge_blocked = self.map.is_edge_blocked
+
         # Veri yapılarını başlat
-        open_set = {start_id}  # Keşfedilecek düğümler
-        closed_set = set()     # Keşfedilmiş düğümler
+        # Açık küme bir min-heap: (f, sıra, düğüm); eskimiş kayıtlar çekilince atlanır
+        g_score = {start_id: 0.0}
         came_from = {}         # Geri izleme için
-        
-        # Greedy için sadece h değerini (hedefe uzaklık) tutuyoruz
-        h_score = {start_id: self.heuristic(start_id, goal_id)}
-        
+        closed_set = set()     # Keşfedilmiş düğümler
+        counter = 0            # Eşit f değerlerinde ekleme sırasını koru
+
+        h = h_cache.get(start_id)
+        if h is None:
+            h = math.sqrt((xs[start_id] - goal_x)**2 + (ys[start_id] - goal_y)**2)
+            h_cache[start_id] = h
+        open_heap = [(h_weight * h, counter, start_id)]
+        expansions = 0
+
         # Ana döngü
-        while open_set:
-            # En düşük h değerine sahip düğümü bul
-            current_id = min(open_set, key=lambda id: h_score.get(id, float('inf')))
-            
+        while open_heap:
+            # En düşük f değerine sahip düğümü al
+            _, _, current_id = heapq.heappop(open_heap)
+            if current_id in closed_set:
+                continue  # Tembel silme: daha iyi bir kaydı zaten işlendi
+
             # Hedefe ulaştık mı?
             if current_id == goal_id:
+                self.last_expansions = expansions
                 # Yolu oluştur
-                path = []
+                path = [current_id]
                 while current_id in came_from:
-                    path.append(current_id)
                     current_id = came_from[current_id]
-                path.append(start_id)
+                    path.append(current_id)
                 path.reverse()
                 return path
-            
+
             # Mevcut düğümü işlenmiş olarak işaretle
-            open_set.remove(current_id)
             closed_set.add(current_id)
-            
+            expansions += 1
+            current_g = g_score[current_id]
+
             # Tüm komşu düğümleri kontrol et
-            for neighbor_id, distance in self.map.nodes[current_id].get_connections():
-                # Zaten işlenmiş düğümü atla
+            first = edge_start[current_id]
+            for k in range(first, first + degree[current_id]):
+                neighbor_id = targets[k]
+                # Zaten işlenmiş düğümü ve engellenmiş kenarları atla
                 if neighbor_id in closed_set:
                     continue
-                
-                # Sadece hedefe olan uzaklığı hesapla
-                neighbor_h = self.heuristic(neighbor_id, goal_id)
-                
-                # Yeni düğüm veya daha iyi yol?
-                if neighbor_id not in open_set:
-                    open_set.add(neighbor_id)
-                    h_score[neighbor_id] = neighbor_h
-                    came_from[neighbor_id] = current_id
-                elif neighbor_h < h_score.get(neighbor_id, float('inf')):
-                    h_score[neighbor_id] = neighbor_h
-                    came_from[neighbor_id] = current_id
-        
+                if has_blocked and is_edge_blocked(current_id, neighbor_id):
+                    continue
+
+                tentative_g = current_g + lengths[k]
+                known_g = g_score.get(neighbor_id)
+                if known_g is not None and (g_factor == 0.0 or tentative_g >= known_g):
+                    continue  # Greedy: ilk keşif kalır; A*: daha iyi yol değil
+
+                g_score[neighbor_id] = tentative_g
+                came_from[neighbor_id] = current_id
+
+                # Hedefe olan uzaklık (önbellekten)
+                neighbor_h = h_cache.get(neighbor_id)
+                if neighbor_h is None:
+                    neighbor_h = math.sqrt((xs[neighbor_id] - goal_x)**2 + (ys[neighbor_id] - goal_y)**2)
+                    h_cache[neighbor_id] = neighbor_h
+
+                counter += 1
+                heapq.heappush(open_heap, (g_factor * tentative_g + h_weight * neighbor_h,
+                                           counter, neighbor_id))
+
         # Yol bulunamadı
+        self.last_expansions = expansions
         print("Başlangıçtan hedefe yol bulunamadı")
-        return None
\ No newline at end of file
+        return None
@@ -0,0 +1,338 @@
+import numpy as np
+
+# Occupancy grid hücre depolama arka uçları
+# OccupancyGrid tüm okuma/yazma işlemlerini bu sınıflar üzerinden yapar
+
+
+def _logit(p):
+    # Olasılığı log-odds değerine çevir (0 ve 1 için -inf/+inf)
+    with np.errstate(divide='ignore'):
+        return np.log(p) - np.log1p(-p)
+
+
+def _sigmoid(log_odds):
+    # Log-odds değerini olasılığa çevir
+    with np.errstate(over='ignore'):
+        return 1.0 / (1.0 + np.exp(-log_odds))
+
+
+# Yoğun olasılık dizisi - zaman bozunması her adımda tüm grid'e hemen uygulanır
+class DenseProbabilityStorage:
+    def __init__(self, cells_y, cells_x):
+        # Grid'i bilinmeyen olasılıklarla (0.5) başlat
+        self.grid = np.ones((cells_y, cells_x)) * 0.5
+
+    def read_cell(self, grid_y, grid_x):
+        # Tek bir hücrenin olasılığı
+        return self.grid[grid_y, grid_x]
+
+    def write_cell(self, grid_y, grid_x, p):
+        self.grid[grid_y, grid_x] = p
+
+    def read(self, flat_indices):
+        # Düz indekslerdeki hücrelerin olasılıkları
+        return self.grid.reshape(-1)[flat_indices]
+
+    def add_log_odds(self, cells, total):
+        # Benzersiz hücrelere log-odds artışlarını uygula, (eski, yeni) olasılıkları döndür
+        flat_grid = self.grid.reshape(-1)
+        p_old = flat_grid[cells]
+        p_new = _sigmoid(_logit(p_old) + total)
+        flat_grid[cells] = p_new
+        return p_old, p_new
+
+    def decay(self, decay_factor, steps=1):
+        # Olasılıkları belirsizliğe (0.5) doğru hareket ettir - tüm grid üzerinde
+        # Birden fazla adım tek geçişte: p - 0.5 değeri (1 - d)^adım ile ölçeklenir
+        if steps == 1:
+            self.grid += decay_factor * (0.5 - self.grid)
+        else:
+            self.grid += (1.0 - (1.0 - decay_factor) ** steps) * (0.5 - self.grid)
+
+    def to_probability(self):
+        return self.grid.copy()
+
+    def memory_report(self):
+        return {'storage': 'probability', 'reserved_bytes': self.grid.nbytes}
+
+    # Kalıcı kayıt (map_persistence.py) için ham diziler ve durum
+    def export_state(self):
+        return {}, {'grid': self.grid}
+
+    @classmethod
+    def from_state(cls, cells_y, cells_x, state, arrays):
+        storage = cls.__new__(cls)
+        storage.grid = arrays['grid']
+        return storage
+
+
+# Log-odds depolama - zaman bozunması tembel (lazy) uygulanır
+# Her hücre en son dokunulduğu adımı (tick) tutar; bozunma hücre okunurken veya
+# yazılırken hesaba katılır. k adım sonra p - 0.5 değeri (1 - d)^k ile ölçeklenir,
+# bu yüzden sonuç her adımda tüm grid'i güncelleyen yöntemle aynıdır.
+class LogOddsStorage:
+    def __init__(self, cells_y, cells_x):
+        self.log_odds = np.zeros((cells_y, cells_x))  # 0 log-odds = 0.5 olasılık
+        self.last_tick = np.zeros((cells_y, cells_x), dtype=np.int32)
+        self.tick = 0
+        self.retention = 1.0  # Adım başına korunan kesinlik oranı (1 - decay_factor)
+
+    def _decayed(self, log_odds, last_tick):
+        # Saklanan değere son dokunuştan bu yana geçen adımların bozunmasını uygula
+        p = _sigmoid(log_odds)
+        return 0.5 + self.retention ** (self.tick - last_tick) * (p - 0.5)
+
+    def read_cell(self, grid_y, grid_x):
+        return float(self._decayed(self.log_odds[grid_y, grid_x], self.last_tick[grid_y, grid_x]))
+
+    def write_cell(self, grid_y, grid_x, p):
+        self.log_odds[grid_y, grid_x] = _logit(p)
+        self.last_tick[grid_y, grid_x] = self.tick
+
+    def read(self, flat_indices):
+        return self._decayed(self.log_odds.reshape(-1)[flat_indices],
+                             self.last_tick.reshape(-1)[flat_indices])
+
+    def add_log_odds(self, cells, total):
+        # Önce bekleyen bozunmayı hücreye işle, ardından log-odds artışını ekle
+        p_old = self.read(cells)
+        new_log_odds = _logit(p_old) + total
+        self.log_odds.reshape(-1)[cells] = new_log_odds
+        self.last_tick.reshape(-1)[cells] = self.tick
+        return p_old, _sigmoid(new_log_odds)
+
+    def decay(self, decay_factor, steps=1):
+        # Sadece adım sayacını ilerlet - maliyet harita boyutundan bağımsız
+        retention = 1.0 - decay_factor
+        if retention != self.retention and self.tick > 0:
+            # Bozunma oranı değişti: bekleyen bozunmayı eski oranla tüm hücrelere işle
+            self.log_odds = _logit(self.to_probability())
+            self.last_tick[:] = self.tick
+        self.retention = retention
+        self.tick += steps
+
+    def to_probability(self):
+        # Tüm grid'in güncel (bozunması uygulanmış) olasılıkları
+        return self._decayed(self.log_odds, self.last_tick)
+
+    def memory_report(self):
+        return {'storage': 'log_odds', 'reserved_bytes': self.log_odds.nbytes + self.last_tick.nbytes}
+
+    def export_state(self):
+        return ({'tick': self.tick, 'retention': self.retention},
+                {'log_odds': self.log_odds, 'last_tick': self.last_tick})
+
+    @classmethod
+    def from_state(cls, cells_y, cells_x, state, arrays):
+        storage = cls.__new__(cls)
+        storage.log_odds = arrays['log_odds']
+        storage.last_tick = arrays['last_tick']
+        storage.tick = state['tick']
+        storage.retention = state['retention']
+        return storage
+
+
+# Döşemeli (tiled) seyrek log-odds depolama - büyük haritalar için
+# Grid tile_size x tile_size hücrelik döşemelere bölünür; bir döşeme ancak
+# ilk yazmada ayrılır, hiç yazılmamış döşemeler örtük olarak bilinmeyendir (0.5).
+# Ayrılan döşemeler tek bir havuz dizisinde satır olarak tutulur, böylece
+# okuma/yazma işlemleri döşeme başına Python döngüsü olmadan vektöreldir.
+# Hücre tipleri: 'float32' log-odds, 'int16' ve 'uint8' nicemlenmiş (quantized) log-odds.
+# Zaman bozunması LogOddsStorage gibi tembeldir; her hücre son yazıldığı adımı
+# döşemenin başlangıç adımına göre uint16 olarak saklar. Nicemleme sadece
+# yazmada yapılır, bu yüzden bozunma yuvarlama nedeniyle takılıp kalmaz.
+class TiledLogOddsStorage:
+    # Hücre tipi -> (numpy tipi, nicemleme adımı, sıfır log-odds kodu)
+    CELL_TYPES = {
+        'float32': (np.float32, None, 0),
+        'int16': (np.int16, 1.0 / 1024, 0),   # ±32 log-odds aralığı
+        'uint8': (np.uint8, 1.0 / 16, 128),   # ±8 log-odds aralığı (p ≈ 0.0003 - 0.9997)
+    }
+    MAX_TICK_OFFSET = np.iinfo(np.uint16).max
+
+    def __init__(self, cells_y, cells_x, tile_size=32, cell_type='float32'):
+        if cell_type not in self.CELL_TYPES:
+            raise ValueError(f"Bilinmeyen hücre tipi: {cell_type}")
+        self.cells_y = cells_y
+        self.cells_x = cells_x
+        self.tile_size = tile_size
+        self.cell_type = cell_type
+        self.dtype, self.step, self.zero_code = self.CELL_TYPES[cell_type]
+        self.tiles_y = -(-cells_y // tile_size)
+        self.tiles_x = -(-cells_x // tile_size)
+
+        # Döşeme tablosu: döşeme -> havuz satırı (-1 = ayrılmamış)
+        self.slot_of_tile = np.full((self.tiles_y, self.tiles_x), -1, dtype=np.int32)
+        self.tile_of_slot = np.empty(0, dtype=np.int64)  # Havuz satırı -> düz döşeme indeksi
+        self.num_tiles = 0
+
+        # Döşeme havuzu: her satır bir döşemenin hücre değerleri ve son yazma adımları
+        cells_per_tile = tile_size * tile_size
+        self.values = np.empty((0, cells_per_tile), dtype=self.dtype)
+        self.ticks = np.empty((0, cells_per_tile), dtype=np.uint16)
+        self.epochs = np.empty(0, dtype=np.int64)  # Döşeme başına adım başlangıcı
+
+        self.tick = 0
+        self.retention = 1.0  # Adım başına korunan kesinlik oranı (1 - decay_factor)
+
+    def _encode(self, log_odds):
+        # Log-odds değerini hücre tipine çevir (nicemlenmiş tiplerde kırpılır)
+        if self.step is None:
+            return np.asarray(log_odds, dtype=self.dtype)
+        info = np.iinfo(self.dtype)
+        codes = np.rint(np.nan_to_num(log_odds) / self.step) + self.zero_code
+        return np.clip(codes, info.min, info.max).astype(self.dtype)
+
+    def _decode(self, values):
+        if self.step is None:
+            return values.astype(float)
+        return (values.astype(float) - self.zero_code) * self.step
+
+    def _locate(self, flat_indices):
+        # Düz hücre indekslerini (döşeme satırı, döşeme içi indeks) çiftine çevir
+        grid_y, grid_x = np.divmod(np.asarray(flat_indices, dtype=np.int64), self.cells_x)
+        tile_y, local_y = np.divmod(grid_y, self.tile_size)
+        tile_x, local_x = np.divmod(grid_x, self.tile_size)
+        slots = self.slot_of_tile[tile_y, tile_x]
+        return slots, local_y * self.tile_size + local_x, tile_y * self.tiles_x + tile_x
+
+    def _allocate(self, tiles):
+        # Verilen (düz) döşemeler için havuzda yer ayır, havuz dolarsa iki katına büyüt
+        tiles = np.unique(tiles)
+        needed = self.num_tiles + tiles.size
+        if needed > self.values.shape[0]:
+            capacity = max(needed, 2 * self.values.shape[0], 16)
+            grow = capacity - self.values.shape[0]
+            cells_per_tile = self.values.shape[1]
+            self.values = np.concatenate(
+                [self.values, np.full((grow, cells_per_tile), self.zero_code, dtype=self.dtype)])
+            self.ticks = np.concatenate([self.ticks, np.zeros((grow, cells_per_tile), dtype=np.uint16)])
+            self.epochs = np.concatenate([self.epochs, np.zeros(grow, dtype=np.int64)])
+            self.tile_of_slot = np.concatenate([self.tile_of_slot, np.full(grow, -1, dtype=np.int64)])
+        new_slots = np.arange(self.num_tiles, needed, dtype=np.int32)
+        self.slot_of_tile.reshape(-1)[tiles] = new_slots
+        self.tile_of_slot[new_slots] = tiles
+        self.epochs[new_slots] = self.tick
+        self.num_tiles = needed
+
+    def _decayed(self, values, ticks, epochs):
+        # Saklanan değere son yazmadan bu yana geçen adımların bozunmasını uygula
+        p = _sigmoid(self._decode(values))
+        age = self.tick - (epochs + ticks)
+        return 0.5 + self.retention ** age * (p - 0.5)
+
+    def _rebase(self, slots):
+        # Adım farkı uint16'ya sığmayacaksa döşemeleri güncel adıma taşı (bozunmayı işle)
+        slots = np.unique(slots)
+        p = self._decayed(self.values[slots], self.ticks[slots], self.epochs[slots][:, None])
+        self.values[slots] = self._encode(_logit(p))
+        self.ticks[slots] = 0
+        self.epochs[slots] = self.tick
+
+    def read_cell(self, grid_y, grid_x):
+        slot = self.slot_of_tile[grid_y // self.tile_size, grid_x // self.tile_size]
+        if slot < 0:
+            return 0.5
+        local = (grid_y % self.tile_size) * self.tile_size + grid_x % self.tile_size
+        return float(self._decayed(self.values[slot, local], self.ticks[slot, local], self.epochs[slot]))
+
+    def read(self, flat_indices):
+        slots, local, _ = self._locate(flat_indices)
+        p = np.full(slots.shape, 0.5)
+        known = slots >= 0
+        if known.any():
+            known_slots, known_local = slots[known], local[known]
+            p[known] = self._decayed(self.values[known_slots, known_local],
+                                     self.ticks[known_slots, known_local], self.epochs[known_slots])
+        return p
+
+    def _store(self, flat_indices, log_odds):
+        # Log-odds değerlerini yaz (gerekirse döşeme ayır), saklanan değerin olasılığını döndür
+        slots, local, tiles = self._locate(flat_indices)
+        missing = slots < 0
+        if missing.any():
+            self._allocate(tiles[missing])
+            slots = self.slot_of_tile.reshape(-1)[tiles]
+        stale = self.tick - self.epochs[slots] > self.MAX_TICK_OFFSET
+        if stale.any():
+            self._rebase(slots[stale])
+        codes = self._encode(log_odds)
+        self.values[slots, local] = codes
+        self.ticks[slots, local] = self.tick - self.epochs[slots]
+        return _sigmoid(self._decode(codes))
+
+    def write_cell(self, grid_y, grid_x, p):
+        self._store(np.array([grid_y * self.cells_x + grid_x]), _logit(np.array([p])))
+
+    def add_log_odds(self, cells, total):
+        # Önce bekleyen bozunmayı hücreye işle, ardından log-odds artışını ekle
+        p_old = self.read(cells)
+        p_new = self._store(cells, _logit(p_old) + total)
+        return p_old, p_new
+
+    def decay(self, decay_factor, steps=1):
+        # Sadece adım sayacını ilerlet - maliyet harita boyutundan bağımsız
+        retention = 1.0 - decay_factor
+        if retention != self.retention and self.tick > 0 and self.num_tiles:
+            # Bozunma oranı değişti: bekleyen bozunmayı eski oranla tüm döşemelere işle
+            self._rebase(np.arange(self.num_tiles))
+        self.retention = retention
+        self.tick += steps
+
+    def to_probability(self):
+        # Tüm grid'in güncel olasılıkları (ayrılmamış döşemeler 0.5)
+        size = self.tile_size
+        dense = np.full((self.tiles_y, size, self.tiles_x, size), 0.5)
+        if self.num_tiles:
+            slots = np.arange(self.num_tiles)
+            p = self._decayed(self.values[slots], self.ticks[slots], self.epochs[slots][:, None])
+            tile_y, tile_x = np.divmod(self.tile_of_slot[slots], self.tiles_x)
+            dense[tile_y, :, tile_x, :] = p.reshape(-1, size, size)
+        return dense.reshape(self.tiles_y * size, self.tiles_x * size)[:self.cells_y, :self.cells_x]
+
+    def memory_report(self):
+        # Döşeme başına ve toplam bellek kullanımı (bayt)
+        cells_per_tile = self.tile_size * self.tile_size
+        bytes_per_tile = cells_per_tile * (np.dtype(self.dtype).itemsize + 2) + 8
+        return {
+            'storage': 'tiled',
+            'cell_type': self.cell_type,
+            'tile_size': self.tile_size,
+            'bytes_per_tile': bytes_per_tile,
+            'allocated_tiles': self.num_tiles,
+            'total_tiles': self.tiles_y * self.tiles_x,
+            'tile_bytes': self.num_tiles * bytes_per_tile,
+            'reserved_bytes': (self.values.nbytes + self.ticks.nbytes + self.epochs.nbytes +
+                               self.tile_of_slot.nbytes + self.slot_of_tile.nbytes),
+        }
+
+    def export_state(self):
+        # Sadece kullanılan havuz satırları kaydedilir
+        used = self.num_tiles
+        state = {'tile_size': self.tile_size, 'cell_type': self.cell_type,
+                 'tick': self.tick, 'retention': self.retention, 'num_tiles': used}
+        arrays = {'slot_of_tile': self.slot_of_tile, 'tile_of_slot': self.tile_of_slot[:used],
+                  'values': self.values[:used], 'ticks': self.ticks[:used], 'epochs': self.epochs[:used]}
+        return state, arrays
+
+    @classmethod
+    def from_state(cls, cells_y, cells_x, state, arrays):
+        storage = cls(0, 0, state['tile_size'], state['cell_type'])
+        storage.cells_y, storage.cells_x = cells_y, cells_x
+        storage.slot_of_tile = arrays['slot_of_tile']
+        storage.tiles_y, storage.tiles_x = storage.slot_of_tile.shape
+        storage.tile_of_slot = arrays['tile_of_slot']
+        storage.values = arrays['values']
+        storage.ticks = arrays['ticks']
+        storage.epochs = arrays['epochs']
+        storage.num_tiles = state['num_tiles']
+        storage.tick = state['tick']
+        storage.retention = state['retention']
+        return storage
+
+
+STORAGE_TYPES = {
+    'probability': DenseProbabilityStorage,
+    'log_odds': LogOddsStorage,
+    'tiled': TiledLogOddsStorage,
+}
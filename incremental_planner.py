@@ -0,0 +1,239 @@
+import math
+import time
+import heapq
+
+INF = float('inf')
+
+
+# D* Lite artımlı yol planlayıcı (Koenig ve Likhachev)
+# Arama hedeften geriye doğru yapılır ve durumu çağrılar arasında saklanır.
+# Robot hareket ettiğinde veya HybridMap'te kenarlar eklenip engellendiğinde
+# sadece değişiklikten etkilenen nodeler yeniden hesaplanır; böylece yeniden
+# planlama maliyeti harita boyutuyla değil, değişikliğin boyutuyla ölçeklenir.
+class DStarLite:
+    def __init__(self, hybrid_map):
+        self.map = hybrid_map
+        self.start_id = None
+        self.goal_id = None
+        self.last_start_id = None
+        self._start_x = self._start_y = 0.0
+        self.km = 0.0  # Başlangıç değiştikçe biriken anahtar düzeltmesi
+
+        self.g = {}    # Hedefe olan mevcut maliyet tahmini
+        self.rhs = {}  # Komşulara bakarak hesaplanan tek adımlık tahmin
+        self._heap = []     # (anahtar, node) - eskimiş kayıtlar çekilince atlanır
+        self._queued = {}   # Kuyruktaki nodelerin güncel anahtarları
+        self._changed_nodes = set()  # Bir sonraki planlamada güncellenecek nodeler
+
+        # Son planlamanın istatistikleri
+        self.last_expansions = 0
+        
+        # İsteğe bağlı ölçüm katmanı (bkz. instrumentation.py)
+        self.instrumentation = None
+
+        hybrid_map.add_listener(self)
+
+    # HybridMap dinleyici arayüzü: kenar eklendi, engellendi veya engeli kaldırıldı
+    def on_edges_changed(self, edges):
+        if self.goal_id is None:
+            return
+        for node1_id, node2_id in edges:
+            self._changed_nodes.add(node1_id)
+            self._changed_nodes.add(node2_id)
+
+    # Kenar engelleme bildirimleri - engel durumu HybridMap'te tutulur,
+    # böylece aynı haritayı kullanan diğer planlayıcılar da bundan haberdar olur
+    def block_edge(self, node1_id, node2_id):
+        return self.map.set_edge_blocked(node1_id, node2_id, True)
+
+    def unblock_edge(self, node1_id, node2_id):
+        return self.map.set_edge_blocked(node1_id, node2_id, False)
+
+    def block_node(self, node_id):
+        return self.map.set_node_blocked(node_id, True)
+
+    def unblock_node(self, node_id):
+        return self.map.set_node_blocked(node_id, False)
+
+    def heuristic(self, node1_id, node2_id):
+        graph = self.map.graph
+        return math.sqrt((graph.xs[node1_id] - graph.xs[node2_id])**2 +
+                         (graph.ys[node1_id] - graph.ys[node2_id])**2)
+
+    def _calculate_key(self, node_id):
+        value = min(self.g.get(node_id, INF), self.rhs.get(node_id, INF))
+        graph = self.map.graph
+        h = math.sqrt((graph.xs[node_id] - self._start_x)**2 + (graph.ys[node_id] - self._start_y)**2)
+        return (value + h + self.km, value)
+
+    def _push(self, node_id):
+        key = self._calculate_key(node_id)
+        self._queued[node_id] = key
+        heapq.heappush(self._heap, (key, node_id))
+
+    def _top(self):
+        # Kuyruğun başındaki güncel kayıt (eskimişler atılır)
+        while self._heap:
+            key, node_id = self._heap[0]
+            if self._queued.get(node_id) == key:
+                return key, node_id
+            heapq.heappop(self._heap)
+        return None
+
+    def _update_queue(self, node_id):
+        # Tutarsız nodeler kuyrukta, tutarlılar kuyruk dışında kalır
+        if self.g.get(node_id, INF) != self.rhs.get(node_id, INF):
+            self._push(node_id)
+        else:
+            self._queued.pop(node_id, None)
+
+    def _best_rhs(self, node_id):
+        # Komşular üzerinden en iyi tek adımlık maliyet
+        best = INF
+        edge_cost = self.map.edge_cost
+        g = self.g
+        graph = self.map.graph
+        targets, lengths = graph.targets, graph.lengths
+        first = graph.edge_start[node_id]
+        for k in range(first, first + graph.degree[node_id]):
+            neighbor_id = targets[k]
+            candidate = edge_cost(node_id, neighbor_id, lengths[k]) + g.get(neighbor_id, INF)
+            if candidate < best:
+                best = candidate
+        return best
+
+    def _update_vertex(self, node_id):
+        if node_id != self.goal_id:
+            self.rhs[node_id] = self._best_rhs(node_id)
+        self._update_queue(node_id)
+
+    def _compute_shortest_path(self):
+        expansions = 0
+        start_id = self.start_id
+        goal_id = self.goal_id
+        g, rhs = self.g, self.rhs
+        edge_cost = self.map.edge_cost
+        graph = self.map.graph
+        edge_start, degree = graph.edge_start, graph.degree
+        targets, lengths = graph.targets, graph.lengths
+        while True:
+            top = self._top()
+            if top is None:
+                break
+            key, node_id = top
+            if not (key < self._calculate_key(start_id) or
+                    rhs.get(start_id, INF) != g.get(start_id, INF)):
+                break
+            expansions += 1
+
+            new_key = self._calculate_key(node_id)
+            g_old = g.get(node_id, INF)
+            rhs_node = rhs.get(node_id, INF)
+            if key < new_key:
+                # Anahtar eskimiş (başlangıç hareket etti) - yeniden sırala
+                self._push(node_id)
+            elif g_old > rhs_node:
+                # Maliyet azaldı: tutarlı hale getir, komşuların rhs'ini sadece düşür
+                g[node_id] = rhs_node
+                self._queued.pop(node_id, None)
+                first = edge_start[node_id]
+                for k in range(first, first + degree[node_id]):
+                    neighbor_id = targets[k]
+                    if neighbor_id == goal_id:
+                        continue
+                    candidate = edge_cost(neighbor_id, node_id, lengths[k]) + rhs_node
+                    if candidate < rhs.get(neighbor_id, INF):
+                        rhs[neighbor_id] = candidate
+                        self._update_queue(neighbor_id)
+            else:
+                # Maliyet arttı: rhs'i bu node'a dayanan komşuları yeniden hesapla
+                g[node_id] = INF
+                first = edge_start[node_id]
+                for k in range(first, first + degree[node_id]):
+                    neighbor_id = targets[k]
+                    if neighbor_id != goal_id and \
+                            rhs.get(neighbor_id, INF) == edge_cost(neighbor_id, node_id, lengths[k]) + g_old:
+                        rhs[neighbor_id] = self._best_rhs(neighbor_id)
+                        self._update_queue(neighbor_id)
+                if node_id != goal_id and rhs_node == g_old:
+                    rhs[node_id] = self._best_rhs(node_id)
+                self._update_queue(node_id)
+        return expansions
+
+    def _set_start(self, start_id):
+        self.start_id = self.last_start_id = start_id
+        graph = self.map.graph
+        self._start_x, self._start_y = graph.xs[start_id], graph.ys[start_id]
+
+    def _reset(self, start_id, goal_id):
+        # Yeni hedef: arama durumunu sıfırla
+        self._set_start(start_id)
+        self.goal_id = goal_id
+        self.km = 0.0
+        self.g = {}
+        self.rhs = {goal_id: 0.0}
+        self._heap = []
+        self._queued = {}
+        self._changed_nodes = set()
+        self._push(goal_id)
+
+    def find_path(self, start_id, goal_id):
+        # Başlangıçtan hedefe yolu bul; önceki aramanın durumunu yeniden kullan
+        if self.instrumentation is None:
+            return self._plan(start_id, goal_id)
+        begin = time.perf_counter()
+        path = self._plan(start_id, goal_id)
+        self.instrumentation.record('planner.find_path', time.perf_counter() - begin)
+        self.instrumentation.count('planner.searches')
+        self.instrumentation.count('planner.expansions', self.last_expansions)
+        if path is None:
+            self.instrumentation.count('planner.failures')
+        return path
+    
+    def _plan(self, start_id, goal_id):
+        if start_id not in self.map.nodes or goal_id not in self.map.nodes:
+            print("Başlangıç veya hedef düğüm geçersiz")
+            self.last_expansions = 0
+            return None
+
+        if goal_id != self.goal_id:
+            self._reset(start_id, goal_id)
+        elif start_id != self.start_id:
+            # Robot hareket etti: anahtar düzeltmesini biriktir
+            self.km += self.heuristic(self.last_start_id, start_id)
+            self._set_start(start_id)
+
+        # Bekleyen kenar değişikliklerinden etkilenen nodeleri güncelle
+        changed_nodes, self._changed_nodes = self._changed_nodes, set()
+        for node_id in changed_nodes:
+            self._update_vertex(node_id)
+
+        self.last_expansions = self._compute_shortest_path()
+        path = self._extract_path()
+        if path is None:
+            print("Başlangıçtan hedefe yol bulunamadı")
+        return path
+
+    def _extract_path(self):
+        # g değerleri üzerinden hedefe doğru en ucuz komşuları izle
+        current_id = self.start_id
+        if self.g.get(current_id, INF) == INF:
+            return None
+        path = [current_id]
+        visited = {current_id}
+        graph = self.map.graph
+        targets, lengths = graph.targets, graph.lengths
+        while current_id != self.goal_id:
+            best_id, best_cost = None, INF
+            first = graph.edge_start[current_id]
+            for k in range(first, first + graph.degree[current_id]):
+                neighbor_id = targets[k]
+                cost = self.map.edge_cost(current_id, neighbor_id, lengths[k]) + self.g.get(neighbor_id, INF)
+                if cost < best_cost:
+                    best_id, best_cost = neighbor_id, cost
+            if best_id is None or best_id in visited:
+                return None
+            visited.add(best_id)
+            path.append(best_id)
+            current_id = best_id
+        return path
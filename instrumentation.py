@@ -0,0 +1,79 @@
+import json
+import time
+import numpy as np
+
+# Hafif ölçüm katmanı: aşama süreleri için kayan histogramlar ve sayaçlar
+# Bileşenler (NavigationSystem, HybridMap, OccupancyGrid, planlayıcılar,
+# ObstacleDetector) 'instrumentation' özniteliği None iken hiçbir şey ölçmez;
+# kapalıyken maliyet, çağrı başına tek bir None karşılaştırmasıdır.
+# Kullanım:
+#   instrumentation = Instrumentation()
+#   nav.set_instrumentation(instrumentation)
+#   ...
+#   instrumentation.snapshot() veya instrumentation.write_jsonl(dosya)
+
+
+# Son 'window' örneği halka tamponda tutan kayan histogram
+# Yüzdelikler pencere üzerinden, toplam/sayı tüm ömür boyunca hesaplanır
+class RollingHistogram:
+    def __init__(self, window=1024):
+        self.samples = np.zeros(window)
+        self.window = window
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def add(self, value):
+        self.samples[self.count % self.window] = value
+        self.count += 1
+        self.total += value
+        if value > self.maximum:
+            self.maximum = value
+
+    def summary(self):
+        recent = self.samples[:min(self.count, self.window)]
+        if not recent.size:
+            return {'count': 0}
+        p50, p95, p99 = np.percentile(recent, (50, 95, 99))
+        return {'count': self.count, 'mean': self.total / self.count,
+                'p50': float(p50), 'p95': float(p95), 'p99': float(p99),
+                'window_max': float(recent.max()), 'max': self.maximum}
+
+
+class Instrumentation:
+    def __init__(self, window=1024):
+        self.window = window
+        self.timings = {}   # ad -> RollingHistogram (saniye)
+        self.counters = {}  # ad -> toplam
+        self.started = time.time()
+
+    def record(self, name, seconds):
+        # Bir çağrının süresini kaydet
+        histogram = self.timings.get(name)
+        if histogram is None:
+            histogram = self.timings[name] = RollingHistogram(self.window)
+        histogram.add(seconds)
+
+    def count(self, name, amount=1):
+        # Sayaç artır (ör. güncellenen hücre, açılan node)
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def snapshot(self):
+        # Tüm ölçümlerin sözlük özeti; süreler milisaniye cinsinden
+        timings = {}
+        for name, histogram in sorted(self.timings.items()):
+            summary = histogram.summary()
+            timings[name] = {key: (value * 1e3 if key != 'count' else value)
+                             for key, value in summary.items()}
+        return {'time': time.time(), 'uptime': time.time() - self.started,
+                'timings_ms': timings, 'counters': dict(sorted(self.counters.items()))}
+
+    def write_jsonl(self, stream):
+        # Anlık görüntüyü JSON-lines akışına tek satır olarak yaz
+        stream.write(json.dumps(self.snapshot()) + '\n')
+        stream.flush()
+
+    def reset(self):
+        self.timings = {}
+        self.counters = {}
+        self.started = time.time()
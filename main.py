@@ -0,0 +1,107 @@
+import argparse
+from simulation import build_world, Simulation
+from instrumentation import Instrumentation
+from mission_log import MissionReplay
+
+# Simülasyonu çalıştırmak için giriş noktası
+# Örnek: python main.py --world rooms --size 40 --ticks 3000 --seed 1
+# Kayıt ve oynatma: python main.py --record gorev.navlog, python main.py --replay gorev.navlog
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Başsız navigasyon simülasyonu')
+    parser.add_argument('--world', default='mixed', choices=['open', 'rooms', 'corridors', 'clutter', 'mixed'])
+    parser.add_argument('--size', type=float, default=30.0, help='Dünya kenar uzunluğu (metre)')
+    parser.add_argument('--resolution', type=float, default=0.1, help='Occupancy grid çözünürlüğü (metre)')
+    parser.add_argument('--sensors', type=int, default=36, help='Sensör (ışın) sayısı')
+    parser.add_argument('--nodes', type=int, default=800, help='Yol haritası node sayısı')
+    parser.add_argument('--movers', type=int, default=3, help='Hareketli engel sayısı')
+    parser.add_argument('--storage', default='probability', choices=['probability', 'log_odds', 'tiled'])
+    parser.add_argument('--planner', default='greedy', choices=['greedy', 'dstar_lite', 'path_tree'])
+    parser.add_argument('--ticks', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--report-every', type=int, default=500, help='Ara rapor aralığı (adım)')
+    parser.add_argument('--robot-radius', type=float, help='Robot yarıçapı (metre); verilirse mesafe alanı kullanılır')
+    parser.add_argument('--pyramid', action='store_true', help='Segment kontrolleri için doluluk piramidini kullan')
+    parser.add_argument('--async-sensors', action='store_true',
+                        help='Taramaları arka plan iş parçacığında işle (sensor_pipeline.py)')
+    parser.add_argument('--ray-tables', action='store_true',
+                        help='Taramaları önceden hesaplanmış ışın tablolarından izle (ray_tables.py)')
+    parser.add_argument('--tracker', action='store_true',
+                        help='Hareketli engelleri grid yerine tahmin katmanında izle (obstacle_tracker.py)')
+    parser.add_argument('--roadmap', action='store_true',
+                        help='Yol haritasını grid\'den otomatik kur, kenarları çakışma kontrollü ekle')
+    parser.add_argument('--metrics', help='Ölçüm anlık görüntülerinin yazılacağı JSON-lines dosyası')
+    parser.add_argument('--record', help='Navigasyon girdilerinin yazılacağı görev kaydı (mission_log.py)')
+    parser.add_argument('--replay', help='Simülasyon yerine bu görev kaydını olabildiğince hızlı oynat')
+    parser.add_argument('--replay-batch', type=int, default=1,
+                        help='Oynatmada taramaları bu boyda partilerle uygula')
+    args = parser.parse_args()
+
+    if args.replay:
+        replay(args.replay, args.replay_batch)
+        return
+
+    instrumentation = Instrumentation() if args.metrics else None
+    world = build_world(args.world, args.size, args.size, seed=args.seed, movers=args.movers)
+    simulation = Simulation(world, num_sensors=args.sensors, num_nodes=args.nodes,
+                            resolution=args.resolution, storage=args.storage,
+                            planner=args.planner, seed=args.seed, instrumentation=instrumentation,
+                            robot_radius=args.robot_radius, pyramid=args.pyramid,
+                            async_sensors=args.async_sensors, roadmap=args.roadmap,
+                            ray_tables=args.ray_tables, tracker=args.tracker,
+                            record=args.record)
+    print(f"Dünya: {args.world} {args.size:.0f}x{args.size:.0f}m, {args.sensors} sensör, "
+          f"{len(simulation.nav.hybrid_map.nodes)} node")
+
+    metrics_file = open(args.metrics, 'w') if args.metrics else None
+    done = 0
+    while done < args.ticks:
+        chunk = min(args.report_every, args.ticks - done)
+        summary = simulation.run(chunk)
+        done += chunk
+        x, y, _ = simulation.pose
+        print(f"adım={done:>6}  konum=({x:5.1f}, {y:5.1f})  ulaşılan hedef={summary['goals_reached']}  "
+              f"bırakılan={summary['goals_abandoned']}  çarpışma={summary['collisions']}")
+        if metrics_file is not None:
+            instrumentation.write_jsonl(metrics_file)
+    if metrics_file is not None:
+        metrics_file.close()
+    summary = simulation.summary()
+    simulation.close()
+
+    print(f"\nSaniyede adım: {summary['ticks_per_second']:.0f}  (p99 adım süresi {summary['tick_p99_ms']:.2f}ms)")
+    for stage, stats in summary['stages'].items():
+        print(f"  {stage:<9} ortalama={stats['mean_ms']:.3f}ms  p50={stats['p50_ms']:.3f}ms  "
+              f"p95={stats['p95_ms']:.3f}ms  p99={stats['p99_ms']:.3f}ms")
+    if summary['pipeline'] is not None:
+        pipeline = summary['pipeline']
+        print(f"  sensör hattı: {pipeline['applied']} tarama, {pipeline['batches']} parti "
+              f"(ortalama {pipeline['mean_batch']:.2f}), atılan={pipeline['dropped']}, "
+              f"en uzun gecikme={pipeline['max_latency_ms']:.2f}ms")
+    if summary['roadmap'] is not None:
+        roadmap = summary['roadmap']
+        print(f"  yol haritası: {roadmap['refreshes']} tazeleme, eklenen node={roadmap['nodes_added']}, "
+              f"kontrol edilen kenar={roadmap['edges_checked']}, engellenen={roadmap['edges_blocked']}, "
+              f"engeli kalkan={roadmap['edges_unblocked']}")
+
+
+def replay(path, batch):
+    # Görev kaydını oynat; verim, aşama gecikmeleri ve kayıttan farkları yazdır
+    summary = MissionReplay(path, batch=batch).run()
+    print(f"Oynatılan girdi: {summary['inputs']}  navigasyon adımı: {summary['navigations']}  "
+          f"süre: {summary['replay_seconds']:.2f}s (kayıt {summary['recorded_seconds']:.2f}s, "
+          f"{summary['speedup']:.1f}x)")
+    print(f"Saniyede adım: {summary['navigations_per_second']:.0f}  "
+          f"saniyede girdi: {summary['inputs_per_second']:.0f}")
+    for stage, stats in summary['stages'].items():
+        print(f"  {stage:<16} ortalama={stats['mean']:.3f}ms  p50={stats['p50']:.3f}ms  "
+              f"p95={stats['p95']:.3f}ms  p99={stats['p99']:.3f}ms")
+    print(f"Yol farkı: {summary['path_mismatches']}/{summary['path_checks']}"
+          + (f" (ilk: {summary['first_path_mismatch']}. adım)" if summary['first_path_mismatch'] else ""))
+    print(f"Grid farkı: {summary['grid_mismatches']}/{summary['grid_checks']} kontrol noktası  "
+          f"(en büyük dolu hücre farkı {summary['max_occupied_diff']})")
+
+
+if __name__ == '__main__':
+    main()
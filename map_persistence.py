@@ -0,0 +1,150 @@
+import json
+import struct
+import numpy as np
+from grid_storage import STORAGE_TYPES
+from graph_store import GraphStore, NodeMapping
+from topological_mapping import HybridMap
+
+# HybridMap için sürümlü ikili kayıt biçimi
+# Dosya düzeni:
+#   [8 bayt sihirli sözcük][4 bayt sürüm][4 bayt başlık uzunluğu][JSON başlık]
+#   [64 bayta hizalanmış ham numpy dizileri ...]
+# Başlık harita parametrelerini ve her dizinin (ad, tip, boyut, konum) bilgisini tutar.
+# Diziler hizalı ve ham olduğu için yükleme np.memmap ile kopyasız yapılır:
+# büyük bir grid milisaniyeler içinde açılır, sayfalar ancak okundukça diskten gelir.
+# Bellek eşlemesi 'c' (yazarken kopyala) kipindedir; harita güncellenebilir ama dosya değişmez.
+MAGIC = b'HYBRMAP\x00'
+FORMAT_VERSION = 1
+ALIGNMENT = 64
+_PREAMBLE = struct.Struct('<8sII')
+
+
+def _storage_name(storage):
+    for name, storage_class in STORAGE_TYPES.items():
+        if type(storage) is storage_class:
+            return name
+    raise ValueError(f"Kaydedilemeyen grid depolama türü: {type(storage).__name__}")
+
+
+def _graph_arrays(hybrid_map):
+    # Topolojik grafın sıkıştırılmış komşuluk (CSR) dizileri (GraphStore'dan doğrudan)
+    # Bağlantı sırası korunur, böylece yüklenen haritada aramalar aynı sonucu verir
+    graph = hybrid_map.graph
+    edge_offsets, edge_targets, edge_lengths = graph.csr()
+    node_ids = np.arange(graph.num_nodes, dtype=np.int64)
+    node_xy = graph.coordinates()
+
+    blocked_edges = np.array(sorted(hybrid_map.blocked_edges), dtype=np.int64).reshape(-1, 2)
+    blocked_nodes = np.array(sorted(hybrid_map.blocked_nodes), dtype=np.int64)
+    return {
+        'node_ids': node_ids, 'node_xy': node_xy,
+        'edge_offsets': edge_offsets, 'edge_targets': edge_targets, 'edge_lengths': edge_lengths,
+        'blocked_edges': blocked_edges, 'blocked_nodes': blocked_nodes,
+    }
+
+
+def save_map(hybrid_map, path):
+    # Haritayı (grid + topolojik graf) tek bir ikili dosyaya kaydet
+    grid = hybrid_map.occupancy_grid
+    storage_state, storage_arrays = grid.storage.export_state()
+    arrays = {'storage/' + name: array for name, array in storage_arrays.items()}
+    arrays.update({'graph/' + name: array for name, array in _graph_arrays(hybrid_map).items()})
+
+    # Dizi konumlarını hesapla (başlık uzunluğu konumları etkilediği için iki geçiş)
+    header = {
+        'grid': {
+            'width': grid.width, 'height': grid.height, 'resolution': grid.resolution,
+            'storage': _storage_name(grid.storage), 'storage_state': storage_state,
+            'decay_factor': grid.decay_factor, 'occupied_threshold': grid.occupied_threshold,
+        },
+        'graph': {'next_node_id': hybrid_map.next_node_id, 'link_distance': hybrid_map.link_distance},
+        'arrays': {},
+    }
+    layout = {}
+    data_start = 0
+    while True:
+        offset = data_start
+        for name, array in arrays.items():
+            offset = -(-offset // ALIGNMENT) * ALIGNMENT
+            layout[name] = {'dtype': array.dtype.str, 'shape': list(array.shape), 'offset': offset}
+            offset += array.nbytes
+        header['arrays'] = layout
+        header_bytes = json.dumps(header).encode('utf-8')
+        needed = -(-(_PREAMBLE.size + len(header_bytes)) // ALIGNMENT) * ALIGNMENT
+        if needed <= data_start:
+            break
+        data_start = needed
+
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.seek(layout[name]['offset'])
+            f.write(np.ascontiguousarray(array).tobytes())
+        f.truncate(offset)
+    return offset
+
+
+def read_header(path):
+    # Dosyanın başlığını oku ve sürümünü doğrula
+    with open(path, 'rb') as f:
+        magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"Geçersiz harita dosyası: {path}")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Desteklenmeyen harita dosyası sürümü: {version} (beklenen {FORMAT_VERSION})")
+        return json.loads(f.read(header_length).decode('utf-8'))
+
+
+def _load_arrays(path, layout, mmap):
+    arrays = {}
+    for name, info in layout.items():
+        dtype = np.dtype(info['dtype'])
+        shape = tuple(info['shape'])
+        count = int(np.prod(shape))
+        if count == 0:
+            arrays[name] = np.empty(shape, dtype=dtype)
+        elif mmap:
+            arrays[name] = np.memmap(path, dtype=dtype, mode='c', offset=info['offset'], shape=shape)
+        else:
+            arrays[name] = np.fromfile(path, dtype=dtype, count=count,
+                                       offset=info['offset']).reshape(shape)
+    return arrays
+
+
+def load_map(path, mmap=True):
+    # Kaydedilmiş haritayı yükle; mmap=True ise grid dizileri bellek eşlemelidir
+    header = read_header(path)
+    arrays = _load_arrays(path, header['arrays'], mmap)
+    grid_info = header['grid']
+
+    # Grid depolaması dosyadaki dizilerden kurulur (varsayılan grid ayrılmaz)
+    resolution = grid_info['resolution']
+    cells_y = int(grid_info['height'] / resolution)
+    cells_x = int(grid_info['width'] / resolution)
+    storage_arrays = {name[len('storage/'):]: array for name, array in arrays.items()
+                      if name.startswith('storage/')}
+    storage = STORAGE_TYPES[grid_info['storage']].from_state(
+        cells_y, cells_x, grid_info['storage_state'], storage_arrays)
+    hybrid_map = HybridMap(grid_info['width'], grid_info['height'], resolution, storage)
+    hybrid_map.occupancy_grid.decay_factor = grid_info['decay_factor']
+    hybrid_map.occupancy_grid.occupied_threshold = grid_info['occupied_threshold']
+
+    # Topolojik graf - nodeler add_node kullanılmadan, kayıtlı CSR dizilerinden kurulur
+    graph_info = header['graph']
+    hybrid_map.link_distance = graph_info['link_distance']
+    hybrid_map.node_index.cell_size = hybrid_map.link_distance
+    node_ids = arrays['graph/node_ids']
+    node_xy = arrays['graph/node_xy']
+    if node_ids.size != graph_info['next_node_id'] or \
+            not np.array_equal(node_ids, np.arange(node_ids.size)):
+        raise ValueError("Node ID'leri ardışık olmayan harita dosyası desteklenmiyor")
+    hybrid_map.graph = GraphStore.from_csr(
+        node_xy[:, 0], node_xy[:, 1],
+        arrays['graph/edge_offsets'], arrays['graph/edge_targets'], arrays['graph/edge_lengths'])
+    hybrid_map.nodes = NodeMapping(hybrid_map.graph)
+    for node_id, (x, y) in enumerate(node_xy.tolist()):
+        hybrid_map.node_index.insert(node_id, x, y)
+    hybrid_map.blocked_edges = set(map(tuple, arrays['graph/blocked_edges'].tolist()))
+    hybrid_map.blocked_nodes = set(arrays['graph/blocked_nodes'].tolist())
+    return hybrid_map
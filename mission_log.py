@@ -0,0 +1,313 @@
+import contextlib
+import json
+import os
+import struct
+import time
+import zlib
+import numpy as np
+from instrumentation import Instrumentation
+from map_persistence import save_map, load_map
+from navigation_system import NavigationSystem
+from sensor_pipeline import SensorPipeline
+
+# Görev kaydı (NavigationSystem girdileri) için ikili akış biçimi ve hızlı oynatma
+# Dosya düzeni:
+#   [8 bayt sihirli sözcük][4 bayt sürüm][4 bayt başlık uzunluğu][JSON başlık]
+#   kayıtlar: [1 bayt tür][8 bayt zaman damgası (saniye, kayıt başından)][4 bayt uzunluk][veri]
+# Girdi kayıtları (oynatmada aynı sırayla uygulanır):
+#   POSITION  update_position(x, y, yönelim)       '<ddd'
+#   SENSOR    update_sensor_data(okumalar)         float64 dizi (okuma yoksa NaN)
+#   GOAL      set_goal(x, y)                       '<dd'
+#   NAVIGATE  navigate_to_goal() çağrısı            boş
+# Çıktı kayıtları (oynatmada karşılaştırılır):
+#   PATH       navigate_to_goal sonrası yol değiştiyse yeni yol (int32 node ID; None: boş veri)
+#   CHECKPOINT her checkpoint_every sensör güncellemesinde grid özeti '<II' (crc32, dolu hücre)
+# Başlangıç haritası (grid + topolojik graf) kayıt açılırken map_persistence ile yanına
+# '<kayıt>.map' olarak yazılır; başlık bunu ve NavigationSystem seçeneklerini tutar.
+# Kayıtlar tek tek yazılır ve okunur: dosya hiçbir zaman tümüyle belleğe alınmaz.
+MAGIC = b'NAVLOG\x00\x00'
+FORMAT_VERSION = 1
+_PREAMBLE = struct.Struct('<8sII')
+_RECORD = struct.Struct('<BdI')
+_POSITION = struct.Struct('<ddd')
+_GOAL = struct.Struct('<dd')
+_CHECKPOINT = struct.Struct('<II')
+
+POSITION, SENSOR, GOAL, NAVIGATE, PATH, CHECKPOINT = range(1, 7)
+RECORD_NAMES = {POSITION: 'position', SENSOR: 'sensor', GOAL: 'goal', NAVIGATE: 'navigate',
+                PATH: 'path', CHECKPOINT: 'checkpoint'}
+
+
+def grid_digest(grid):
+    # Grid'in özeti: olasılık dizisinin crc32'si ve eşiği aşan hücre sayısı
+    probabilities = np.ascontiguousarray(grid.to_probability(), dtype=np.float64)
+    occupied = int(np.count_nonzero(probabilities >= grid.occupied_threshold))
+    return zlib.crc32(probabilities.tobytes()), occupied
+
+
+# NavigationSystem'e bağlanan kaydedici (nav.recorder özniteliğine atanır)
+# Kayıt açıldığı anki harita başlangıç durumu olarak kaydedilir: oynatma bu haritayı
+# yükleyip aynı seçeneklerle yeni bir NavigationSystem kurar.
+# Asenkron sensör hattında (SensorPipeline.submit) taramalar da SENSOR olarak kaydedilir,
+# ancak grid işçi iş parçacığında güncellendiği için CHECKPOINT yazılmaz.
+class MissionRecorder:
+    def __init__(self, path, navigation_system, checkpoint_every=50):
+        if checkpoint_every < 1:
+            raise ValueError("Kontrol noktası aralığı en az 1 olmalı")
+        self.path = path
+        self.checkpoint_every = checkpoint_every
+        self.map_path = path + '.map'
+        save_map(navigation_system.hybrid_map, self.map_path)
+
+        nav = navigation_system
+        self.grid = nav.hybrid_map.occupancy_grid
+        self.num_sensors = nav.obstacle_detector.num_sensors
+        header = {
+            'map': os.path.basename(self.map_path),
+            'checkpoint_every': checkpoint_every,
+            'started': time.time(),
+            'navigation': {
+                'planner': nav.planner_name, 'num_sensors': self.num_sensors,
+                'robot_radius': nav.robot_radius, 'pyramid': nav.pyramid is not None,
+                'roadmap': nav.roadmap is not None, 'ray_tables': self.grid.ray_table is not None,
+                'tracker': nav.tracker is not None, 'tracker_dt': nav.tracker_dt,
+            },
+        }
+        header_bytes = json.dumps(header).encode('utf-8')
+        self.file = open(path, 'wb')
+        self.file.write(_PREAMBLE.pack(MAGIC, FORMAT_VERSION, len(header_bytes)))
+        self.file.write(header_bytes)
+
+        self.started = time.perf_counter()
+        self.last_path = None
+        self.sensor_updates = 0
+
+        # İstatistikler
+        self.records = 0
+        self.bytes_written = _PREAMBLE.size + len(header_bytes)
+
+    def _write(self, kind, payload=b''):
+        self.file.write(_RECORD.pack(kind, time.perf_counter() - self.started, len(payload)))
+        self.file.write(payload)
+        self.records += 1
+        self.bytes_written += _RECORD.size + len(payload)
+
+    def position(self, x, y, orientation):
+        self._write(POSITION, _POSITION.pack(x, y, orientation))
+
+    def goal(self, x, y):
+        self._write(GOAL, _GOAL.pack(x, y))
+
+    def sensor(self, sensor_readings, checkpoint=True):
+        # Okumalar grid güncellemesinden sonra yazılır; checkpoint=False ise (asenkron hat)
+        # grid özeti alınmaz
+        readings = np.array(sensor_readings, dtype=np.float64)
+        if readings.size != self.num_sensors:
+            raise ValueError("Okuma sayısı sensör sayısıyla eşleşmeli")
+        self._write(SENSOR, readings.tobytes())
+        if not checkpoint:
+            return
+        self.sensor_updates += 1
+        if self.sensor_updates % self.checkpoint_every == 0:
+            self._write(CHECKPOINT, _CHECKPOINT.pack(*grid_digest(self.grid)))
+
+    def navigate(self, current_path):
+        # navigate_to_goal çağrısı ve (değiştiyse) sonucundaki yol
+        self._write(NAVIGATE)
+        if current_path != self.last_path:
+            self.last_path = list(current_path) if current_path is not None else None
+            payload = b'' if current_path is None else np.array(current_path, dtype=np.int32).tobytes()
+            self._write(PATH, payload)
+
+    def close(self):
+        if not self.file.closed:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+# Kayıt dosyasını akış olarak okuyan okuyucu
+# Yineleme (tür, zaman damgası, değer) üçlüleri üretir; değer kayıt türüne göre çözülmüştür
+class MissionLog:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            magic, version, header_length = _PREAMBLE.unpack(f.read(_PREAMBLE.size))
+            if magic != MAGIC:
+                raise ValueError(f"Geçersiz görev kaydı: {path}")
+            if version != FORMAT_VERSION:
+                raise ValueError(f"Desteklenmeyen görev kaydı sürümü: {version} (beklenen {FORMAT_VERSION})")
+            self.header = json.loads(f.read(header_length).decode('utf-8'))
+        self.data_start = _PREAMBLE.size + header_length
+        self.map_path = os.path.join(os.path.dirname(path), self.header['map'])
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            f.seek(self.data_start)
+            while True:
+                raw = f.read(_RECORD.size)
+                if not raw:
+                    return
+                if len(raw) < _RECORD.size:
+                    raise ValueError(f"Görev kaydı yarıda kesilmiş: {self.path}")
+                kind, timestamp, length = _RECORD.unpack(raw)
+                payload = f.read(length)
+                if len(payload) < length:
+                    raise ValueError(f"Görev kaydı yarıda kesilmiş: {self.path}")
+                yield kind, timestamp, self._decode(kind, payload)
+
+    def _decode(self, kind, payload):
+        if kind == POSITION:
+            return _POSITION.unpack(payload)
+        if kind == SENSOR:
+            return np.frombuffer(payload, dtype=np.float64)
+        if kind == GOAL:
+            return _GOAL.unpack(payload)
+        if kind == NAVIGATE:
+            return None
+        if kind == PATH:
+            return np.frombuffer(payload, dtype=np.int32).tolist() if payload else None
+        if kind == CHECKPOINT:
+            return _CHECKPOINT.unpack(payload)
+        raise ValueError(f"Bilinmeyen kayıt türü: {kind}")
+
+
+# Kaydı olabildiğince hızlı (gerçek zamandan bağımsız) yeniden oynatan sürücü
+# Kayıttaki başlangıç haritası yüklenir ve NavigationSystem kayıttaki seçeneklerle
+# (overrides ile değiştirilebilir, ör. {'planner': 'path_tree'}) kurulur.
+# Her girdi kaydının süresi aşama başına ölçülür; instrumentation=True ise navigasyon
+# bileşenlerinin ayrıntılı ölçümleri de aynı özete eklenir.
+# Çıktılar kayıttakilerle karşılaştırılır: her navigate_to_goal sonrası yol ve her kontrol
+# noktasında grid özeti. Seçenekler değiştirilmediyse hepsinin eşleşmesi beklenir.
+# batch > 1: taramalar SensorPipeline ile birikip batch'lik partilerde tek toplu güncellemeyle
+# uygulanır (asenkron hattın anlamı: navigasyon henüz uygulanmamış taramaları görmez);
+# yollar ve grid kayıttan ayrışabilir. Kontrol noktası ve hedef değişiminde parti boşaltılır.
+class MissionReplay:
+    def __init__(self, path, batch=1, overrides=None, instrumentation=False):
+        if batch < 1:
+            raise ValueError("Parti boyu en az 1 olmalı")
+        self.log = MissionLog(path)
+        self.batch = batch
+        options = dict(self.log.header['navigation'])
+        options.update(overrides or {})
+        self.timings = Instrumentation()
+        hybrid_map = load_map(self.log.map_path, mmap=False)
+        grid = hybrid_map.occupancy_grid
+        self.nav = NavigationSystem(grid.width, grid.height, grid.resolution, hybrid_map=hybrid_map,
+                                    instrumentation=self.timings if instrumentation else None,
+                                    **options)
+        self.pipeline = None
+        if batch > 1:
+            self.pipeline = SensorPipeline(self.nav, max_pending=batch, max_batch=batch)
+
+        # Karşılaştırma durumu
+        self.recorded_path = None
+        self.compare_pending = False
+        self.path_checks = 0
+        self.path_mismatches = 0
+        self.first_path_mismatch = None  # İlk farklı yolun navigate sırası
+        self.grid_checks = 0
+        self.grid_mismatches = 0
+        self.max_occupied_diff = 0
+        self.navigations = 0
+
+    def run(self, limit=None, quiet=True):
+        # Kaydı (veya ilk 'limit' girdi kaydını) oynat ve özeti döndür
+        # quiet=True: planlayıcıların "yol bulunamadı" çıktıları bastırılır
+        if quiet:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                return self._run(limit)
+        return self._run(limit)
+
+    def _run(self, limit):
+        nav, timings = self.nav, self.timings
+        inputs = 0
+        last_timestamp = 0.0
+        begin = time.perf_counter()
+        for kind, timestamp, value in self.log:
+            last_timestamp = timestamp
+            if kind == PATH:
+                self.recorded_path = value
+                self._compare_path()
+                continue
+            self._compare_path()
+            if kind == CHECKPOINT:
+                self._flush()
+                self._compare_grid(value)
+                continue
+            if limit is not None and inputs >= limit:
+                break
+            inputs += 1
+            start = time.perf_counter()
+            if kind == POSITION:
+                nav.update_position(*value)
+                timings.record('replay.position', time.perf_counter() - start)
+            elif kind == SENSOR:
+                if self.pipeline is None:
+                    nav.update_sensor_data(value)
+                else:
+                    self.pipeline.submit(value)
+                    if self.pipeline.queue.qsize() >= self.batch:
+                        self.pipeline.drain()
+                timings.record('replay.sensor', time.perf_counter() - start)
+            elif kind == GOAL:
+                self._flush()
+                nav.set_goal(*value)
+                timings.record('replay.goal', time.perf_counter() - start)
+            elif kind == NAVIGATE:
+                nav.navigate_to_goal()
+                timings.record('replay.navigate', time.perf_counter() - start)
+                self.navigations += 1
+                self.compare_pending = True
+        self._compare_path()
+        self._flush()
+        elapsed = time.perf_counter() - begin
+        return self.summary(inputs, elapsed, last_timestamp)
+
+    def _flush(self):
+        if self.pipeline is not None:
+            self.pipeline.drain()
+
+    def _compare_path(self):
+        # Son navigate_to_goal sonrası yol kayıttaki (son PATH kaydı) ile aynı mı
+        if not self.compare_pending:
+            return
+        self.compare_pending = False
+        self.path_checks += 1
+        if self.nav.current_path != self.recorded_path:
+            self.path_mismatches += 1
+            if self.first_path_mismatch is None:
+                self.first_path_mismatch = self.navigations
+
+    def _compare_grid(self, recorded):
+        self.grid_checks += 1
+        digest, occupied = grid_digest(self.nav.hybrid_map.occupancy_grid)
+        if digest != recorded[0]:
+            self.grid_mismatches += 1
+        self.max_occupied_diff = max(self.max_occupied_diff, abs(occupied - recorded[1]))
+
+    def summary(self, inputs, elapsed, recorded_seconds):
+        # Verim, kayda göre hızlanma, aşama başına gecikme (ms) ve çıktı farkları
+        snapshot = self.timings.snapshot()
+        return {
+            'inputs': inputs,
+            'navigations': self.navigations,
+            'replay_seconds': elapsed,
+            'recorded_seconds': recorded_seconds,
+            'inputs_per_second': inputs / elapsed if elapsed > 0 else 0.0,
+            'navigations_per_second': self.navigations / elapsed if elapsed > 0 else 0.0,
+            'speedup': recorded_seconds / elapsed if elapsed > 0 else 0.0,
+            'stages': snapshot['timings_ms'],
+            'counters': snapshot['counters'],
+            'path_checks': self.path_checks,
+            'path_mismatches': self.path_mismatches,
+            'first_path_mismatch': self.first_path_mismatch,
+            'grid_checks': self.grid_checks,
+            'grid_mismatches': self.grid_mismatches,
+            'max_occupied_diff': self.max_occupied_diff,
+            'pipeline': self.pipeline.stats() if self.pipeline is not None else None,
+        }
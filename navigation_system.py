@@ -1,35 +1,156 @@
 import math
+import time
+from collections import OrderedDict
 from topological_mapping import HybridMap
 # A* yerine Greedy kullanıyoruz çünkü hedefin konumu bilindiğinde daha verimli
 from greedy_algorithm import GreedyBestFirst
+from incremental_planner import DStarLite
+from path_tree_cache import PathTreeCache
 from obstacle_detector import ObstacleDetector
+from obstacle_tracker import ObstacleTracker
+from roadmap_builder import RoadmapBuilder
 import numpy as np
 
 # Navigasyon sistemi - tüm bileşenleri entegre eden ana modül
 # Yapılandırılmamış ortamlar için hibrit yol planlama (Liu vd. [17])
 class NavigationSystem:
-    def __init__(self, width, height, resolution=0.1):
+    def __init__(self, width, height, resolution=0.1, storage='probability', planner='greedy',
+                 storage_options=None, hybrid_map=None, num_sensors=8,
+                 instrumentation=None, robot_radius=None, pyramid=False, roadmap=False,
+                 ray_tables=False, tracker=False, tracker_dt=0.2):
         # Haritalama ve yol planlama bileşenlerini başlat
-        self.hybrid_map = HybridMap(width, height, resolution)
-        self.path_planner = GreedyBestFirst(self.hybrid_map)
-        self.obstacle_detector = ObstacleDetector()
+        # storage='log_odds' zaman bozunmasını tembel uygular (adım maliyeti alanla değil, dokunulan hücreyle orantılı)
+        # storage='tiled' büyük haritalar için sadece gözlenen döşemeleri ayırır (bkz. grid_storage.py)
+        # planner='dstar_lite' yol geçersizleştiğinde sıfırdan değil artımlı yeniden planlar
+        # planner='path_tree' hedef başına en kısa yol ağacını önbellekler; sabit hedefe yapılan
+        # tekrar sorgular parent işaretçileri izlenerek yanıtlanır (bkz. path_tree_cache.py)
+        # hybrid_map verilirse (ör. map_persistence.load_map ile yüklenen) o harita kullanılır
+        if hybrid_map is None:
+            hybrid_map = HybridMap(width, height, resolution, storage, storage_options)
+        self.hybrid_map = hybrid_map
+        self.planner_name = planner
+        if planner == 'greedy':
+            self.path_planner = GreedyBestFirst(self.hybrid_map)
+        elif planner == 'dstar_lite':
+            self.path_planner = DStarLite(self.hybrid_map)
+        elif planner == 'path_tree':
+            self.path_planner = PathTreeCache(self.hybrid_map)
+        else:
+            raise ValueError(f"Bilinmeyen planlayıcı: {planner}")
+        self.obstacle_detector = ObstacleDetector(num_sensors)
         
         # Navigasyon durumu
         self.current_path = None
         self.current_position = (0, 0)  # metre cinsinden (x, y)
         self.current_orientation = 0.0  # radyan
         self.goal_position = None
+        self.goal_planned = False  # Mevcut hedef için daha önce yol planlandı mı
         
         # Yol takip parametreleri
         self.waypoint_threshold = 0.2  # metre, hedefe ulaşma mesafesi eşiği
         self.obstacle_threshold = 0.5  # metre, engel algılama mesafesi eşiği
+        self.max_linear_velocity = 0.3  # m/s
+        
+        # Robot yarıçapı verilirse grid bir engel mesafe alanı tutar (bkz. distance_field.py):
+        # yol geçerliliği yarıçapı hesaba katan küre izleme ile birkaç okumaya iner ve
+        # ileri hız engele olan açıklığa göre ölçeklenir. None ise hücre örneklemesi kullanılır.
+        self.robot_radius = robot_radius
+        self.slowdown_distance = 0.5  # metre, yarıçapın ötesinde bu açıklıktan sonra tam hız
+        if robot_radius is not None:
+            self.hybrid_map.occupancy_grid.enable_distance_field(robot_radius + self.slowdown_distance)
+        
+        # pyramid=True: yarıçapsız segment kontrolleri grid'in doluluk piramidinde kabadan
+        # inceye yapılır (bkz. occupancy_pyramid.py); çok sayıda ve uzun segment tek çağrıda
+        self.pyramid = None
+        if pyramid:
+            self.pyramid = self.hybrid_map.occupancy_grid.enable_pyramid()
+        
+        # ray_tables=True: sensör açıları sabit olduğundan taramalar önceden hesaplanmış ışın
+        # tablolarından izlenir (bkz. ray_tables.py); aynı sensör düzenindeki robotlar
+        # (aynı süreçteki NavigationSystem'ler) tabloyu paylaşır
+        if ray_tables:
+            self.hybrid_map.occupancy_grid.enable_ray_table(self.obstacle_detector.angle_array)
+        
+        # roadmap=True: topolojik graf occupancy grid'den otomatik kurulur ve tüm kenarlar
+        # çakışma kontrollüdür (bkz. roadmap_builder.py); grid'de değişen bölgeler her
+        # planlamadan önce tazelenir (duvarı kesen kenarlar önceden engellenir)
+        # Robot yarıçapı verilmediyse kenarlar roadmap_margin payıyla kontrol edilir (sıyıran
+        # kenarlar engel kaçınmasını tetikleyip robotu takılı bırakmasın)
+        self.roadmap = None
+        self.roadmap_margin = 0.15
+        if roadmap:
+            self.roadmap = RoadmapBuilder(self.hybrid_map, robot_radius=robot_radius,
+                                          edge_margin=self.roadmap_margin)
+        
+        # tracker=True: hareketli engel ışınları grid'e yazılmaz, sabit hızlı izlere dönüşür
+        # (bkz. obstacle_tracker.py); yürüyen bir kişi grid'de dolu hücre izi bırakıp yolu
+        # geçersizleştirmez. Yolun tahmin ufku içinde kat edilecek kısmı bir izin tahmini
+        # konumlarıyla çakışıyorsa yeniden planlanmaz, robot engelin geçmesini bekler.
+        # Tahmin katmanı yol geçerliliğine (ve kenar engellemeye) bağlanmaz: her adım değişen
+        # tahminler her adımda yeniden planlama demektir (ölçümlerde 5-40 kat fazla yeniden planlama)
+        self.tracker = None
+        # Çakışma max_yield_steps adımdan uzun sürerse (ör. engel koridorda robotla aynı yönde
+        # ilerliyor) çakışma kalkana kadar sadece imminent_horizon içindeki çakışmalarda beklenir
+        # tracker_dt: sensör taramaları arası gerçek süre (saniye); izlerin hızları ve ufuklar buna göre
+        self.prediction_horizon = 2.0  # saniye
+        self.imminent_horizon = 0.6    # saniye
+        self.max_yield_steps = 15
+        self.yielding = False          # Son navigasyon adımında hareketli engel bekleniyor mu
+        self.yield_steps = 0           # Süren çakışmanın adım sayısı
+        self.tracker_dt = tracker_dt
+        if tracker:
+            self.tracker = ObstacleTracker(dt=tracker_dt)
+        
+        # Yol geçerlilik kontrolü önbelleği
+        # Her segmentin örnek noktalarının kapladığı hücreler bir kez hesaplanır;
+        # doğrulanmış yol, grid'in değişiklik günlüğündeki yeni dolu hücrelerle kesiştirilir
+        # Yol haritası büyüdükçe sınırsız büyümesin: en fazla footprint_cache_size segment
+        # tutulur (LRU, en uzun süredir kullanılmayan atılır)
+        self.footprint_cache_size = 4096
+        self.segment_footprints = OrderedDict()  # (node1_id, node2_id) -> hücre indeksleri
+        self.verified_path = ()       # En son geçerli bulunan yol
+        self.verified_cells = set()   # Bu yolun kapladığı hücreler
+        self.verified_version = -1    # Doğrulandığı andaki grid değişiklik sürümü
+        
+        # İsteğe bağlı ölçüm katmanı; tüm bileşenlere dağıtılır (bkz. instrumentation.py)
+        self.instrumentation = None
+        self.set_instrumentation(instrumentation)
+        
+        # İsteğe bağlı görev kaydedici: girdiler ve çıktılar ikili kayda yazılır (bkz. mission_log.py)
+        self.recorder = None
         
         # İlk topolojik node'u oluştur (daha sonra dinamik olarak güncellenebilir)
-        self.start_node_id = self.hybrid_map.add_node(0, 0)
+        # Hazır haritada başlangıca en yakın mevcut node kullanılır
+        if self.hybrid_map.nodes:
+            self.start_node_id = self.hybrid_map.find_nearest_node(0, 0)[0]
+        else:
+            self.start_node_id = self.hybrid_map.add_node(0, 0)
+
+    @property
+    def distance_field(self):
+        # Grid'in güncel mesafe alanı (robot yarıçapı yoksa None); başka bir bileşen
+        # (ör. RoadmapBuilder) daha geniş menzil isteyince grid alanı yenisiyle değiştirir
+        if self.robot_radius is None:
+            return None
+        return self.hybrid_map.occupancy_grid.distance_field
+
+    def set_instrumentation(self, instrumentation):
+        # Ölçümü aç (Instrumentation nesnesi) veya kapat (None)
+        self.instrumentation = instrumentation
+        self.hybrid_map.instrumentation = instrumentation
+        self.hybrid_map.occupancy_grid.instrumentation = instrumentation
+        self.path_planner.instrumentation = instrumentation
+        self.obstacle_detector.instrumentation = instrumentation
+        if self.tracker is not None:
+            self.tracker.instrumentation = instrumentation
     
     def set_goal(self, x, y):
         # Yeni bir navigasyon hedefi belirle
+        if self.recorder is not None:
+            self.recorder.goal(x, y)
         self.goal_position = (x, y)
+        self.current_path = None  # Eski hedefin yolu geçersiz
+        self.goal_planned = False
         
         # Hedef için topolojik node oluştur (yoksa)
         nearest_id, distance = self.hybrid_map.find_nearest_node(x, y)
@@ -47,6 +168,8 @@ class NavigationSystem:
     
     def update_position(self, x, y, orientation):
         # Robotun mevcut konum ve yönelimini güncelle
+        if self.recorder is not None:
+            self.recorder.position(x, y, orientation)
         self.current_position = (x, y)
         self.current_orientation = orientation
         
@@ -59,25 +182,68 @@ class NavigationSystem:
     
     def update_sensor_data(self, sensor_readings):
         # Haritayı yeni sensör okumaları ile güncelle
+        # sensor_readings: liste (okuma yoksa None) veya NaN içerebilen numpy dizisi
+        if self.instrumentation is not None:
+            begin = time.perf_counter()
         self.obstacle_detector.update_readings(sensor_readings)
-        sensor_data = self.obstacle_detector.get_sensor_data()
-        
-        # Sensör verilerine göre occupancy grid güncelle
-        self.hybrid_map.update_grid(self.current_position, sensor_data)
+        angles = self.obstacle_detector.angle_array
         
-        # Hareketli engelleri kontrol et
-        moving_obstacles = self.obstacle_detector.detect_moving_obstacles()
+        # Hareketli engel işaretleri tarama ile aynı toplu grid güncellemesinde uygulanır
+        distances, moving_marks = self.moving_obstacle_updates(self.current_position)
         
-        # Hareketli engel varsa, hücrelerini daha yüksek olasılıkla dolu işaretle
-        for angle, distance, variance in moving_obstacles:
-            if distance is not None:
-                x = self.current_position[0] + distance * math.cos(angle)
-                y = self.current_position[1] + distance * math.sin(angle)
-                # Hareketli engeller için daha yüksek kesinlik
-                self.hybrid_map.occupancy_grid.update_cell(x, y, occupied=True, sensor_accuracy=0.95)
+        # Sensör verilerine göre occupancy grid güncelle
+        self.hybrid_map.update_grid(self.current_position, (angles, distances), moving_marks)
+        if self.roadmap is not None:
+            self.roadmap.sync()
+        if self.recorder is not None:
+            self.recorder.sensor(sensor_readings)
+        if self.instrumentation is not None:
+            self.instrumentation.record('nav.update_sensor_data', time.perf_counter() - begin)
+    
+    def moving_obstacle_updates(self, robot_pos):
+        # Taramanın grid'e yazılacak mesafeleri ve hareketli engel işaretleri
+        # Takipçi kapalıyken hareketli engeller grid'e yüksek kesinlikle işaretlenir; açıkken
+        # uç noktaları takipçiye verilir, hareketli bir ize ait ışınlar (NaN) grid'e yazılmaz
+        # (diğerleri sıradan okuma olarak yazılır, ek işaretleme yapılmaz)
+        _, distances = self.obstacle_detector.get_sensor_arrays()
+        if self.tracker is None:
+            return distances, self.moving_obstacle_marks(robot_pos)
+        angles = self.obstacle_detector.angle_array
+        xs = robot_pos[0] + distances * np.cos(angles)
+        ys = robot_pos[1] + distances * np.sin(angles)
+        # Varyans tespiti yavaş yürüyen bir kişiyi ancak ışına girip çıkarken yakalar; takipçiye
+        # ayrıca boş görülmüş bölgeye düşen uç noktalar (uç noktanın hücresi dolu değil, 0.15m
+        # gerisi önceden boş gözlenmiş: duvar yüzeyindeki gürültü değil, yeni gelen bir engel)
+        # ve hareketli bir izin beklenen konumundaki uç noktalar verilir
+        indices, _, _ = self.obstacle_detector.detect_moving_obstacles_array()
+        grid = self.hybrid_map.occupancy_grid
+        hits = np.flatnonzero(~np.isnan(distances))
+        behind = distances[hits] + 0.15
+        fresh = hits[~grid.occupied_cells(grid.world_to_flat(xs[hits], ys[hits]), 0.5)
+                     & ~grid.occupied_cells(grid.world_to_flat(robot_pos[0] + behind * np.cos(angles[hits]),
+                                                               robot_pos[1] + behind * np.sin(angles[hits])), 0.35)]
+        near = np.flatnonzero(self.tracker.near_moving_tracks(xs, ys))
+        indices = np.union1d(np.union1d(indices, fresh), near).astype(np.int64)
+        tracked = self.tracker.update(xs[indices], ys[indices])
+        if tracked.any():
+            distances = distances.copy()
+            distances[indices[tracked]] = np.nan
+        return distances, None
+    
+    def moving_obstacle_marks(self, robot_pos):
+        # Hareketli engelleri kontrol et; varsa hücrelerini daha yüksek olasılıkla dolu
+        # işaretlemek için (xs, ys, True, kesinlik) döndür, yoksa None
+        angles, _ = self.obstacle_detector.get_sensor_arrays()
+        indices, moving_distances, _ = self.obstacle_detector.detect_moving_obstacles_array()
+        if not indices.size:
+            return None
+        xs = robot_pos[0] + moving_distances * np.cos(angles[indices])
+        ys = robot_pos[1] + moving_distances * np.sin(angles[indices])
+        # Hareketli engeller için daha yüksek kesinlik
+        return (xs, ys, True, 0.95)
     
     def plan_path(self):
-        # Hedefe A* algoritması kullanarak yol planla veya yeniden planla
+        # Hedefe seçili planlayıcı ile yol planla veya yeniden planla
         if self.goal_position is None:
             return False
         
@@ -88,7 +254,18 @@ class NavigationSystem:
         if start_nearest_id is None or goal_nearest_id is None:
             return False
         
-        # Greedy algoritması ile yol bul
+        # Yol haritasının değişen bölgelerini tazele (yeni node ve kenar engelleri)
+        if self.roadmap is not None:
+            self.roadmap.refresh()
+        
+        # nav.plans her planlamayı, nav.replans sadece aynı hedef için tekrar planlamayı sayar
+        if self.instrumentation is not None:
+            self.instrumentation.count('nav.plans')
+            if self.goal_planned:
+                self.instrumentation.count('nav.replans')
+        self.goal_planned = True
+        
+        # Greedy (veya artımlı D* Lite) algoritması ile yol bul
         self.current_path = self.path_planner.find_path(start_nearest_id, goal_nearest_id)
         return self.current_path is not None
     
@@ -101,31 +278,232 @@ class NavigationSystem:
         next_node = self.hybrid_map.nodes[next_node_id]
         return (next_node.x, next_node.y)
     
+    def segment_footprint(self, node1_id, node2_id):
+        # Segment boyunca her 10cm'deki örnek noktaların düştüğü hücreler (önbellekli)
+        key = (node1_id, node2_id)
+        cells = self.segment_footprints.get(key)
+        if cells is None:
+            node1 = self.hybrid_map.nodes[node1_id]
+            node2 = self.hybrid_map.nodes[node2_id]
+            segment_length = math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
+            steps = int(segment_length / 0.1) + 1  # Her 10cm'de bir kontrol et
+            ratios = np.arange(steps) / steps
+            xs = node1.x + ratios * (node2.x - node1.x)
+            ys = node1.y + ratios * (node2.y - node1.y)
+            cells = np.unique(self.hybrid_map.occupancy_grid.world_to_flat(xs, ys))
+            self.segment_footprints[key] = cells
+            if len(self.segment_footprints) > self.footprint_cache_size:
+                self.segment_footprints.popitem(last=False)
+        else:
+            self.segment_footprints.move_to_end(key)
+        return cells
+    
+    def path_footprint(self, path):
+        # Yoldaki tüm segmentlerin hücreleri
+        return np.concatenate([self.segment_footprint(node1_id, node2_id)
+                               for node1_id, node2_id in zip(path, path[1:])])
+    
+    def _segments_clear(self, path):
+        # Yoldaki segmentlerin robot yarıçapıyla engelsiz olup olmadığı (mesafe alanı ile)
+        nodes = self.hybrid_map.nodes
+        xs = np.array([nodes[node_id].x for node_id in path])
+        ys = np.array([nodes[node_id].y for node_id in path])
+        return self.distance_field.segments_clear(xs[:-1], ys[:-1], xs[1:], ys[1:], self.robot_radius)
+    
+    def _cells_near_path(self, cells, path):
+        # Hücrelerden herhangi biri yol segmentlerine robot yarıçapından yakın mı
+        grid = self.hybrid_map.occupancy_grid
+        grid_y, grid_x = np.divmod(cells, grid.cells_x)
+        px = ((grid_x + 0.5) * grid.resolution)[:, None]
+        py = ((grid_y + 0.5) * grid.resolution)[:, None]
+        nodes = self.hybrid_map.nodes
+        xs = np.array([nodes[node_id].x for node_id in path])
+        ys = np.array([nodes[node_id].y for node_id in path])
+        dx, dy = xs[1:] - xs[:-1], ys[1:] - ys[:-1]
+        length_sq = np.maximum(dx * dx + dy * dy, 1e-12)
+        ratio = np.clip(((px - xs[:-1]) * dx + (py - ys[:-1]) * dy) / length_sq, 0.0, 1.0)
+        distance = np.hypot(xs[:-1] + ratio * dx - px, ys[:-1] + ratio * dy - py)
+        return bool((distance <= self.robot_radius + grid.resolution).any())
+    
+    def _edge_coords(self, edges):
+        # (node1_id, node2_id) kenarlarının (x0, y0, x1, y1) satırları
+        xs, ys = self.hybrid_map.graph.xs, self.hybrid_map.graph.ys
+        return np.array([(xs[node1_id], ys[node1_id], xs[node2_id], ys[node2_id])
+                         for node1_id, node2_id in edges], dtype=float).reshape(-1, 4)
+    
+    def _pyramid_segments_free(self, edges):
+        # (node1_id, node2_id) kenarlarının doluluk piramidinde engelsiz olup olmadığı
+        coords = self._edge_coords(edges)
+        return self.pyramid.segments_free(coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3])
+    
+    def _edges_blocked(self, edges):
+        # Kenarların engelli maskesi (is_segment_blocked'ın toplu sürümü): tüm kenarlar
+        # tek bir mesafe alanı / piramit sorgusuyla ya da hücre izlerinin tek okumasıyla
+        if not edges:
+            return np.zeros(0, dtype=bool)
+        if self.distance_field is not None:
+            coords = self._edge_coords(edges)
+            return ~self.distance_field.segments_clear(coords[:, 0], coords[:, 1], coords[:, 2],
+                                                       coords[:, 3], self.robot_radius)
+        if self.pyramid is not None:
+            return ~self._pyramid_segments_free(edges)
+        footprints = [self.segment_footprint(node1_id, node2_id) for node1_id, node2_id in edges]
+        starts = np.cumsum([0] + [cells.size for cells in footprints[:-1]])
+        occupied = self.hybrid_map.occupancy_grid.occupied_cells(np.concatenate(footprints))
+        return np.logical_or.reduceat(occupied, starts)
+    
+    def _edges_near_cells(self, edges, cells):
+        # Sınırlayıcı kutusu (bir hücre paylı) verilen hücrelerden birini içeren kenarlar
+        if not cells.size:
+            return []
+        grid = self.hybrid_map.occupancy_grid
+        grid_y, grid_x = np.divmod(cells, grid.cells_x)
+        px = ((grid_x + 0.5) * grid.resolution)[:, None]
+        py = ((grid_y + 0.5) * grid.resolution)[:, None]
+        coords = self._edge_coords(edges)
+        margin = grid.resolution
+        near = ((px >= np.minimum(coords[:, 0], coords[:, 2]) - margin)
+                & (px <= np.maximum(coords[:, 0], coords[:, 2]) + margin)
+                & (py >= np.minimum(coords[:, 1], coords[:, 3]) - margin)
+                & (py <= np.maximum(coords[:, 1], coords[:, 3]) + margin)).any(axis=0)
+        return [edge for edge, is_near in zip(edges, near) if is_near]
+    
+    def is_segment_blocked(self, node1_id, node2_id):
+        # İki node arasındaki doğru parçası üzerinde dolu hücre var mı
+        # (mesafe alanı açıksa: robot yarıçapı içinde engel var mı)
+        return bool(self._edges_blocked([(node1_id, node2_id)])[0])
+    
     def check_path_validity(self):
         # Mevcut yolun hala geçerli olup olmadığını kontrol et (engel yok)
+        if self.instrumentation is None:
+            return self._check_path_validity()
+        begin = time.perf_counter()
+        valid = self._check_path_validity()
+        self.instrumentation.record('nav.check_path_validity', time.perf_counter() - begin)
+        if not valid:
+            self.instrumentation.count('nav.invalid_paths')
+        return valid
+    
+    def _check_path_validity(self):
         if not self.current_path:
             return False
-        
-        # Yolun herhangi bir segmentinin engellenmişse kontrol et
-        for i in range(len(self.current_path) - 1):
-            node1 = self.hybrid_map.nodes[self.current_path[i]]
-            node2 = self.hybrid_map.nodes[self.current_path[i + 1]]
-            
-            # Segment boyunca noktaları kontrol et
-            segment_length = math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
-            steps = int(segment_length / 0.1) + 1  # Her 10cm'de bir kontrol et
-            
-            for j in range(steps):
-                ratio = j / steps
-                x = node1.x + ratio * (node2.x - node1.x)
-                y = node1.y + ratio * (node2.y - node1.y)
-                
-                # Eğer nokta doluysa, yol geçersiz
-                if self.hybrid_map.occupancy_grid.is_cell_occupied(x, y):
-                    return False
-        
+        if len(self.current_path) == 1:
+            return True
+        
+        grid = self.hybrid_map.occupancy_grid
+        path = tuple(self.current_path)
+        verified = self.verified_path
+        
+        # Yol daha önce doğrulanan yolun kendisi veya kalan kısmıysa sadece
+        # o zamandan beri dolu hale gelen hücrelerin yolun hücreleriyle kesişimine bakılır
+        if len(path) <= len(verified) and verified[len(verified) - len(path):] == path:
+            changes = grid.changes_since(self.verified_version)
+            if changes is not None and self.distance_field is not None:
+                # Yolun robot yarıçapı kadar yakınında yeni engel yoksa yol hâlâ geçerli
+                if self.instrumentation is not None:
+                    self.instrumentation.count('nav.validity_incremental')
+                    self.instrumentation.count('nav.validity_samples', changes[0].size)
+                if not changes[0].size or not self._cells_near_path(changes[0], path):
+                    self.verified_version = grid.change_version
+                    return True
+            elif changes is not None and self.pyramid is not None:
+                # Sadece sınırlayıcı kutusuna yeni dolu hücre düşen segmentler yeniden kontrol edilir
+                if self.instrumentation is not None:
+                    self.instrumentation.count('nav.validity_incremental')
+                    self.instrumentation.count('nav.validity_samples', changes[0].size)
+                edges = self._edges_near_cells(list(zip(path, path[1:])), changes[0])
+                if not edges or self._pyramid_segments_free(edges).all():
+                    self.verified_version = grid.change_version
+                    return True
+                self.verified_path = ()
+                return False
+            elif changes is not None:
+                if self.instrumentation is not None:
+                    self.instrumentation.count('nav.validity_incremental')
+                    self.instrumentation.count('nav.validity_samples', changes[0].size)
+                touched = [cell for cell in changes[0].tolist() if cell in self.verified_cells]
+                if not touched or not grid.occupied_cells(np.array(touched)).any():
+                    self.verified_version = grid.change_version
+                    return True
+                # Kesişen dolu hücre var - aşağıdaki tam kontrol karar verir
+                # (hücre yolun artık geride kalan bir kısmında olabilir)
+        
+        if self.distance_field is not None:
+            # Küre izleme: engellerden uzak segmentler birkaç okumayla doğrulanır
+            if self.instrumentation is not None:
+                self.instrumentation.count('nav.validity_full')
+            if not self._segments_clear(path).all():
+                self.verified_path = ()
+                return False
+            self.verified_path = path
+            self.verified_version = grid.change_version
+            return True
+        
+        if self.pyramid is not None:
+            # Kabadan inceye: boş bölgelerden geçen segmentler kaba seviyelerde elenir
+            if self.instrumentation is not None:
+                self.instrumentation.count('nav.validity_full')
+            if not self._pyramid_segments_free(list(zip(path, path[1:]))).all():
+                self.verified_path = ()
+                return False
+            self.verified_path = path
+            self.verified_version = grid.change_version
+            return True
+        
+        # Tam kontrol: tüm segment örnekleri tek bir vektörel okuma ile
+        footprint = self.path_footprint(path)
+        if self.instrumentation is not None:
+            self.instrumentation.count('nav.validity_full')
+            self.instrumentation.count('nav.validity_samples', footprint.size)
+        if grid.occupied_cells(footprint).any():
+            self.verified_path = ()
+            return False
+        self.verified_path = path
+        self.verified_cells = set(footprint.tolist())
+        self.verified_version = grid.change_version
         return True
     
+    def predicted_conflict(self, horizon, start=0.0):
+        # Yolun 'horizon' saniye içinde (en yüksek hızla) kat edilecek kısmı, hareketli bir
+        # engel izinin [start, horizon] aralığındaki tahmini konumlarına robot yarıçapından yakın mı
+        if self.tracker is None or not self.current_path or len(self.current_path) < 2:
+            return False
+        if not self.tracker.has_moving_tracks():
+            return False
+        nodes = self.hybrid_map.nodes
+        xs = [self.current_position[0]] + [nodes[node_id].x for node_id in self.current_path[1:]]
+        ys = [self.current_position[1]] + [nodes[node_id].y for node_id in self.current_path[1:]]
+        xs, ys = np.array(xs), np.array(ys)
+        lengths = np.hypot(np.diff(xs), np.diff(ys))
+        starts = np.concatenate([[0.0], np.cumsum(lengths)[:-1]])
+        # Ulaşılabilen segmentler; sonuncusu ulaşılabilen noktada kesilir
+        reach = self.max_linear_velocity * horizon
+        inside = starts < reach
+        ratio = np.minimum((reach - starts[inside]) / np.maximum(lengths[inside], 1e-12), 1.0)
+        x1, y1 = xs[:-1][inside], ys[:-1][inside]
+        x2 = x1 + ratio * (xs[1:][inside] - x1)
+        y2 = y1 + ratio * (ys[1:][inside] - y1)
+        clearance = self.robot_radius if self.robot_radius is not None else self.obstacle_threshold / 2
+        return bool(self.tracker.segments_blocked(x1, y1, x2, y2, horizon, clearance, start).any())
+    
+    def update_blocked_edges(self):
+        # Engel durumunu HybridMap kenarlarına yansıt; planlayıcılar bu değişikliklerden
+        # haberdar edilir (DStarLite sadece etkilenen kısmı yeniden hesaplar)
+        # Engeli kalkmış kenarları tekrar aç (yol haritası kurucusu varsa bunu
+        # refresh sırasında sadece değişen bölgeler için kendisi yapar)
+        blocked_edges = list(self.hybrid_map.blocked_edges) if self.roadmap is None else []
+        # Tüm engelli kenarlar tek bir toplu sorguyla
+        for edge, blocked in zip(blocked_edges, self._edges_blocked(blocked_edges)):
+            if not blocked:
+                self.hybrid_map.set_edge_blocked(*edge, False)
+        
+        # Mevcut yolda engellenen segmentleri işaretle
+        if self.current_path:
+            path_edges = list(zip(self.current_path, self.current_path[1:]))
+            for edge, blocked in zip(path_edges, self._edges_blocked(path_edges)):
+                if blocked:
+                    self.hybrid_map.set_edge_blocked(*edge, True)
+    
     def is_goal_reached(self):
         # Hedefe ulaşılıp ulaşılmadığını kontrol et
         if self.goal_position is None:
@@ -173,44 +551,58 @@ class NavigationSystem:
         
         # Keskin dönüşlerde ileri hızı azalt
         # Bu, hedefi geçmeyi önler
-        linear_velocity = 0.3 * max(0, 1 - abs(heading_error / math.pi))
+        linear_velocity = self.max_linear_velocity * max(0, 1 - abs(heading_error / math.pi))
+        
+        # Tahmin ufkunda hareketli engelle çakışma: waypoint'e dönülür ama ilerlenmez
+        if self.yielding:
+            linear_velocity = 0.0
+        
+        # Engellere yakınken yavaşla (mesafe alanından tek okuma)
+        if self.distance_field is not None:
+            clearance = self.distance_field.clearance(*self.current_position) - self.robot_radius
+            linear_velocity *= min(max(clearance / self.slowdown_distance, 0.2), 1.0)
         
         # Engel algılama ve kaçınma
-        # Önümüzde engel var mı kontrol et
-        for i, (angle, distance) in enumerate(self.obstacle_detector.get_sensor_data()):
-            if distance is None:  # Bu açıda okuma yok
-                continue
-                
-            # Robotun mevcut yönelimine göre nispi açı
-            relative_angle = angle - self.current_orientation
-            
-            # [-pi, pi] aralığına normalize et
-            while relative_angle > math.pi:
-                relative_angle -= 2 * math.pi
-            while relative_angle < -math.pi:
-                relative_angle += 2 * math.pi
+        # Önümüzde engel var mı kontrol et (tüm sensörler için vektörel)
+        angles, distances = self.obstacle_detector.get_sensor_arrays()
+        
+        # Robotun mevcut yönelimine göre nispi açı, [-pi, pi] aralığına normalize
+        relative_angles = np.mod(angles - self.current_orientation + math.pi, 2 * math.pi) - math.pi
+        
+        # Engel önde ve yakınsa, kaçınma hareketi yap (okuma olmayan NaN'lar elenir)
+        blocking = np.flatnonzero((np.abs(relative_angles) < 0.5) & (distances < self.obstacle_threshold))
+        if blocking.size:
+            # Engelden kaçınma - dur ve dön
+            linear_velocity = 0.0
             
-            # Engel önde ve yakınsa, kaçınma hareketi yap
-            if abs(relative_angle) < 0.5 and distance < self.obstacle_threshold:
-                # Engelden kaçınma - dur ve dön
-                linear_velocity = 0.0
-                
-                # Engelden uzağa dön
-                if relative_angle >= 0:
-                    angular_velocity = 0.5  # Sola dön
-                else:
-                    angular_velocity = -0.5  # Sağa dön
-                break
+            # Engelden uzağa dön
+            if relative_angles[blocking[0]] >= 0:
+                angular_velocity = 0.5  # Sola dön
+            else:
+                angular_velocity = -0.5  # Sağa dön
         
         return (linear_velocity, angular_velocity)
     
     def navigate_to_goal(self):
         # Ana navigasyon döngüsü
+        if self.instrumentation is None:
+            status = self._navigate_step()
+        else:
+            begin = time.perf_counter()
+            status = self._navigate_step()
+            self.instrumentation.record('nav.navigate_to_goal', time.perf_counter() - begin)
+        if self.recorder is not None:
+            self.recorder.navigate(self.current_path)
+        return status
+    
+    def _navigate_step(self):
         if not self.goal_position:
             return "Hedef ayarlanmadı"
         
         # Yol planlama veya yeniden planlama gerekiyor mu?
         if not self.current_path or not self.check_path_validity():
+            # Engellenen segmentleri haritada işaretle ki aynı yol tekrar planlanmasın
+            self.update_blocked_edges()
             success = self.plan_path()
             if not success:
                 # Yol bulunamadı ama vazgeçme
@@ -220,6 +612,18 @@ class NavigationSystem:
         if self.is_goal_reached():
             return "Hedefe ulaşıldı"
         
+        # Hareketli engel ufuk içinde yolu kesip ufkun sonunda yoldan çıkmış olacaksa (karşıdan
+        # karşıya geçiş) yeniden planlamadan bekle; ufkun sonunda hâlâ yoldaysa (aynı yönde ya
+        # da karşıdan gelen) beklemek çözüm değildir, robot ilerler ve reaktif kaçınma devrededir
+        if self.tracker is not None:
+            conflict = self.predicted_conflict(self.prediction_horizon) and \
+                not self.predicted_conflict(self.prediction_horizon, self.prediction_horizon)
+            self.yield_steps = self.yield_steps + 1 if conflict else 0
+            self.yielding = 0 < self.yield_steps <= self.max_yield_steps or \
+                (self.yield_steps > 0 and self.predicted_conflict(self.imminent_horizon))
+            if self.yielding and self.instrumentation is not None:
+                self.instrumentation.count('nav.yields')
+        
         # Hareket komutlarını hesapla
         linear_vel, angular_vel = self.calculate_movement_commands()
         
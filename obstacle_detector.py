@@ -1,63 +1,109 @@
 import math
+import time
 import numpy as np
 
-# Engel algılama sistemi - Ultrasonik/IR sensörleri kullanarak 
+# Engel algılama sistemi - Ultrasonik/IR sensörleri kullanarak
 # Kim ve Do [11] referansındaki hareketli engel algılama konseptini uygular
+# Okuma geçmişi önceden ayrılmış (history_size, sensör_sayısı) boyutlu bir halka
+# tamponda (ring buffer) tutulur; okuma olmayan sensörler NaN ile gösterilir.
+# Böylece 360-1080 ışınlı LiDAR benzeri sensörlerde de tüm işlemler vektöreldir.
 class ObstacleDetector:
-    def __init__(self, sensor_sayisi=8):
+    def __init__(self, sensor_sayisi=8, history_size=5):
         self.num_sensors = sensor_sayisi
         # Sensör açıları (radyan) - robotun çevresine eşit aralıklarla yerleştirilmiş
         self.sensor_angles = [2 * math.pi * i / sensor_sayisi for i in range(sensor_sayisi)]
-        self.previous_readings = [None] * sensor_sayisi  # Önceki sensör okumaları
-        self.current_readings = [None] * sensor_sayisi   # Mevcut sensör okumaları
-        
+        self.angle_array = np.array(self.sensor_angles)
+
         # Hareketli engel algılama için (Kim ve Do [11])
-        self.reading_history = [[] for _ in range(sensor_sayisi)]  # Son okumaları sakla
-        self.history_size = 5  # Her sensör için saklanacak okuma sayısı
-    
+        self.history_size = history_size  # Her sensör için saklanacak okuma sayısı
+        self.history = np.full((history_size, sensor_sayisi), np.nan)  # Son okumalar
+        self.history_count = 0  # Şimdiye kadar yazılan satır sayısı
+        self.latest_row = history_size - 1  # En son yazılan satır
+        
+        # İsteğe bağlı ölçüm katmanı (bkz. instrumentation.py)
+        self.instrumentation = None
+
     def update_readings(self, new_readings):
         # Sensör okumalarını güncelle ve hareketli engel tespiti için değişimleri takip et
+        # new_readings: liste (okuma yoksa None) veya NaN içerebilen float dizisi;
+        # dizi doğrudan halka tampondaki satıra yazılır, ara kopya oluşturulmaz
         if len(new_readings) != self.num_sensors:
             raise ValueError("Okuma sayısı sensör sayısıyla eşleşmeli")
-        
-        # Okumaları güncelle
-        self.previous_readings = self.current_readings.copy()
-        self.current_readings = new_readings
-        
-        # Her sensör için geçmişi güncelle
-        for i in range(self.num_sensors):
-            self.reading_history[i].append(new_readings[i])
-            # Geçmiş boyutu sınırlı tut
-            if len(self.reading_history[i]) > self.history_size:
-                self.reading_history[i].pop(0)
+
+        self.latest_row = (self.latest_row + 1) % self.history_size
+        if isinstance(new_readings, np.ndarray):
+            self.history[self.latest_row] = new_readings
+        else:
+            # None değerleri NaN'a dönüşür
+            self.history[self.latest_row] = np.array(new_readings, dtype=float)
+        self.history_count += 1
+
+    def _readings_list(self, row):
+        # Bir geçmiş satırını eski liste biçimine (okuma yoksa None) çevir
+        return [None if math.isnan(value) else value for value in self.history[row].tolist()]
+
+    @property
+    def current_readings(self):
+        # Mevcut sensör okumaları (liste)
+        if self.history_count == 0:
+            return [None] * self.num_sensors
+        return self._readings_list(self.latest_row)
+
+    @property
+    def previous_readings(self):
+        # Önceki sensör okumaları (liste)
+        if self.history_count < 2:
+            return [None] * self.num_sensors
+        return self._readings_list((self.latest_row - 1) % self.history_size)
+
+    def detect_moving_obstacles_array(self, threshold=0.2):
+        # Vektörel hareket tespiti: (sensör indeksleri, son mesafeler, varyanslar)
+        if self.instrumentation is None:
+            return self._detect(threshold)
+        begin = time.perf_counter()
+        result = self._detect(threshold)
+        self.instrumentation.record('detector.detect', time.perf_counter() - begin)
+        self.instrumentation.count('detector.moving_obstacles', result[0].size)
+        return result
     
+    def _detect(self, threshold):
+        count = min(self.history_count, self.history_size)
+        if count < 2:
+            # Hareket tespiti için en az 2 okuma gerekli
+            empty = np.empty(0)
+            return empty.astype(np.int64), empty, empty
+
+        # Tampon dolana kadar satırlar baştan itibaren doldurulur
+        window = self.history[:count]
+
+        # Geçmişinde okuma olmayan (NaN) sensörleri atla (engel tespit edilmedi)
+        complete = ~np.isnan(window).any(axis=0)
+
+        # Hareketi tespit etmek için okumalardaki varyansı hesapla
+        # Yüksek varyans hareket olduğunu gösterir
+        variance = np.zeros(self.num_sensors)
+        variance[complete] = np.var(window[:, complete], axis=0)
+        indices = np.flatnonzero(complete & (variance > threshold))
+        return indices, self.history[self.latest_row, indices], variance[indices]
+
     def detect_moving_obstacles(self, threshold=0.2):
         # Sensör okumalarındaki zamansal değişimleri analiz ederek hareketli engelleri tespit et
         # Kim ve Do [11]'den esinlenilmiştir
-        moving_obstacles = []
-        
-        for i in range(self.num_sensors):
-            history = self.reading_history[i]
-            if len(history) < 2:
-                continue  # Hareket tespiti için en az 2 okuma gerekli
-            
-            # None okumaları atla (engel tespit edilmedi)
-            if None in history:
-                continue
-                
-            # Hareketi tespit etmek için okumalardaki varyansı hesapla
-            variance = np.var(history)  # Yüksek varyans hareket olduğunu gösterir
-            
-            if variance > threshold:
-                # Hareket tespit edildi - açı, mesafe ve varyansı kaydet
-                moving_obstacles.append((self.sensor_angles[i], history[-1], variance))
-        
-        return moving_obstacles
-    
+        # Hareket tespit edildi - açı, mesafe ve varyansı kaydet
+        indices, distances, variances = self.detect_moving_obstacles_array(threshold)
+        return [(self.sensor_angles[i], distance, variance)
+                for i, distance, variance in zip(indices.tolist(), distances.tolist(), variances.tolist())]
+
+    def get_sensor_arrays(self):
+        # Sensör açıları ve mevcut mesafeler (okuma yoksa NaN) - kopyasız görünüm
+        if self.history_count == 0:
+            return self.angle_array, np.full(self.num_sensors, np.nan)
+        return self.angle_array, self.history[self.latest_row]
+
     def get_sensor_data(self):
         # Mevcut sensör okumalarını açılarıyla birlikte döndür
-        return [(self.sensor_angles[i], self.current_readings[i]) for i in range(self.num_sensors)]
-        
+        return list(zip(self.sensor_angles, self.current_readings))
+
     def visualize_obstacles(self):
         # Tespit edilen engellerin görselleştirilmesi için (ileride eklenebilir)
-        pass
\ No newline at end of file
+        pass
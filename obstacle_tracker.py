@@ -0,0 +1,200 @@
+import time
+import numpy as np
+
+# Sabit hız modeli: durum (x, y, vx, vy), ölçüm (x, y)
+_H = np.array([[1.0, 0.0, 0.0, 0.0], [0.0, 1.0, 0.0, 0.0]])
+
+
+# Hareketli engeller için hafif çok hedefli takipçi
+# Hareketli engel adayı ışınların uç noktaları (bkz. NavigationSystem.moving_obstacle_updates)
+# ışın sırasındaki boşluklara göre kümelenir (bir kişiye birden fazla ışın çarpar); her küme
+# bir ölçümdür. Her iz sabit hızlı bir Kalman filtresidir: ölçümler izlere Mahalanobis
+# kapısı (gate) içinde, en yakından başlayarak açgözlü eşleştirilir; eşleşmeyen ölçümden
+# yeni (geçici) iz açılır, confirm_hits güncellemede doğrulanır, max_misses güncelleme
+# görülmeyen iz silinir.
+# Hızı min_speed'i aşan doğrulanmış izler kısa ömürlü bir tahmin katmanı oluşturur:
+# segments_blocked, izlerin ufuk boyunca süpürdüğü bölgeyi (engel yarıçapı + konum
+# belirsizliği) segmentlerle karşılaştırır. Yavaş izler (ör. robot ilerlerken okuması
+# sıçrayan duvar kenarları) katmana girmez; bu ölçümler grid'e yazılmaya devam etmelidir
+# (update hangi noktaların hareketli bir ize ait olduğunu döndürür).
+class ObstacleTracker:
+    def __init__(self, dt=0.2, gate=9.21, cluster_radius=0.4, confirm_hits=2, max_misses=3,
+                 obstacle_radius=0.5, min_speed=0.15, process_noise=0.5, measurement_noise=0.1):
+        self.dt = dt                            # Güncellemeler arası süre (saniye)
+        self.gate = gate                        # Mahalanobis mesafesi karesi (2 serbestlik, %99)
+        self.cluster_radius = cluster_radius    # Aynı engele ait sayılan uç noktaların uzaklığı
+        self.confirm_hits = confirm_hits
+        self.max_misses = max_misses
+        # Ölçüm noktası engelin robota bakan yüzeyindedir: yarıçap merkezden değil bu noktadan
+        # ölçülür (0.3m yarıçaplı bir kişinin arka yüzü ~0.6m geride)
+        self.obstacle_radius = obstacle_radius
+        self.min_speed = min_speed              # Bu hızın altındaki izler sabit sayılır (m/s)
+
+        self.transition = np.eye(4)
+        self.transition[0, 2] = self.transition[1, 3] = dt
+        # Ayrık beyaz gürültülü ivme modeli
+        q = process_noise ** 2
+        self.process_cov = q * np.array([[dt ** 4 / 4, 0, dt ** 3 / 2, 0],
+                                         [0, dt ** 4 / 4, 0, dt ** 3 / 2],
+                                         [dt ** 3 / 2, 0, dt ** 2, 0],
+                                         [0, dt ** 3 / 2, 0, dt ** 2]])
+        self.measurement_cov = np.eye(2) * measurement_noise ** 2
+        self.initial_cov = np.diag([measurement_noise ** 2, measurement_noise ** 2, 1.0, 1.0])
+
+        # İzler (satır başına bir iz)
+        self.states = np.empty((0, 4))
+        self.covariances = np.empty((0, 4, 4))
+        self.hits = np.empty(0, dtype=np.int64)
+        self.misses = np.empty(0, dtype=np.int64)
+
+        # İstatistikler
+        self.updates = 0
+        self.tracks_created = 0
+        self.tracks_deleted = 0
+
+        # İsteğe bağlı ölçüm katmanı (bkz. instrumentation.py)
+        self.instrumentation = None
+
+    def update(self, xs, ys):
+        # Tek tarama: izleri bir adım ilerlet ve hareketli uç noktalarla (dünya koordinatı) düzelt
+        # Dönüş: nokta başına, hareketli (doğrulanmış ve min_speed'ten hızlı) bir ize ait mi
+        if self.instrumentation is None:
+            return self._update(xs, ys)
+        begin = time.perf_counter()
+        tracked = self._update(xs, ys)
+        self.instrumentation.record('tracker.update', time.perf_counter() - begin)
+        self.instrumentation.count('tracker.measurements', np.size(xs))
+        return tracked
+
+    def _update(self, xs, ys):
+        self.updates += 1
+        if not len(self.states) and not np.size(xs):
+            return np.zeros(0, dtype=bool)
+        F = self.transition
+        self.states = self.states @ F.T
+        self.covariances = F @ self.covariances @ F.T + self.process_cov
+
+        measurements, labels = self._cluster(np.asarray(xs, dtype=float), np.asarray(ys, dtype=float))
+        matched_tracks, matched_measurements = self._associate(measurements)
+
+        if matched_tracks.size:
+            P = self.covariances[matched_tracks]
+            S = _H @ P @ _H.T + self.measurement_cov
+            gain = P @ _H.T @ np.linalg.inv(S)
+            innovation = measurements[matched_measurements] - self.states[matched_tracks, :2]
+            self.states[matched_tracks] += np.einsum('nij,nj->ni', gain, innovation)
+            self.covariances[matched_tracks] = (np.eye(4) - gain @ _H) @ P
+
+        matched = np.zeros(len(self.states), dtype=bool)
+        matched[matched_tracks] = True
+        self.hits[matched] += 1
+        self.misses[matched] = 0
+        self.misses[~matched] += 1
+
+        # Hareketli ize eşleşen ölçümler (silme ve yeni izlerden önce, indeksler geçerliyken)
+        moving = self._moving()
+        tracked_measurements = np.zeros(len(measurements), dtype=bool)
+        tracked_measurements[matched_measurements[moving[matched_tracks]]] = True
+        keep = self.misses <= self.max_misses
+        self.tracks_deleted += int((~keep).sum())
+        self.states, self.covariances = self.states[keep], self.covariances[keep]
+        self.hits, self.misses = self.hits[keep], self.misses[keep]
+
+        # Eşleşmeyen ölçümlerden hızı bilinmeyen yeni izler
+        unmatched = np.ones(len(measurements), dtype=bool)
+        unmatched[matched_measurements] = False
+        new = measurements[unmatched]
+        if len(new):
+            states = np.zeros((len(new), 4))
+            states[:, :2] = new
+            self.states = np.concatenate([self.states, states])
+            self.covariances = np.concatenate([self.covariances,
+                                               np.broadcast_to(self.initial_cov, (len(new), 4, 4))])
+            self.hits = np.concatenate([self.hits, np.ones(len(new), dtype=np.int64)])
+            self.misses = np.concatenate([self.misses, np.zeros(len(new), dtype=np.int64)])
+            self.tracks_created += len(new)
+        return tracked_measurements[labels]
+
+    def _cluster(self, xs, ys):
+        # Uç noktalar ışın (açı) sırasında gelir: ardışık iki nokta arasındaki boşluk
+        # cluster_radius'u aşınca yeni küme başlar; her küme tek ölçümdür (ağırlık merkezi)
+        # Işınlar tam tur döndüğünden son küme ilk kümeye değiyorsa ikisi birleştirilir
+        # Dönüş: (ölçümler (m, 2), nokta başına küme numarası)
+        if not xs.size:
+            return np.empty((0, 2)), np.empty(0, dtype=np.int64)
+        gaps = np.hypot(np.diff(xs), np.diff(ys)) > self.cluster_radius
+        labels = np.concatenate([[0], np.cumsum(gaps)])
+        if labels[-1] > 0 and np.hypot(xs[-1] - xs[0], ys[-1] - ys[0]) <= self.cluster_radius:
+            labels[labels == labels[-1]] = 0
+        counts = np.bincount(labels)
+        measurements = np.stack([np.bincount(labels, xs), np.bincount(labels, ys)], axis=1)
+        return measurements[counts > 0] / counts[counts > 0, None], labels
+
+    def _associate(self, measurements):
+        # Kapı içindeki (iz, ölçüm) çiftlerini Mahalanobis mesafesine göre açgözlü eşleştir
+        empty = np.empty(0, dtype=np.int64)
+        if not len(self.states) or not len(measurements):
+            return empty, empty
+        S = _H @ self.covariances @ _H.T + self.measurement_cov
+        innovation = measurements[None, :, :] - self.states[:, None, :2]
+        distance = np.einsum('nmi,nij,nmj->nm', innovation, np.linalg.inv(S), innovation)
+        tracks, candidates = np.nonzero(distance <= self.gate)
+        order = np.argsort(distance[tracks, candidates], kind='stable')
+        used_tracks, used_measurements = set(), set()
+        matched_tracks, matched_measurements = [], []
+        for track, measurement in zip(tracks[order].tolist(), candidates[order].tolist()):
+            if track in used_tracks or measurement in used_measurements:
+                continue
+            used_tracks.add(track)
+            used_measurements.add(measurement)
+            matched_tracks.append(track)
+            matched_measurements.append(measurement)
+        return np.array(matched_tracks, dtype=np.int64), np.array(matched_measurements, dtype=np.int64)
+
+    def _moving(self):
+        # Doğrulanmış ve hızı min_speed'i aşan izler
+        speed = np.hypot(self.states[:, 2], self.states[:, 3])
+        return (self.hits >= self.confirm_hits) & (speed >= self.min_speed)
+
+    def has_moving_tracks(self):
+        return bool(len(self.states)) and bool(self._moving().any())
+
+    def moving_tracks(self):
+        # Hareketli izlerin (konum, hız, konum belirsizliği std) dizileri
+        mask = self._moving()
+        states = self.states[mask]
+        sigma = np.sqrt(np.maximum(self.covariances[mask, 0, 0], self.covariances[mask, 1, 1]))
+        return states[:, :2], states[:, 2:], sigma
+
+    def near_moving_tracks(self, xs, ys):
+        # Nokta başına: hareketli bir izin bir sonraki taramadaki tahmini konumuna engel
+        # yarıçapı + 2 sigma'dan yakın mı (varyansı düşük ışınlar da ize eşleşebilsin diye)
+        xs, ys = np.asarray(xs, dtype=float), np.asarray(ys, dtype=float)
+        positions, velocities, sigma = self.moving_tracks()
+        if not len(positions) or not xs.size:
+            return np.zeros(xs.size, dtype=bool)
+        predicted = positions + velocities * self.dt
+        distance = np.hypot(xs[:, None] - predicted[:, 0], ys[:, None] - predicted[:, 1])
+        return (distance <= self.obstacle_radius + 2 * sigma).any(axis=1)
+
+    def segments_blocked(self, x1, y1, x2, y2, horizon, clearance=0.0, start=0.0):
+        # Her segment için: hareketli bir iz önümüzdeki [start, horizon] saniyeleri içinde segmente
+        # engel yarıçapı + clearance + 2 sigma'dan yakın geçiyor mu (dt aralıklı örneklerle)
+        x1, y1 = np.atleast_1d(np.asarray(x1, dtype=float)), np.atleast_1d(np.asarray(y1, dtype=float))
+        x2, y2 = np.atleast_1d(np.asarray(x2, dtype=float)), np.atleast_1d(np.asarray(y2, dtype=float))
+        positions, velocities, sigma = self.moving_tracks()
+        if not len(positions) or not x1.size:
+            return np.zeros(x1.size, dtype=bool)
+        times = np.arange(start, horizon + 1e-9, self.dt)
+        px = (positions[:, 0, None] + velocities[:, 0, None] * times).reshape(-1, 1)
+        py = (positions[:, 1, None] + velocities[:, 1, None] * times).reshape(-1, 1)
+        radius = np.repeat(self.obstacle_radius + clearance + 2 * sigma, times.size)[:, None]
+        dx, dy = x2 - x1, y2 - y1
+        length_sq = np.maximum(dx * dx + dy * dy, 1e-12)
+        ratio = np.clip(((px - x1) * dx + (py - y1) * dy) / length_sq, 0.0, 1.0)
+        distance = np.hypot(x1 + ratio * dx - px, y1 + ratio * dy - py)
+        return (distance <= radius).any(axis=0)
+
+    def stats(self):
+        return {'tracks': len(self.states), 'moving': int(self._moving().sum()),
+                'updates': self.updates, 'created': self.tracks_created, 'deleted': self.tracks_deleted}
@@ -1,21 +1,60 @@
 import numpy as np
 import math
+import time
+from collections import deque
+from grid_storage import STORAGE_TYPES, DenseProbabilityStorage
+from distance_field import DistanceField
+from occupancy_pyramid import OccupancyPyramid
+from ray_tables import traverse_rays, ray_table
 
 # Occupancy Grid Mapping algoritması
 # Moravec ve Elfes [12]'in yaklaşımı temel alınmıştır
 # Meyer-Delius vd. [13]'in dinamik ortam değişikliği geliştirmeleri eklenmiştir
 class OccupancyGrid:
-    def __init__(self, width, height, resolution=0.1):
+    def __init__(self, width, height, resolution=0.1, storage='probability', storage_options=None):
         # Grid'i bilinmeyen olasılıklarla (0.5) başlat
         self.width = width
         self.height = height
         self.resolution = resolution  # metre/hücre
-        self.grid = np.ones((int(height/resolution), int(width/resolution))) * 0.5
         self.cells_x = int(width/resolution)
         self.cells_y = int(height/resolution)
         
+        # Hücre depolama: 'probability' (yoğun olasılık, anlık bozunma),
+        # 'log_odds' (tembel, adım damgalı bozunma) veya 'tiled' (seyrek döşemeler,
+        # storage_options ile ör. {'tile_size': 32, 'cell_type': 'uint8'})
+        # Hazır bir depolama nesnesi de verilebilir (ör. diskten yüklenen harita)
+        if not isinstance(storage, str):
+            self.storage = storage
+        elif storage in STORAGE_TYPES:
+            self.storage = STORAGE_TYPES[storage](self.cells_y, self.cells_x, **(storage_options or {}))
+        else:
+            raise ValueError(f"Bilinmeyen grid depolama türü: {storage}")
+        
         # Dinamik ortam güncelleme parametreleri (Meyer-Delius [13])
         self.decay_factor = 0.01  # Kesinliğin zamanla azalma oranı
+        
+        # Değişiklik günlüğü: her güncellemede doluluk eşiğini geçen hücreler
+        # Tüketiciler (ör. yol geçerlilik kontrolü) son gördükleri sürümden bu yana
+        # değişen hücreleri sorar; günlük taşarsa tam kontrol yapmaları gerekir
+        # Zaman bozunması olasılıkları 0.5'e çektiği için hiçbir hücreyi dolu yapamaz,
+        # ama dolu hücreleri eşiğin altına düşürebilir. Geçiş dinleyicisi varsa bunu
+        # hücreleri taramadan yakalamak için her dolu yazmada hücrenin eşiğin altına
+        # ineceği bozunma adımı hesaplanır ve o adımın kovasına eklenir (bkz. _schedule_expiry)
+        self.occupied_threshold = 0.7
+        self.change_version = 0
+        self.change_log = deque(maxlen=64)  # (sürüm, dolu olan hücreler, boşalan hücreler)
+        self.decay_tick = 0
+        self._expiry = {}  # bozunma adımı -> o adımda kontrol edilecek hücre dizileri
+        
+        # Eşik geçişlerinden anında haberdar edilecek nesneler
+        # Her dinleyici on_cells_changed(dolu_olanlar, boşalanlar) metoduna sahip olmalı
+        self.change_listeners = []
+        self.distance_field = None  # enable_distance_field ile açılır
+        self.pyramid = None         # enable_pyramid ile açılır
+        self.ray_table = None       # enable_ray_table ile açılır
+        
+        # İsteğe bağlı ölçüm katmanı (bkz. instrumentation.py); None iken ölçüm yapılmaz
+        self.instrumentation = None
     
     def update_cell(self, x, y, occupied, sensor_accuracy=0.9):
         # Sensör okuması kullanarak grid hücresini Bayes güncellemesi ile güncelle
@@ -24,7 +63,7 @@ class OccupancyGrid:
         grid_y = min(max(int(y / self.resolution), 0), self.cells_y - 1)
         
         # Mevcut olasılık
-        p_current = self.grid[grid_y, grid_x]
+        p_current = self.storage.read_cell(grid_y, grid_x)
         
         # Bayes güncelleme kuralı
         if occupied:
@@ -36,46 +75,313 @@ class OccupancyGrid:
             p_new = ((1 - sensor_accuracy) * p_current) / \
                    ((1 - sensor_accuracy) * p_current + sensor_accuracy * (1 - p_current))
         
-        self.grid[grid_y, grid_x] = p_new
+        self.storage.write_cell(grid_y, grid_x, p_new)
+        
+        # Doluluk eşiği geçildiyse değişiklik günlüğüne yaz
+        cell = np.array([grid_y * self.cells_x + grid_x])
+        was_occupied = p_current >= self.occupied_threshold
+        now_occupied = p_new >= self.occupied_threshold
+        if now_occupied and self.change_listeners:
+            self._schedule_expiry(cell, np.array([p_new]))
+        if was_occupied != now_occupied:
+            empty = cell[:0]
+            self._record_changes(empty if was_occupied else cell, cell if was_occupied else empty)
     
-    def update_from_sensor_data(self, robot_pos, sensor_readings):
-        # Bir dizi sensör okumasından grid'i güncelle (mesafeler ve açılar)
-        robot_x, robot_y = robot_pos
+    def update_cells(self, xs, ys, occupied, sensor_accuracy=0.9):
+        # update_cell'in toplu (vektörel) sürümü
+        # xs, ys dünya koordinatları; occupied ve sensor_accuracy skaler veya dizi olabilir
+        flat_indices, delta = self._cell_updates(xs, ys, occupied, sensor_accuracy)
+        if flat_indices.size:
+            self._apply_log_odds(flat_indices, delta)
+    
+    def world_to_flat(self, xs, ys):
+        # Dünya koordinatlarını düz hücre indekslerine çevir
+        # update_cell ve is_cell_occupied ile aynı şekilde grid sınırlarına kırpılır
+        xs = np.asarray(xs, dtype=float).ravel()
+        ys = np.asarray(ys, dtype=float).ravel()
+        grid_x = np.clip((xs / self.resolution).astype(np.int64), 0, self.cells_x - 1)
+        grid_y = np.clip((ys / self.resolution).astype(np.int64), 0, self.cells_y - 1)
+        return grid_y * self.cells_x + grid_x
+    
+    def _cell_updates(self, xs, ys, occupied, sensor_accuracy):
+        # Dünya koordinatlarını düz hücre indekslerine ve log-odds artışlarına çevir
+        flat_indices = self.world_to_flat(xs, ys)
+        
+        occupied = np.broadcast_to(np.asarray(occupied, dtype=bool), flat_indices.shape)
+        accuracy = np.broadcast_to(np.asarray(sensor_accuracy, dtype=float), flat_indices.shape)
+        
+        # Bayes güncellemesi log-odds uzayında toplamsaldır:
+        # dolu için +log(a/(1-a)), boş için -log(a/(1-a))
+        delta = np.log(accuracy / (1 - accuracy))
+        return flat_indices, np.where(occupied, delta, -delta)
+    
+    def _apply_log_odds(self, flat_indices, delta):
+        # Aynı hücreye düşen tüm güncellemeleri topla ve tek seferde uygula
+        # Ardışık Bayes güncellemeleri log-odds'ta toplandığı için sıra sonucu değiştirmez
+        cells, inverse = np.unique(flat_indices, return_inverse=True)
+        total = np.bincount(inverse, weights=delta)
+        p_old, p_new = self.storage.add_log_odds(cells, total)
+        if self.instrumentation is not None:
+            self.instrumentation.count('grid.cells_updated', cells.size)
+        
+        # Doluluk eşiğini geçen hücreleri günlüğe yaz
+        was_occupied = p_old >= self.occupied_threshold
+        now_occupied = p_new >= self.occupied_threshold
+        if self.change_listeners and now_occupied.any():
+            self._schedule_expiry(cells[now_occupied], p_new[now_occupied])
+        crossed = was_occupied != now_occupied
+        if crossed.any():
+            self._record_changes(cells[crossed & now_occupied], cells[crossed & was_occupied])
+    
+    def _record_changes(self, became_occupied, became_free):
+        self.change_version += 1
+        self.change_log.append((self.change_version, became_occupied, became_free))
+        for listener in self.change_listeners:
+            listener.on_cells_changed(became_occupied, became_free)
+    
+    def add_change_listener(self, listener):
+        # Doluluk eşiği geçişlerini (yazma ve bozunma kaynaklı) alacak nesneyi kaydet
+        if not self.change_listeners:
+            # Bozunma takibi ilk dinleyiciyle başlar: mevcut dolu hücreleri zamanla
+            p = self.to_probability().ravel()
+            occupied = np.flatnonzero(p >= self.occupied_threshold)
+            if occupied.size:
+                self._schedule_expiry(occupied, p[occupied])
+        self.change_listeners.append(listener)
+    
+    def _schedule_expiry(self, cells, p):
+        # Dolu hücrelerin bozunmayla eşiğin altına ineceği adımı hesapla:
+        # k adım sonra p_k = 0.5 + (1 - d)^k (p - 0.5) < eşik  =>  k > log(...) / log(1 - d)
+        # Hücre bu arada tekrar yazılırsa yeni kaydı da olur; eski kayıt kontrolde elenir
+        retention = 1.0 - self.decay_factor
+        if not 0.0 < retention < 1.0:
+            return
+        with np.errstate(divide='ignore'):
+            steps = np.log((self.occupied_threshold - 0.5) / (p - 0.5)) / math.log(retention)
+        ticks = self.decay_tick + np.floor(steps).astype(np.int64) + 1
+        order = np.argsort(ticks, kind='stable')
+        ticks, cells = ticks[order], cells[order]
+        starts = np.flatnonzero(np.r_[True, ticks[1:] != ticks[:-1]])
+        for start, end in zip(starts, np.r_[starts[1:], ticks.size]):
+            self._expiry.setdefault(int(ticks[start]), []).append(cells[start:end])
+    
+    def _expire(self, later_steps=0):
+        # Bu bozunma adımında eşiğin altına inmesi beklenen hücreleri kontrol et
+        # later_steps: depolamaya bu adımdan sonra zaten uygulanmış bozunma adımları
+        due = self._expiry.pop(self.decay_tick, None)
+        if due is None:
+            return
+        cells = np.unique(np.concatenate(due))
+        p = self.storage.read(cells)
+        freed = p < self.occupied_threshold
+        if not freed.all():
+            # Yeniden yazılmış veya yuvarlama nedeniyle hâlâ dolu: tekrar zamanla
+            self._schedule_expiry(cells[~freed], p[~freed])
+        if freed.any():
+            # Bir önceki adımda zaten boş olanlar (arada boş okumayla eşiğin altına inip
+            # eski zamanlaması kalanlar) bildirilmiş durumda: sadece bu adımda boşalanlar
+            retention = 1.0 - self.decay_factor
+            previous = 0.5 + (p[freed] - 0.5) / retention ** (later_steps + 1)
+            freed_cells = cells[freed][previous >= self.occupied_threshold]
+            if freed_cells.size:
+                self._record_changes(cells[:0], freed_cells)
+    
+    def changes_since(self, version):
+        # Verilen sürümden bu yana (dolu olan, boşalan) hücre indeksleri
+        # Günlük o kadar eskiye gitmiyorsa None döner (tam kontrol gerekir)
+        empty = np.empty(0, dtype=np.int64)
+        if version == self.change_version:
+            return empty, empty
+        if not self.change_log or self.change_log[0][0] > version + 1:
+            return None
+        entries = [entry for entry in self.change_log if entry[0] > version]
+        return (np.concatenate([entry[1] for entry in entries]),
+                np.concatenate([entry[2] for entry in entries]))
+    
+    def _trace_rays(self, origin_x, origin_y, angles, distances, max_range=4.0, angle_indices=None):
+        # Tüm ışınlar için grid geçişini (Amanatides-Woo) aynı anda hesapla
+        # angle_indices verilirse ışınlar ray_table'dan izlenir (açılar tablodaki sıralarıyla)
+        # Her ışının geçtiği hücreler yalnızca bir kez sayılır
+        # Dönüş: (boş hücre indeksleri, dolu hücre indeksleri) - düz (flat) indeksler
+        lengths = np.minimum(distances, max_range)
+        if angle_indices is None:
+            cell_x, cell_y, offset_x, offset_y, exits = traverse_rays(
+                origin_x, origin_y, angles, self.resolution, max_range)
+        else:
+            cell_x, cell_y, offset_x, offset_y, exits = self.ray_table.trace(
+                origin_x, origin_y, angle_indices)
         
-        for angle, distance in sensor_readings:
-            if distance is None or distance > 4.0:  # Maksimum sensör menzili
+        # Her kesişimden sonra bulunulan hücre (başlangıç hücresi sütun 0); ölçülen
+        # mesafeden önceki kesişimler ışın boyunca bir ön ek oluşturur
+        crossed = exits < lengths[:, None]
+        path_x = cell_x[:, None] + offset_x
+        path_y = cell_y[:, None] + offset_y
+        
+        # Son hücre (algılanan nokta) hariç geçilen tüm hücreler boştur
+        num_crossed = crossed.sum(axis=1)
+        free_mask = np.arange(path_x.shape[1])[None, :] < num_crossed[:, None]
+        rows = np.arange(len(distances))
+        hit_x = path_x[rows, num_crossed]
+        hit_y = path_y[rows, num_crossed]
+        
+        # Sadece menzil içindeki ölçümler dolu hücre üretir
+        hit_mask = distances < max_range
+        free_cells = self._flat_inside(path_x[free_mask], path_y[free_mask])
+        hit_cells = self._flat_inside(hit_x[hit_mask], hit_y[hit_mask])
+        return free_cells, hit_cells
+    
+    def _flat_inside(self, grid_x, grid_y):
+        # Harita dışındaki hücreleri at ve düz indekse çevir
+        inside = (grid_x >= 0) & (grid_x < self.cells_x) & (grid_y >= 0) & (grid_y < self.cells_y)
+        return grid_y[inside] * self.cells_x + grid_x[inside]
+    
+    def _scan_arrays(self, sensor_readings):
+        # Tarama verisini (açılar, mesafeler) dizilerine çevir
+        # Kabul edilen biçimler: [(açı, mesafe), ...] (okuma yoksa None)
+        # veya (açılar, mesafeler) numpy dizi çifti (okuma yoksa NaN)
+        if isinstance(sensor_readings, tuple) and len(sensor_readings) == 2 \
+                and isinstance(sensor_readings[0], np.ndarray):
+            angles, distances = sensor_readings
+            return np.asarray(angles, dtype=float), np.asarray(distances, dtype=float)
+        if not sensor_readings:
+            return np.empty(0), np.empty(0)
+        angles, distances = zip(*sensor_readings)
+        return np.array(angles, dtype=float), np.array(distances, dtype=float)
+    
+    def update_from_scans(self, scans, extra_updates=None, sensor_accuracy=0.9, max_range=4.0):
+        # Bir veya birden fazla taramayı tek bir toplu güncelleme olarak uygula
+        # scans: (robot_pos, sensor_readings) çiftleri
+        # extra_updates: aynı partiye eklenecek (xs, ys, occupied, sensor_accuracy) işaretlemeleri
+        instrumentation = self.instrumentation
+        if instrumentation is not None:
+            begin = time.perf_counter()
+        flat_indices, delta, num_rays = self.trace_scans(scans, sensor_accuracy, max_range)
+        self.apply_updates(flat_indices, delta, extra_updates)
+        if instrumentation is not None:
+            instrumentation.record('grid.update', time.perf_counter() - begin)
+            instrumentation.count('grid.scans', len(scans))
+            instrumentation.count('grid.rays', num_rays)
+    
+    def trace_scans(self, scans, sensor_accuracy=0.9, max_range=4.0):
+        # Taramaları hücre güncellemelerine çevir; grid'i okumaz ve değiştirmez
+        # (sensor_pipeline.py ışın izlemeyi grid kilidi dışında yapar)
+        # Dönüş: (düz hücre indeksleri, log-odds artışları, ışın sayısı)
+        # Işınlar iki grupta toplanır: açıları ray_table ile aynı olan taramalar tablodan
+        # (açı sıra numarasıyla), diğerleri kesin izlemeyle
+        groups = {'exact': ([], [], [], []), 'table': ([], [], [], [])}
+        num_rays = 0
+        for robot_pos, sensor_readings in scans:
+            angles, distances = self._scan_arrays(sensor_readings)
+            # Okuma olmayan (None/NaN) ve maksimum sensör menzilini aşan ışınları atla
+            valid = distances <= max_range
+            if not valid.any():
+                continue
+            if self.ray_table is not None and self.ray_table.matches(angles, self.resolution, max_range):
+                origins_x, origins_y, ray_angles, ray_distances = groups['table']
+                ray_angles.append(np.flatnonzero(valid))
+            else:
+                origins_x, origins_y, ray_angles, ray_distances = groups['exact']
+                ray_angles.append(angles[valid])
+            ray_distances.append(distances[valid])
+            origins_x.append(np.full(ray_angles[-1].size, float(robot_pos[0])))
+            origins_y.append(np.full(ray_angles[-1].size, float(robot_pos[1])))
+            num_rays += ray_angles[-1].size
+        
+        cells = []
+        for group, (origins_x, origins_y, ray_angles, ray_distances) in groups.items():
+            if not ray_angles:
                 continue
-                
-            # Algılanan noktanın koordinatlarını hesapla
-            x = robot_x + distance * math.cos(angle)
-            y = robot_y + distance * math.sin(angle)
-            
-            # Işın boyunca engele kadar olan hücreleri boş olarak işaretle
-            ray_length = min(distance, 4.0)  # Sensör menziline kadar sınırla
-            steps = int(ray_length / (self.resolution * 0.5))
-            
-            for i in range(steps):
-                # Işın boyunca noktayı hesapla
-                ratio = i / steps
-                ray_x = robot_x + ratio * ray_length * math.cos(angle)
-                ray_y = robot_y + ratio * ray_length * math.sin(angle)
-                
-                # Boş alan olarak işaretle (dolu değil)
-                if i < steps - 1:  # Son nokta hariç tüm noktalar
-                    self.update_cell(ray_x, ray_y, occupied=False)
-            
-            # Gerçekte algılanan noktayı dolu olarak işaretle
-            if distance < 4.0:  # Sadece menzil içindeyse
-                self.update_cell(x, y, occupied=True)
-    
-    def apply_time_decay(self):
+            ray_angles = np.concatenate(ray_angles)
+            if group == 'table':
+                cells.append(self._trace_rays(np.concatenate(origins_x), np.concatenate(origins_y), None,
+                                              np.concatenate(ray_distances), max_range, ray_angles))
+            else:
+                cells.append(self._trace_rays(np.concatenate(origins_x), np.concatenate(origins_y),
+                                              ray_angles, np.concatenate(ray_distances), max_range))
+        if not cells:
+            return np.empty(0, dtype=np.int64), np.empty(0), 0
+        free_cells = np.concatenate([free for free, _ in cells])
+        hit_cells = np.concatenate([hit for _, hit in cells])
+        l_occ = math.log(sensor_accuracy / (1 - sensor_accuracy))
+        delta = np.concatenate([np.full(free_cells.size, -l_occ), np.full(hit_cells.size, l_occ)])
+        return np.concatenate([free_cells, hit_cells]), delta, num_rays
+    
+    def apply_updates(self, flat_indices, delta, extra_updates=None):
+        # trace_scans çıktısını (ve varsa ek işaretlemeleri) tek partide uygula
+        if extra_updates is not None:
+            extra_cells, extra_delta = self._cell_updates(*extra_updates)
+            flat_indices = np.concatenate([flat_indices, extra_cells])
+            delta = np.concatenate([delta, extra_delta])
+        if flat_indices.size:
+            self._apply_log_odds(flat_indices, delta)
+    
+    def update_from_sensor_data(self, robot_pos, sensor_readings, extra_updates=None):
+        # Bir dizi sensör okumasından grid'i güncelle (mesafeler ve açılar)
+        # Tüm ışınlar tek seferde izlenir ve güncellemeler toplu olarak uygulanır
+        self.update_from_scans([(robot_pos, sensor_readings)], extra_updates)
+    
+    def apply_time_decay(self, steps=1):
         # Dinamik ortamları dikkate almak için zaman tabanlı bozunma uygula
         # Meyer-Delius vd. [13] tarafından önerildiği gibi
         # Olasılıkları belirsizliğe (0.5) doğru hareket ettir
-        self.grid = self.grid + self.decay_factor * (0.5 - self.grid)
+        # 'log_odds' depolamada bozunma hücreye dokunulduğunda uygulanır
+        # steps > 1: birleştirilmiş taramalar için birden fazla adım tek seferde
+        if self.instrumentation is not None:
+            begin = time.perf_counter()
+        self.storage.decay(self.decay_factor, steps)
+        end_tick = self.decay_tick + steps
+        while self.decay_tick < end_tick:
+            self.decay_tick += 1
+            self._expire(end_tick - self.decay_tick)
+        if self.instrumentation is not None:
+            self.instrumentation.record('grid.decay', time.perf_counter() - begin)
     
     def is_cell_occupied(self, x, y, threshold=0.7):
         # Bir hücrenin olasılık eşiğine göre dolu kabul edilip edilmediğini kontrol et
         grid_x = min(max(int(x / self.resolution), 0), self.cells_x - 1)
         grid_y = min(max(int(y / self.resolution), 0), self.cells_y - 1)
-        return self.grid[grid_y, grid_x] >= threshold
\ No newline at end of file
+        return self.storage.read_cell(grid_y, grid_x) >= threshold
+    
+    def occupied_cells(self, flat_indices, threshold=None):
+        # Verilen düz indekslerdeki hücrelerin doluluk maskesi (vektörel is_cell_occupied)
+        if threshold is None:
+            threshold = self.occupied_threshold
+        return self.storage.read(flat_indices) >= threshold
+    
+    def enable_distance_field(self, max_distance=1.0):
+        # En yakın dolu hücreye olan mesafe alanını aç (bkz. distance_field.py)
+        # Alan eşik geçişleriyle artımlı güncellenir; max_distance ötesi hesaplanmaz
+        if self.distance_field is None or self.distance_field.max_distance < max_distance:
+            if self.distance_field is not None:
+                self.change_listeners.remove(self.distance_field)
+            self.distance_field = DistanceField(self, max_distance)
+        return self.distance_field
+    
+    def enable_pyramid(self):
+        # Kabadan inceye segment/kutu sorguları için doluluk piramidini aç (bkz. occupancy_pyramid.py)
+        if self.pyramid is None:
+            self.pyramid = OccupancyPyramid(self)
+        return self.pyramid
+    
+    def enable_ray_table(self, angles, max_range=4.0, subdivisions=4):
+        # Sabit sensör açıları için önceden hesaplanmış ışın tablolarını aç (bkz. ray_tables.py)
+        # Açıları bu tabloyla aynı olan taramalar tablodan izlenir; tablo aynı sensör
+        # düzenine sahip grid'ler arasında paylaşılır
+        self.ray_table = ray_table(angles, self.resolution, max_range, subdivisions)
+        return self.ray_table
+    
+    def to_probability(self):
+        # Tüm grid'in güncel olasılıklarını yoğun bir dizi olarak döndür
+        return self.storage.to_probability()
+    
+    def memory_report(self):
+        # Depolamanın bellek kullanımı (döşemeli depolamada döşeme başına ayrıntılı)
+        return self.storage.memory_report()
+    
+    @property
+    def grid(self):
+        # Geriye dönük uyumluluk: yoğun olasılık dizisi
+        # 'probability' depolamada canlı dizinin kendisi, diğerlerinde bir kopya
+        if isinstance(self.storage, DenseProbabilityStorage):
+            return self.storage.grid
+        return self.storage.to_probability()
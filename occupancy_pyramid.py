@@ -0,0 +1,176 @@
+import math
+import numpy as np
+
+
+# Çok çözünürlüklü doluluk piramidi (kabadan inceye sorgular)
+# Seviye 0 grid'in doluluk maskesidir (eşik: occupied_threshold); seviye k'daki her
+# hücre, 2^k x 2^k'lık blokta dolu hücre olup olmadığını tutar (dörtlü ağacın dizi hali).
+# Grid'in eşik geçişleri (OccupancyGrid.add_change_listener) ile artımlı güncellenir:
+# bir değişiklik sadece bloğun durumunu değiştirdiği seviyeye kadar yukarı taşınır
+# (zaten dolu bir bloğa eklenen engel tek bir seviyeye dokunur). Geçişler DistanceField
+# gibi biriktirilir ve ilk sorguda tek seferde uygulanır (sorgu yapılmayan adımlarda
+# tarama ve bozunma ek maliyet getirmez).
+# Sorgular en kaba uygun seviyede başlar; boş bloklar tek okumayla elenir ve sadece
+# dolu (belirsiz) bloklar bir alt seviyede incelenir. Çoğu boş haritada uzun bir
+# segment veya geniş bir alan birkaç okumayla yanıtlanır.
+class OccupancyPyramid:
+    def __init__(self, occupancy_grid):
+        self.grid = occupancy_grid
+        self.resolution = occupancy_grid.resolution
+        self.cells_x = occupancy_grid.cells_x
+        self.cells_y = occupancy_grid.cells_y
+
+        # Seviyeleri mevcut dolu hücrelerden kur (2x2 blokların en büyüğü, tek boyutlar
+        # sıfırla doldurulur)
+        mask = occupancy_grid.to_probability() >= occupancy_grid.occupied_threshold
+        self.levels = [mask.astype(np.uint8)]
+        while max(self.levels[-1].shape) > 1:
+            height, width = self.levels[-1].shape
+            padded = np.zeros((height + height % 2, width + width % 2), dtype=np.uint8)
+            padded[:height, :width] = self.levels[-1]
+            self.levels.append(padded.reshape(padded.shape[0] // 2, 2, padded.shape[1] // 2, 2).max(axis=(1, 3)))
+        self._pending = []  # Henüz uygulanmamış geçiş yapan grid hücreleri
+        occupancy_grid.add_change_listener(self)
+
+    def on_cells_changed(self, became_occupied, became_free):
+        self._pending.append(became_occupied)
+        self._pending.append(became_free)
+
+    def flush(self):
+        # Biriken geçişleri uygula; son durum grid'den okunur (aynı partide
+        # dolup boşalan hücreler birbirini götürür)
+        if not self._pending:
+            return
+        cells = np.unique(np.concatenate(self._pending))
+        self._pending = []
+        occupied = self.grid.occupied_cells(cells)
+        self._set_cells(cells[occupied], 1)
+        self._set_cells(cells[~occupied], 0)
+
+    def _set_cells(self, cells, value):
+        # Maskeyi güncelle ve durumu gerçekten değişen hücreleri üst seviyelere yansıt
+        # Dolan hücre: bloğu zaten dolu olan üst seviyeler değişmez. Boşalan hücre: bloğun
+        # dört alt bloğundan biri hâlâ doluysa üst seviyeler değişmez.
+        if not cells.size:
+            return
+        mask = self.levels[0].reshape(-1)
+        cells = cells[mask[cells] != value]
+        if not cells.size:
+            return
+        mask[cells] = value
+        grid_y, grid_x = np.divmod(cells, self.cells_x)
+        for level in range(1, len(self.levels)):
+            grid_y, grid_x = grid_y >> 1, grid_x >> 1
+            if value:
+                changed = self.levels[level][grid_y, grid_x] == 0
+            else:
+                below = self.levels[level - 1]
+                y0, x0 = grid_y * 2, grid_x * 2
+                y1 = np.minimum(y0 + 1, below.shape[0] - 1)
+                x1 = np.minimum(x0 + 1, below.shape[1] - 1)
+                changed = (below[y0, x0] | below[y0, x1] | below[y1, x0] | below[y1, x1]) == 0
+            # Aynı bloğa düşen tekrarlar zararsız (atama tekrarlanır)
+            grid_y, grid_x = grid_y[changed], grid_x[changed]
+            if not grid_y.size:
+                return
+            self.levels[level][grid_y, grid_x] = value
+
+    def _cell_coords(self, xs, ys):
+        # Dünya koordinatlarını grid hücrelerine çevir (OccupancyGrid.world_to_flat gibi kırpılır)
+        grid_x = np.clip((xs / self.resolution).astype(np.int64), 0, self.cells_x - 1)
+        grid_y = np.clip((ys / self.resolution).astype(np.int64), 0, self.cells_y - 1)
+        return grid_x, grid_y
+
+    def box_free(self, x0, y0, x1, y1):
+        # Eksenlere hizalı kutunun (dünya koordinatları) kapladığı hücrelerin hepsi boş mu
+        self.flush()
+        (cell_x0, cell_x1), (cell_y0, cell_y1) = (
+            np.sort(v) for v in self._cell_coords(np.array([x0, x1], dtype=float),
+                                                  np.array([y0, y1], dtype=float)))
+        cell_x0, cell_x1, cell_y0, cell_y1 = int(cell_x0), int(cell_x1), int(cell_y0), int(cell_y1)
+
+        # Kutunun her eksende en fazla iki bloğa yayıldığı seviyeden başla
+        span = max(cell_x1 - cell_x0, cell_y1 - cell_y0) + 1
+        level = min((span - 1).bit_length(), len(self.levels) - 1)
+        block_y, block_x = np.meshgrid(np.arange(cell_y0 >> level, (cell_y1 >> level) + 1),
+                                       np.arange(cell_x0 >> level, (cell_x1 >> level) + 1),
+                                       indexing='ij')
+        block_y, block_x = block_y.ravel(), block_x.ravel()
+        child_y, child_x = np.array([0, 0, 1, 1]), np.array([0, 1, 0, 1])
+        while True:
+            occupied = self.levels[level][block_y, block_x] > 0
+            block_y, block_x = block_y[occupied], block_x[occupied]
+            if not block_y.size:
+                return True
+            if level == 0:
+                return False
+            # Tamamen kutunun içindeki dolu blok kesin sonuç verir
+            size = 1 << level
+            inside = ((block_y * size >= cell_y0) & ((block_y + 1) * size - 1 <= cell_y1)
+                      & (block_x * size >= cell_x0) & ((block_x + 1) * size - 1 <= cell_x1))
+            if inside.any():
+                return False
+            # Kutunun kenarına taşan dolu bloklar bir alt seviyede incelenir
+            level -= 1
+            block_y = (block_y[:, None] * 2 + child_y).ravel()
+            block_x = (block_x[:, None] * 2 + child_x).ravel()
+            keep = ((block_y >= cell_y0 >> level) & (block_y <= cell_y1 >> level)
+                    & (block_x >= cell_x0 >> level) & (block_x <= cell_x1 >> level))
+            block_y, block_x = block_y[keep], block_x[keep]
+
+    def segments_free(self, x0, y0, x1, y1):
+        # Doğru parçalarının üzerinde dolu hücre yok mu (vektörel, kabadan inceye)
+        # Her parça blok boyundan kısa alt parçalara bölünür; bir alt parça, uç noktalarının
+        # sınırlayıcı kutusunun değdiği (en fazla 2x2) blok boşsa elenir, değilse ikiye
+        # bölünüp bir alt seviyede incelenir. Seviye 0'da alt parçalar hücreden kısadır ve
+        # uç noktalarının kutusundaki (en fazla 2x2) hücrelere bakılır: hücre köşesini kesen
+        # bir parçanın uç noktası olmayan hücresi de kapsanır. Sonuç muhafazakârdır; parçanın
+        # değdiği hiçbir dolu hücre kaçmaz, köşeye yakın geçen parçalar engelli sayılabilir.
+        # Harita dışına taşan uç noktalar sınıra kırpılır.
+        self.flush()
+        x0, y0, x1, y1 = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (x0, y0, x1, y1))
+        free = np.ones(x0.shape, dtype=bool)
+        if not x0.size:
+            return free
+
+        # Uç noktalar hücre biriminde: satırlar (x0, y0, x1, y1)
+        points = np.stack([x0, y0, x1, y1]) / self.resolution
+        points[0::2] = np.minimum(np.maximum(points[0::2], 0.0), np.nextafter(self.cells_x, 0))
+        points[1::2] = np.minimum(np.maximum(points[1::2], 0.0), np.nextafter(self.cells_y, 0))
+        length = np.hypot(points[2] - points[0], points[3] - points[1])
+
+        # En uzun parçanın tek bloğa sığdığı seviyeden başla; daha uzun parçalar bölünür
+        level = min(int(math.ceil(math.log2(max(float(length.max()), 1.0)))), len(self.levels) - 1)
+        pieces = np.maximum(np.ceil(length / (1 << level)), 1).astype(np.int64)
+        segment = np.arange(x0.size)
+        if pieces.max() > 1:
+            segment = np.repeat(segment, pieces)
+            index = np.arange(segment.size) - np.repeat(np.cumsum(pieces) - pieces, pieces)
+            t0 = index / pieces[segment]
+            t1 = (index + 1) / pieces[segment]
+            start, end = points[:2, segment], points[2:, segment]
+            points = np.concatenate([start + t0 * (end - start), start + t1 * (end - start)])
+
+        while segment.size:
+            cells = points.astype(np.int64)
+            counts = self.levels[level]
+            low = np.minimum(cells[:2], cells[2:]) >> level
+            high = np.maximum(cells[:2], cells[2:]) >> level
+            hit = (counts[low[1], low[0]] | counts[low[1], high[0]]
+                   | counts[high[1], low[0]] | counts[high[1], high[0]]) > 0
+            if level == 0:
+                free[segment[hit]] = False
+                break
+            # Belirsiz alt parçaları ikiye böl (parçaların sırası önemsiz)
+            segment, points = segment[hit], points[:, hit]
+            middle = (points[:2] + points[2:]) * 0.5
+            segment = np.concatenate([segment, segment])
+            points = np.concatenate([np.concatenate([points[:2], middle]),
+                                     np.concatenate([middle, points[2:]])], axis=1)
+            level -= 1
+        return free
+
+    def memory_report(self):
+        # Seviye sayısı ve toplam bellek (bayt)
+        return {'levels': len(self.levels),
+                'bytes': int(sum(level.nbytes for level in self.levels))}
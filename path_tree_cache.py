@@ -0,0 +1,211 @@
+import time
+import heapq
+from collections import OrderedDict
+import numpy as np
+
+INF = float('inf')
+
+
+# Hedefe köklü en kısa yol ağacı (hedeften geriye Dijkstra)
+# Her node için hedefe maliyet (dist) ve hedefe doğru bir sonraki node (parent) saklanır.
+# Öncelik kuyruğu çağrılar arasında korunur: bir başlangıç için arama sadece kuyruğun
+# en küçük anahtarı başlangıcın maliyetine ulaşana kadar ilerletilir (robot hedefe
+# yaklaştıkça sonraki sorgular genellikle hiç node açmaz) ve yol parent işaretçileri
+# izlenerek O(yol uzunluğu) sürede çıkarılır.
+# Değişen kenarlar biriktirilir ve sonraki sorgudan önce uygulanır:
+#   - kullanılamaz hale gelen ağaç kenarı: alt ağaç geçersizleştirilir (maliyet sonsuz) ve
+#     alt ağaçtaki nodeler geçerli komşularının en iyisinden kuyruğa yeniden eklenir
+#   - kullanılabilir hale gelen veya yeni kenar: uç nodeler yeniden açılır, maliyet
+#     düşüşü oradan yayılır
+# Ağaçta olmayan bir kenarın engellenmesi hiçbir maliyeti değiştirmez.
+class ShortestPathTree:
+    def __init__(self, hybrid_map, goal_id):
+        self.map = hybrid_map
+        self.goal_id = goal_id
+        self.dist = []
+        self.parent = []
+        self._grow()
+        self.dist[goal_id] = 0.0
+        self._heap = [(0.0, goal_id)]  # (maliyet, node) - eskimiş kayıtlar çekilince atlanır
+        self.pending = set()           # Henüz uygulanmamış değişen kenarlar
+
+    def _grow(self):
+        # Ağaç oluşturulduktan sonra eklenen nodeler için yer aç
+        missing = self.map.graph.num_nodes - len(self.dist)
+        if missing > 0:
+            self.dist.extend([INF] * missing)
+            self.parent.extend([-1] * missing)
+
+    def apply_changes(self):
+        # Biriken kenar değişikliklerini uygula; geçersizleştirilen node sayısını döndür
+        edges, self.pending = self.pending, set()
+        self._grow()
+        dist, parent = self.dist, self.parent
+        is_edge_blocked = self.map.is_edge_blocked
+        roots = []
+        for node1_id, node2_id in edges:
+            if is_edge_blocked(node1_id, node2_id):
+                # Ağaç kenarıysa hedefe daha uzak ucun alt ağacı geçersiz
+                if parent[node1_id] == node2_id:
+                    roots.append(node1_id)
+                elif parent[node2_id] == node1_id:
+                    roots.append(node2_id)
+            else:
+                for node_id in (node1_id, node2_id):
+                    if dist[node_id] < INF:
+                        heapq.heappush(self._heap, (dist[node_id], node_id))
+        if not roots:
+            return 0
+
+        # Alt ağaçları çocuk listeleri (parent'a göre sıralı) üzerinden topla
+        parents = np.asarray(parent, dtype=np.int64)
+        order = np.argsort(parents, kind='stable')
+        bounds = np.searchsorted(parents[order], np.arange(len(parent) + 1))
+        order, bounds = order.tolist(), bounds.tolist()
+        invalid = []
+        stack = roots
+        while stack:
+            node_id = stack.pop()
+            if dist[node_id] == INF:
+                continue
+            dist[node_id] = INF
+            parent[node_id] = -1
+            invalid.append(node_id)
+            stack.extend(order[bounds[node_id]:bounds[node_id + 1]])
+
+        # Geçersiz nodeleri alt ağaç dışındaki en iyi komşularından yeniden kuyruğa ekle
+        graph = self.map.graph
+        targets, lengths = graph.targets, graph.lengths
+        for node_id in invalid:
+            best, best_id = INF, -1
+            first = graph.edge_start[node_id]
+            for k in range(first, first + graph.degree[node_id]):
+                neighbor_id = targets[k]
+                candidate = dist[neighbor_id] + lengths[k]
+                if candidate < best and not is_edge_blocked(node_id, neighbor_id):
+                    best, best_id = candidate, neighbor_id
+            if best_id >= 0:
+                dist[node_id] = best
+                parent[node_id] = best_id
+                heapq.heappush(self._heap, (best, node_id))
+        return len(invalid)
+
+    def settle(self, start_id):
+        # Başlangıcın maliyeti kesinleşene kadar aramayı ilerlet; açılan node sayısını döndür
+        self._grow()
+        dist, parent, heap = self.dist, self.parent, self._heap
+        graph = self.map.graph
+        edge_start, degree = graph.edge_start, graph.degree
+        targets, lengths = graph.targets, graph.lengths
+        has_blocked = bool(self.map.blocked_edges or self.map.blocked_nodes)
+        is_edge_blocked = self.map.is_edge_blocked
+        expansions = 0
+        # Kenar uzunlukları pozitif: anahtarı başlangıç maliyetinden küçük olmayan kayıtlar
+        # başlangıca daha ucuz bir yol veremez
+        while heap and heap[0][0] < dist[start_id]:
+            cost, node_id = heapq.heappop(heap)
+            if cost != dist[node_id]:
+                continue  # Eskimiş kayıt
+            expansions += 1
+            first = edge_start[node_id]
+            for k in range(first, first + degree[node_id]):
+                neighbor_id = targets[k]
+                candidate = cost + lengths[k]
+                if candidate < dist[neighbor_id]:
+                    if has_blocked and is_edge_blocked(node_id, neighbor_id):
+                        continue
+                    dist[neighbor_id] = candidate
+                    parent[neighbor_id] = node_id
+                    heapq.heappush(heap, (candidate, neighbor_id))
+        return expansions
+
+    def path(self, start_id):
+        # Parent işaretçilerini hedefe kadar izle; erişilemiyorsa None
+        if self.dist[start_id] == INF:
+            return None
+        path = [start_id]
+        parent = self.parent
+        while start_id != self.goal_id:
+            start_id = parent[start_id]
+            path.append(start_id)
+        return path
+
+
+# Birden fazla hedef için en kısa yol ağacı önbelleği (LRU)
+# Görev boyunca hedef (yangın konumu) sabitken başlangıç her adımda değişir; her sorgu
+# hedefin ağacını kullanır. En fazla 'capacity' hedefin ağacı tutulur, en uzun süredir
+# kullanılmayan atılır. HybridMap dinleyicisi olarak kenar değişiklikleri tüm ağaçlara
+# iletilir; her ağaç bunları kendi sorgusunda uygular (bkz. ShortestPathTree).
+# GreedyBestFirst/DStarLite ile aynı find_path arayüzü; yollar en kısa yoldur.
+class PathTreeCache:
+    def __init__(self, hybrid_map, capacity=4):
+        if capacity < 1:
+            raise ValueError("Önbellek kapasitesi en az 1 olmalı")
+        self.map = hybrid_map
+        self.capacity = capacity
+        self.trees = OrderedDict()  # Hedef ID -> ShortestPathTree (en son kullanılan sonda)
+
+        # İstatistikler
+        self.last_expansions = 0
+        self.queries = 0
+        self.hits = 0          # Hiç node açılmadan yanıtlanan sorgular
+        self.builds = 0
+        self.evictions = 0
+        self.invalidated = 0   # Geçersizleştirilen toplam alt ağaç nodeü
+
+        # İsteğe bağlı ölçüm katmanı (bkz. instrumentation.py)
+        self.instrumentation = None
+
+        hybrid_map.add_listener(self)
+
+    # HybridMap dinleyici arayüzü: değişiklikler ağaçlar sorgulanana kadar biriktirilir
+    def on_edges_changed(self, edges):
+        for tree in self.trees.values():
+            tree.pending.update(edges)
+
+    def find_path(self, start_id, goal_id):
+        # Hedefin ağacından başlangıca yolu çıkar (gerekirse ağacı kur / onar / genişlet)
+        if self.instrumentation is None:
+            return self._plan(start_id, goal_id)
+        begin = time.perf_counter()
+        path = self._plan(start_id, goal_id)
+        self.instrumentation.record('planner.find_path', time.perf_counter() - begin)
+        self.instrumentation.count('planner.searches')
+        self.instrumentation.count('planner.expansions', self.last_expansions)
+        if not self.last_expansions:
+            self.instrumentation.count('planner.tree_hits')
+        if path is None:
+            self.instrumentation.count('planner.failures')
+        return path
+
+    def _plan(self, start_id, goal_id):
+        if start_id not in self.map.nodes or goal_id not in self.map.nodes:
+            print("Başlangıç veya hedef düğüm geçersiz")
+            self.last_expansions = 0
+            return None
+
+        tree = self.trees.get(goal_id)
+        if tree is None:
+            tree = ShortestPathTree(self.map, goal_id)
+            self.trees[goal_id] = tree
+            self.builds += 1
+            if len(self.trees) > self.capacity:
+                self.trees.popitem(last=False)
+                self.evictions += 1
+        else:
+            self.trees.move_to_end(goal_id)
+            if tree.pending:
+                self.invalidated += tree.apply_changes()
+
+        self.queries += 1
+        self.last_expansions = tree.settle(start_id)
+        if not self.last_expansions:
+            self.hits += 1
+        path = tree.path(start_id)
+        if path is None:
+            print("Başlangıçtan hedefe yol bulunamadı")
+        return path
+
+    def stats(self):
+        return {'trees': len(self.trees), 'queries': self.queries, 'hits': self.hits,
+                'builds': self.builds, 'evictions': self.evictions, 'invalidated': self.invalidated}
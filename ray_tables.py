@@ -0,0 +1,111 @@
+import math
+import numpy as np
+
+
+def traverse_rays(origin_x, origin_y, angles, resolution, max_range):
+    # Işınların grid geçişi (Amanatides-Woo), tüm ışınlar için aynı anda
+    # Dönüş: (başlangıç hücresi x, y, kesişim sonrası hücre ofsetleri x, y, kesişim mesafeleri)
+    #   ofsetler (ışın, 2M + 1): sütun i, i kesişimden sonra bulunulan hücre (sütun 0 başlangıç)
+    #   mesafeler (ışın, 2M): i. kesişimin ışın boyunca uzaklığı (metre; kesilmeyen: inf)
+    # M = ceil(max_range / resolution) + 1, bir eksende kesilebilecek en fazla sınır sayısı
+    cos_a = np.cos(angles)
+    sin_a = np.sin(angles)
+    cell_x = np.floor(origin_x / resolution).astype(np.int64)
+    cell_y = np.floor(origin_y / resolution).astype(np.int64)
+    step_x = np.where(cos_a >= 0, 1, -1)
+    step_y = np.where(sin_a >= 0, 1, -1)
+
+    max_crossings = int(math.ceil(max_range / resolution)) + 1
+    k = np.arange(1, max_crossings + 1)
+
+    # x ve y hücre sınırlarının kesildiği ışın parametreleri (metre cinsinden t)
+    boundary_x = (cell_x[:, None]
+                  + np.where(step_x[:, None] > 0, k[None, :], 1 - k[None, :])) * resolution
+    boundary_y = (cell_y[:, None]
+                  + np.where(step_y[:, None] > 0, k[None, :], 1 - k[None, :])) * resolution
+    with np.errstate(divide='ignore', invalid='ignore'):
+        t_x = (boundary_x - origin_x[:, None]) / cos_a[:, None]
+        t_y = (boundary_y - origin_y[:, None]) / sin_a[:, None]
+    t_x[~np.isfinite(t_x)] = np.inf
+    t_y[~np.isfinite(t_y)] = np.inf
+
+    # Kesişimleri ışın boyunca sırala; ilk max_crossings sütun x eksenine aittir
+    t_all = np.concatenate([t_x, t_y], axis=1)
+    order = np.argsort(t_all, axis=1, kind='stable')
+    exits = np.take_along_axis(t_all, order, axis=1)
+    is_x = order < max_crossings
+
+    zeros = np.zeros((len(angles), 1), dtype=np.int64)
+    offset_x = np.concatenate([zeros, np.cumsum(is_x, axis=1) * step_x[:, None]], axis=1)
+    offset_y = np.concatenate([zeros, np.cumsum(~is_x, axis=1) * step_y[:, None]], axis=1)
+    return cell_x, cell_y, offset_x, offset_y, exits
+
+
+# Sabit sensör açıları için önceden hesaplanmış ışın tabloları
+# Her açı ve hücre içi başlangıç konumu (subdivisions x subdivisions alt hücre, merkezleri)
+# için ışının geçtiği hücrelerin başlangıç hücresine göre ofsetleri ve her hücreden çıkış
+# mesafeleri (menzil kovaları) bir kez hesaplanır. Taramada ışın başına iş: robotun
+# hücresi ve alt hücresi ile tablo satırını seçmek, ölçülen mesafeden kısa çıkışları saymak
+# ve ofsetleri robotun hücresine eklemek (trigonometri ve sıralama yok).
+# Başlangıç alt hücre merkezine yuvarlanır: hücre sırası kesin izlemeden en fazla
+# resolution / (2 * subdivisions) kaymış bir başlangıçla hesaplanmış olur.
+# Tablolar salt okunurdur ve ray_table() kaydıyla aynı sensör düzenine sahip tüm
+# grid'ler (robotlar) arasında paylaşılır.
+class RayTable:
+    def __init__(self, angles, resolution, max_range=4.0, subdivisions=4):
+        if subdivisions < 1:
+            raise ValueError("Alt hücre sayısı en az 1 olmalı")
+        self.angles = np.array(angles, dtype=float)
+        self.resolution = resolution
+        self.max_range = max_range
+        self.subdivisions = subdivisions
+
+        # Satır sırası: (açı, alt hücre y, alt hücre x)
+        sub = (np.arange(subdivisions) + 0.5) / subdivisions * resolution
+        ray_angles = np.repeat(self.angles, subdivisions * subdivisions)
+        origin_y = np.tile(np.repeat(sub, subdivisions), self.angles.size)
+        origin_x = np.tile(sub, self.angles.size * subdivisions)
+        _, _, offset_x, offset_y, exits = traverse_rays(origin_x, origin_y, ray_angles,
+                                                        resolution, max_range)
+        self.offset_x = offset_x.astype(np.int16)
+        self.offset_y = offset_y.astype(np.int16)
+        self.exits = exits.astype(np.float32)
+        for values in (self.angles, self.offset_x, self.offset_y, self.exits):
+            values.flags.writeable = False
+
+    def matches(self, angles, resolution, max_range):
+        # Tarama bu tabloyla izlenebilir mi (aynı açılar ve çözünürlük, menzil tablo içinde)
+        return (resolution == self.resolution and max_range <= self.max_range and
+                angles.shape == self.angles.shape and np.array_equal(angles, self.angles))
+
+    def trace(self, origin_x, origin_y, angle_indices):
+        # Işınları tablodan izle; traverse_rays ile aynı biçimde (başlangıç hücreleri,
+        # hücre ofsetleri, kesişim mesafeleri) döner
+        res = self.resolution
+        grid_x = origin_x / res
+        grid_y = origin_y / res
+        cell_x = np.floor(grid_x).astype(np.int64)
+        cell_y = np.floor(grid_y).astype(np.int64)
+        last = self.subdivisions - 1
+        sub_x = np.minimum(((grid_x - cell_x) * self.subdivisions).astype(np.int64), last)
+        sub_y = np.minimum(((grid_y - cell_y) * self.subdivisions).astype(np.int64), last)
+        rows = (angle_indices * self.subdivisions + sub_y) * self.subdivisions + sub_x
+        return cell_x, cell_y, self.offset_x[rows], self.offset_y[rows], self.exits[rows]
+
+    def memory_bytes(self):
+        return self.offset_x.nbytes + self.offset_y.nbytes + self.exits.nbytes
+
+
+# Paylaşılan tablo kaydı: (açılar, çözünürlük, menzil, alt hücre) -> RayTable
+_tables = {}
+
+
+def ray_table(angles, resolution, max_range=4.0, subdivisions=4):
+    # Bu sensör düzeni için tabloyu döndür; yoksa bir kez hesapla
+    angles = np.array(angles, dtype=float)
+    key = (angles.tobytes(), resolution, max_range, subdivisions)
+    table = _tables.get(key)
+    if table is None:
+        table = RayTable(angles, resolution, max_range, subdivisions)
+        _tables[key] = table
+    return table
@@ -0,0 +1,237 @@
+import math
+import time
+import numpy as np
+
+
+# Occupancy grid'den otomatik yol haritası (vektörel PRM)
+# Harita region_size x region_size metrelik bölgelere ayrılır. Her bölgede en az
+# nodes_per_region node olacak şekilde dolu olmayan (ve engellere en az clearance
+# uzaklıkta) rastgele noktalar örneklenir ve HybridMap.add_nodes ile toplu eklenir.
+# Kurucu kendini HybridMap.edge_checker olarak kaydeder; böylece haritaya eklenen her
+# kenar (navigasyonun eklediği konum/hedef nodeleri dahil) segments_free ile kontrol edilir:
+#   - robot yarıçapı verildiyse mesafe alanında küre izleme (distance_field.py)
+#   - doluluk piramidi açıksa kabadan inceye sorgu (occupancy_pyramid.py)
+#   - yoksa tüm segmentlerin yarım hücre aralıklı örnekleri tek bir grid okumasıyla
+# Yarıçapsız kontrollerde edge_margin > 0 ise parça ve iki yanındaki edge_margin uzaklıktaki
+# paralel parçalar birlikte kontrol edilir (mesafe alanı gerektirmeyen ucuz bir genişlik payı).
+# Grid'in eşik geçişleri değişiklik günlüğünden (changes_since) okunur ve bölgelere
+# işlenir; günlük sınırlı olduğundan sync() her grid güncellemesinden sonra çağrılmalıdır
+# (kaçırılan geçişler tüm haritanın yeniden kontrolüne yol açar). refresh() sırasında
+# dolu olan hücrelerin bölgelerine değen açık kenarlar ve tüm engelli kenarlar tek bir
+# toplu kontrolle yeniden değerlendirilir (HybridMap'te engellenir / engeli kaldırılır,
+# planlayıcılar haberdar olur) ve boşalan bölgelerden seyrek kalanlara node eklenir.
+# Grid dinleyicisi kullanılmaz: bozunma takibinin her güncellemedeki maliyeti olmadan
+# bozunmayla açılan kenarlar engelli kenarların yeniden kontrolünde yakalanır.
+# İlk refresh tüm haritayı kurar.
+# Bilinmeyen hücreler boş sayılır (iyimser planlama; engel görüldükçe kenarlar kapanır).
+class RoadmapBuilder:
+    def __init__(self, hybrid_map, region_size=2.0, nodes_per_region=2, clearance=0.3,
+                 robot_radius=None, edge_margin=0.0, seed=0):
+        self.map = hybrid_map
+        self.grid = hybrid_map.occupancy_grid
+        self.region_size = region_size
+        self.nodes_per_region = nodes_per_region
+        self.clearance = clearance        # Yeni node'un engellere en az uzaklığı (metre)
+        self.robot_radius = robot_radius  # Verilirse kenarlar bu yarıçapla kontrol edilir
+        self.edge_margin = edge_margin    # Yarıçapsız kontrolde paralel parçaların uzaklığı
+        self.candidates_per_node = 4      # Eksik node başına örneklenen aday nokta
+        self.rng = np.random.default_rng(seed)
+        if robot_radius is not None:
+            self.grid.enable_distance_field(max(clearance, robot_radius) + self.grid.resolution)
+
+        # Bölge ızgarası; başlangıçta tüm bölgeler kirli (hem dolu hem boş geçişli sayılır)
+        self.regions_x = max(1, math.ceil(self.grid.width / region_size))
+        self.regions_y = max(1, math.ceil(self.grid.height / region_size))
+        self.cells_per_region = region_size / self.grid.resolution
+        self.dirty_occupied = np.ones((self.regions_y, self.regions_x), dtype=bool)
+        self.dirty_free = np.ones((self.regions_y, self.regions_x), dtype=bool)
+        self.seen_version = self.grid.change_version  # Günlükte işlenen son sürüm
+
+        # İstatistikler
+        self.refreshes = 0
+        self.nodes_added = 0
+        self.edges_checked = 0
+        self.edges_blocked = 0
+        self.edges_unblocked = 0
+
+        hybrid_map.edge_checker = self.segments_free
+
+    def sync(self):
+        # Son çağrıdan bu yana eşik geçişi yapan hücrelerin bölgelerini kirli işaretle
+        changes = self.grid.changes_since(self.seen_version)
+        self.seen_version = self.grid.change_version
+        if changes is None:
+            # Günlük yetmedi: tüm bölgeler kirli
+            self.dirty_occupied[:] = True
+            self.dirty_free[:] = True
+            return
+        for cells, dirty in zip(changes, (self.dirty_occupied, self.dirty_free)):
+            if cells.size:
+                grid_y, grid_x = np.divmod(cells, self.grid.cells_x)
+                region_y = np.minimum((grid_y / self.cells_per_region).astype(np.int64), self.regions_y - 1)
+                region_x = np.minimum((grid_x / self.cells_per_region).astype(np.int64), self.regions_x - 1)
+                dirty[region_y, region_x] = True
+
+    def _region_index(self, values, count):
+        return np.clip((values / self.region_size).astype(np.int64), 0, count - 1)
+
+    def segments_free(self, x0, y0, x1, y1):
+        # Doğru parçalarının engelsiz olup olmadığı (vektörel, tüm parçalar tek seferde)
+        x0, y0, x1, y1 = (np.atleast_1d(np.asarray(v, dtype=float)) for v in (x0, y0, x1, y1))
+        if not x0.size:
+            return np.ones(0, dtype=bool)
+        if self.robot_radius is not None:
+            return self.grid.distance_field.segments_clear(x0, y0, x1, y1, self.robot_radius)
+        if self.edge_margin > 0:
+            # Parçaya dik birim vektör (sıfır uzunluklu parçalarda x ekseni)
+            length = np.hypot(x1 - x0, y1 - y0)
+            safe = np.where(length > 0, length, 1.0)
+            normal_x = np.where(length > 0, -(y1 - y0) / safe, 1.0) * self.edge_margin
+            normal_y = np.where(length > 0, (x1 - x0) / safe, 0.0) * self.edge_margin
+            shift = np.array([0.0, 1.0, -1.0])[:, None]
+            x0, x1 = (np.ravel(v + shift * normal_x) for v in (x0, x1))
+            y0, y1 = (np.ravel(v + shift * normal_y) for v in (y0, y1))
+            return self._lines_free(x0, y0, x1, y1).reshape(3, -1).all(axis=0)
+        return self._lines_free(x0, y0, x1, y1)
+
+    def _lines_free(self, x0, y0, x1, y1):
+        # Kalınlıksız doğru parçaları: piramit varsa kabadan inceye, yoksa örnekleme
+        if self.grid.pyramid is not None:
+            return self.grid.pyramid.segments_free(x0, y0, x1, y1)
+
+        # Yarım hücre aralıklı örnekler (uç noktalar dahil), tüm parçalar için tek dizide
+        steps = (np.hypot(x1 - x0, y1 - y0) / (self.grid.resolution / 2)).astype(np.int64) + 2
+        owner = np.repeat(np.arange(x0.size), steps)
+        ratio = (np.arange(owner.size) - np.repeat(np.cumsum(steps) - steps, steps)) / (steps - 1)[owner]
+        xs = x0[owner] + ratio * (x1 - x0)[owner]
+        ys = y0[owner] + ratio * (y1 - y0)[owner]
+        occupied = self.grid.occupied_cells(self.grid.world_to_flat(xs, ys))
+        return np.bincount(owner[occupied], minlength=x0.size) == 0
+
+    def positions_free(self, xs, ys):
+        # Noktalar harita içinde ve engellere en az clearance (veya robot yarıçapı) uzakta mı
+        xs = np.asarray(xs, dtype=float)
+        ys = np.asarray(ys, dtype=float)
+        grid = self.grid
+        margin = max(self.clearance, self.robot_radius or 0.0)
+        inside = ((xs >= margin) & (xs <= grid.width - margin) &
+                  (ys >= margin) & (ys <= grid.height - margin))
+        if self.robot_radius is not None:
+            return inside & (grid.distance_field.clearance_cells(grid.world_to_flat(xs, ys)) > margin)
+        # Merkez ve clearance yarıçaplı 8 noktalık halka
+        angles = np.linspace(0, 2 * math.pi, 8, endpoint=False)
+        ring_x = np.concatenate(([0.0], margin * np.cos(angles)))
+        ring_y = np.concatenate(([0.0], margin * np.sin(angles)))
+        occupied = grid.occupied_cells(grid.world_to_flat(xs[:, None] + ring_x, ys[:, None] + ring_y))
+        return inside & ~occupied.reshape(xs.size, ring_x.size).any(axis=1)
+
+    def build(self):
+        # Tüm haritayı baştan değerlendir
+        self.dirty_occupied[:] = True
+        self.dirty_free[:] = True
+        return self.refresh()
+
+    def refresh(self):
+        # Kirli bölgeleri güncelle; (eklenen node, engellenen kenar, engeli kalkan kenar) döner
+        self.sync()
+        if not (self.dirty_occupied.any() or self.dirty_free.any() or self.map.blocked_edges):
+            return 0, 0, 0
+        begin = time.perf_counter()
+        dirty_occupied, self.dirty_occupied = self.dirty_occupied, np.zeros_like(self.dirty_occupied)
+        dirty_free, self.dirty_free = self.dirty_free, np.zeros_like(self.dirty_free)
+        blocked, unblocked = self._recheck_edges(dirty_occupied)
+        added = self._fill_regions(dirty_free)
+
+        self.refreshes += 1
+        self.nodes_added += added
+        self.edges_blocked += blocked
+        self.edges_unblocked += unblocked
+        instrumentation = self.map.instrumentation
+        if instrumentation is not None:
+            instrumentation.record('roadmap.refresh', time.perf_counter() - begin)
+            instrumentation.count('roadmap.regions', int((dirty_occupied | dirty_free).sum()))
+            instrumentation.count('roadmap.nodes_added', added)
+            instrumentation.count('roadmap.edges_blocked', blocked)
+            instrumentation.count('roadmap.edges_unblocked', unblocked)
+        return added, blocked, unblocked
+
+    def _recheck_edges(self, dirty):
+        # Tüm engelli kenarları ve sınırlayıcı kutusu (robot yarıçapı + bir hücre paylı) dolu
+        # geçişli bir bölgeye değen açık kenarları tek bir segments_free çağrısıyla yeniden
+        # kontrol et (diğer açık kenarlar engellenmiş olamaz)
+        graph = self.map.graph
+        if not graph.num_edges:
+            return 0, 0
+        offsets, targets, _ = graph.csr()
+        sources = np.repeat(np.arange(graph.num_nodes), np.diff(offsets))
+        once = sources < targets  # Her kenar bir kez (küçük ID, büyük ID)
+        sources, targets = sources[once], targets[once].astype(np.int64)
+        coords = graph.coordinates()
+        x0, y0 = coords[sources, 0], coords[sources, 1]
+        x1, y1 = coords[targets, 0], coords[targets, 1]
+        is_blocked = np.zeros(sources.size, dtype=bool)
+        if self.map.blocked_edges:
+            blocked_keys = np.array([node1_id * graph.num_nodes + node2_id
+                                     for node1_id, node2_id in self.map.blocked_edges], dtype=np.int64)
+            is_blocked = np.isin(sources * graph.num_nodes + targets, blocked_keys)
+
+        # Kutunun kapsadığı bölgelerde kirli var mı: toplam alan tablosu ile O(1)
+        margin = (self.robot_radius or 0.0) + self.grid.resolution
+        rx0 = self._region_index(np.minimum(x0, x1) - margin, self.regions_x)
+        rx1 = self._region_index(np.maximum(x0, x1) + margin, self.regions_x)
+        ry0 = self._region_index(np.minimum(y0, y1) - margin, self.regions_y)
+        ry1 = self._region_index(np.maximum(y0, y1) + margin, self.regions_y)
+        table = np.zeros((self.regions_y + 1, self.regions_x + 1), dtype=np.int64)
+        table[1:, 1:] = dirty.cumsum(axis=0).cumsum(axis=1)
+        touched = np.flatnonzero(is_blocked | (table[ry1 + 1, rx1 + 1] - table[ry0, rx1 + 1]
+                                               - table[ry1 + 1, rx0] + table[ry0, rx0] > 0))
+        if not touched.size:
+            return 0, 0
+        free = self.segments_free(x0[touched], y0[touched], x1[touched], y1[touched])
+        self.edges_checked += touched.size
+
+        # Sadece durumu değişen kenarlar HybridMap'e bildirilir
+        blocked = unblocked = 0
+        blocked_edges = self.map.blocked_edges
+        for node1_id, node2_id, is_free in zip(sources[touched].tolist(), targets[touched].tolist(),
+                                               free.tolist()):
+            if is_free == ((node1_id, node2_id) in blocked_edges):
+                self.map.set_edge_blocked(node1_id, node2_id, not is_free)
+                if is_free:
+                    unblocked += 1
+                else:
+                    blocked += 1
+        return blocked, unblocked
+
+    def _fill_regions(self, dirty):
+        # Kirli bölgelerden node sayısı nodes_per_region'ın altında kalanlara node ekle
+        regions = np.flatnonzero(dirty.ravel())
+        counts = np.zeros(dirty.size, dtype=np.int64)
+        coords = self.map.graph.coordinates()
+        if coords.size:
+            node_regions = (self._region_index(coords[:, 1], self.regions_y) * self.regions_x
+                            + self._region_index(coords[:, 0], self.regions_x))
+            counts = np.bincount(node_regions, minlength=dirty.size)
+        missing = np.zeros(dirty.size, dtype=np.int64)
+        missing[regions] = np.maximum(self.nodes_per_region - counts[regions], 0)
+        regions = regions[missing[regions] > 0]
+        if not regions.size:
+            return 0
+
+        # Her bölgeye eksik node sayısıyla orantılı aday örnekle ve boş olanları seç
+        owner = np.repeat(regions, missing[regions] * self.candidates_per_node)
+        region_y, region_x = np.divmod(owner, self.regions_x)
+        xs = (region_x + self.rng.random(owner.size)) * self.region_size
+        ys = (region_y + self.rng.random(owner.size)) * self.region_size
+        free = self.positions_free(xs, ys)
+        owner, xs, ys = owner[free], xs[free], ys[free]
+
+        # Bölge başına en fazla eksik sayısı kadar aday (owner sıralı olduğundan sıra numarası)
+        rank = np.arange(owner.size) - np.searchsorted(owner, owner)
+        take = rank < missing[owner]
+        return len(self.map.add_nodes(xs[take], ys[take]))
+
+    def stats(self):
+        return {'refreshes': self.refreshes, 'nodes_added': self.nodes_added,
+                'edges_checked': self.edges_checked, 'edges_blocked': self.edges_blocked,
+                'edges_unblocked': self.edges_unblocked}
@@ -0,0 +1,192 @@
+import queue
+import threading
+import time
+import numpy as np
+
+
+# Asenkron sensör besleme hattı (arka plan iş parçacığı)
+# Taramalar sınırlı bir kuyruğa bırakılır ve haritaya ayrı bir iş parçacığında işlenir:
+#   - Kuyruk doluysa submit bekler (geri basınç); drop_oldest=True ise en eski tarama atılır
+#   - İşçi kuyrukta biriken taramaları (en fazla max_batch) tek bir toplu grid güncellemesinde
+#     birleştirir: ışın izleme bir kez, bozunma tarama sayısı kadar adım tek seferde
+#   - Dedektör geçmişi ve hareketli engel tespiti submit sırasında (ucuz) yapılır, böylece
+#     kontrolcünün tepkisel engel kaçınması haritalama gecikmesinden etkilenmez
+#   - Işın izleme (en pahalı kısım) kilit dışında yapılır; sadece sonucun grid'e
+#     yazılması 'lock' altında olur
+# Anlık görüntü kuralı: haritayı okuyan kod (navigate_to_goal, calculate_movement_commands,
+# update_position) 'with pipeline.lock:' içinde çalışmalıdır. Böylece kontrol her zaman
+# ya bir partinin öncesini ya da tamamını görür, yarım uygulanmış bir güncellemeyi görmez.
+# Birleştirilen taramalar aynı anda gözlenmiş sayılır (bozunma partinin sonunda uygulanır).
+class SensorPipeline:
+    def __init__(self, navigation_system, max_pending=4, max_batch=8, drop_oldest=False):
+        self.nav = navigation_system
+        self.grid = navigation_system.hybrid_map.occupancy_grid
+        self.queue = queue.Queue(maxsize=max_pending)
+        self.max_batch = max_batch
+        self.drop_oldest = drop_oldest
+        self.lock = threading.Lock()
+        self.worker = None
+        self.stopped = False  # stop() sonrası yeni tarama kabul edilmez
+        self.error = None  # İşçide oluşan hata; sonraki submit/flush çağrısında yükseltilir
+
+        # İstatistikler
+        self.scans_submitted = 0
+        self.scans_applied = 0
+        self.scans_dropped = 0
+        self.batches = 0
+        self.max_latency = 0.0  # Gönderimden haritaya yazılmaya kadar geçen en uzun süre (saniye)
+
+    def start(self):
+        # İşçi iş parçacığını başlat
+        if self.worker is None:
+            self.stopped = False
+            self.worker = threading.Thread(target=self._run, name='sensor-pipeline', daemon=True)
+            self.worker.start()
+
+    def stop(self):
+        # Kuyruktaki taramaları işle ve işçiyi durdur
+        self.stopped = True
+        if self.worker is None:
+            return
+        self.queue.put(None)
+        self.worker.join()
+        self.worker = None
+
+    def submit(self, sensor_readings, robot_pos=None, timeout=None):
+        # Taramayı kuyruğa ekle; robot_pos verilmezse navigasyonun mevcut konumu kullanılır
+        # Okumalar kopyalanır (çağıran tamponunu yeniden kullanabilir); None -> NaN
+        # Kuyruk timeout süresince dolu kalırsa tarama atılır ve False döner
+        if self.error is not None:
+            raise self.error
+        if self.stopped:
+            raise RuntimeError("Sensör hattı durduruldu; tarama kabul edilmiyor")
+        if robot_pos is None:
+            robot_pos = self.nav.current_position
+        readings = np.array(sensor_readings, dtype=float)
+        if readings.size != self.nav.obstacle_detector.num_sensors:
+            raise ValueError("Okuma sayısı sensör sayısıyla eşleşmeli")
+        robot_pos = (float(robot_pos[0]), float(robot_pos[1]))
+        with self.lock:
+            self.nav.obstacle_detector.update_readings(readings)
+            if self.nav.recorder is not None:
+                self.nav.recorder.sensor(readings, checkpoint=False)
+            # Takipçi açıksa ona verilen hareketli ışınlar grid'e yazılmaz (NaN)
+            distances, moving_marks = self.nav.moving_obstacle_updates(robot_pos)
+            readings = np.array(distances)
+        item = (robot_pos, readings, moving_marks, time.perf_counter())
+        self.scans_submitted += 1
+        if not self.drop_oldest:
+            try:
+                self.queue.put(item, timeout=timeout)
+            except queue.Full:
+                self.scans_dropped += 1
+                return False
+            return True
+        while True:
+            try:
+                self.queue.put_nowait(item)
+                return True
+            except queue.Full:
+                try:
+                    self.queue.get_nowait()
+                    self.queue.task_done()
+                    self.scans_dropped += 1
+                except queue.Empty:
+                    pass
+
+    def flush(self):
+        # Kuyruktaki tüm taramalar haritaya işlenene kadar bekle
+        # İşçi yoksa (başlatılmamış veya durdurulmuş) taramalar bu iş parçacığında işlenir
+        if self.worker is None:
+            self.drain()
+        else:
+            self.queue.join()
+        if self.error is not None:
+            raise self.error
+
+    def drain(self):
+        # Kuyruktaki taramaları çağıran iş parçacığında işle (işçi başlatılmadan senkron
+        # kullanım, ör. görev kaydının partili oynatılması); en fazla max_batch'lik partiler
+        while True:
+            scans = []
+            while len(scans) < self.max_batch:
+                try:
+                    scans.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not scans:
+                return
+            try:
+                self._integrate(scans)
+            finally:
+                for _ in scans:
+                    self.queue.task_done()
+
+    def _run(self):
+        while True:
+            batch = [self.queue.get()]
+            # Birikmiş taramaları aynı partiye al; durdurma işaretinde (None) dur
+            while batch[-1] is not None and len(batch) < self.max_batch:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stopping = batch[-1] is None
+            scans = batch[:-1] if stopping else batch
+            try:
+                if scans and self.error is None:
+                    self._integrate(scans)
+            except Exception as error:
+                print(f"Sensör hattı hatası: {error}")
+                self.error = error
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+            if stopping:
+                return
+
+    def _integrate(self, scans):
+        # Işınları kilit dışında izle, sonucu tek seferde uygula
+        begin = time.perf_counter()
+        angles = self.nav.obstacle_detector.angle_array
+        flat_indices, delta, num_rays = self.grid.trace_scans(
+            [(robot_pos, (angles, readings)) for robot_pos, readings, _, _ in scans])
+        moving_marks = self._merge_marks([marks for _, _, marks, _ in scans if marks is not None])
+        traced = time.perf_counter()
+
+        with self.lock:
+            self.grid.apply_updates(flat_indices, delta, moving_marks)
+            self.grid.apply_time_decay(len(scans))
+            if self.nav.roadmap is not None:
+                self.nav.roadmap.sync()  # Değişiklik günlüğü taşmadan bölgeleri işaretle
+            end = time.perf_counter()
+
+            self.scans_applied += len(scans)
+            self.batches += 1
+            latency = end - scans[0][3]
+            self.max_latency = max(self.max_latency, latency)
+            instrumentation = self.nav.instrumentation
+            if instrumentation is not None:
+                instrumentation.record('pipeline.trace', traced - begin)
+                instrumentation.record('pipeline.apply', end - traced)
+                instrumentation.record('pipeline.latency', latency)
+                instrumentation.count('pipeline.batches')
+                instrumentation.count('pipeline.scans', len(scans))
+                instrumentation.count('grid.rays', num_rays)
+
+    def _merge_marks(self, marks):
+        # Partideki taramaların (xs, ys, dolu, kesinlik) işaretlemelerini tek diziye birleştir
+        if not marks:
+            return None
+        xs = np.concatenate([np.atleast_1d(mark[0]) for mark in marks])
+        ys = np.concatenate([np.atleast_1d(mark[1]) for mark in marks])
+        occupied = np.concatenate([np.broadcast_to(mark[2], np.shape(mark[0])) for mark in marks])
+        accuracy = np.concatenate([np.broadcast_to(mark[3], np.shape(mark[0])) for mark in marks])
+        return xs, ys, occupied, accuracy
+
+    def stats(self):
+        # Gönderilen/uygulanan/atılan tarama sayıları ve ortalama parti boyu
+        return {'submitted': self.scans_submitted, 'applied': self.scans_applied,
+                'dropped': self.scans_dropped, 'batches': self.batches,
+                'mean_batch': self.scans_applied / self.batches if self.batches else 0.0,
+                'max_latency_ms': self.max_latency * 1e3, 'pending': self.queue.qsize()}
@@ -0,0 +1,354 @@
+import math
+import os
+import time
+import contextlib
+import threading
+import numpy as np
+from navigation_system import NavigationSystem
+from sensor_pipeline import SensorPipeline
+from mission_log import MissionRecorder
+
+# Navigasyonu test etmek için başsız (görselleştirmesiz) simülasyon ortamı
+# Dünya, sabit engelleri tutan ince bir doluluk rasteri ve hareketli dairesel
+# engellerden oluşur. Sensör okumaları ObstacleDetector ile uyumludur: sensör
+# sayısı kadar mesafe, menzil içinde engel yoksa NaN. Açılar (NavigationSystem'deki
+# gibi) dünya koordinatlarındadır. Tüm rastgelelik tek bir tohumdan (seed) gelir.
+class SimulatedWorld:
+    def __init__(self, width, height, resolution=0.05, seed=0):
+        self.width = width
+        self.height = height
+        self.resolution = resolution
+        self.cells_x = int(width / resolution)
+        self.cells_y = int(height / resolution)
+        self.occupied = np.zeros((self.cells_y, self.cells_x), dtype=bool)
+        self.rng = np.random.default_rng(seed)
+
+        # Hareketli engeller: her satır (x, y, vx, vy, yarıçap)
+        self.movers = np.empty((0, 5))
+
+        # Dış duvarlar
+        self.add_box(0, 0, width, resolution)
+        self.add_box(0, height - resolution, width, height)
+        self.add_box(0, 0, resolution, height)
+        self.add_box(width - resolution, 0, width, height)
+
+    def _cell_range(self, x0, y0, x1, y1):
+        gx0 = min(max(int(x0 / self.resolution), 0), self.cells_x)
+        gy0 = min(max(int(y0 / self.resolution), 0), self.cells_y)
+        gx1 = min(max(int(math.ceil(x1 / self.resolution)), 0), self.cells_x)
+        gy1 = min(max(int(math.ceil(y1 / self.resolution)), 0), self.cells_y)
+        return slice(gy0, gy1), slice(gx0, gx1)
+
+    def add_box(self, x0, y0, x1, y1):
+        # Dikdörtgen sabit engel (x0, y0) - (x1, y1)
+        self.occupied[self._cell_range(x0, y0, x1, y1)] = True
+
+    def clear_box(self, x0, y0, x1, y1):
+        # Dikdörtgen bölgeyi boşalt (kapı ve koridor açmak için)
+        self.occupied[self._cell_range(x0, y0, x1, y1)] = False
+
+    def add_rooms(self, room_size=5.0, door_width=1.5, wall_thickness=0.15):
+        # Alanı room_size aralıklı duvarlarla odalara böl; her duvar parçasında bir kapı
+        for x in np.arange(room_size, self.width - 1e-9, room_size):
+            self.add_box(x, 0, x + wall_thickness, self.height)
+            for y in np.arange(0, self.height, room_size):
+                door = y + self.rng.uniform(0.2, max(room_size - door_width - 0.2, 0.2))
+                self.clear_box(x, door, x + wall_thickness, door + door_width)
+        for y in np.arange(room_size, self.height - 1e-9, room_size):
+            self.add_box(0, y, self.width, y + wall_thickness)
+            for x in np.arange(0, self.width, room_size):
+                door = x + self.rng.uniform(0.2, max(room_size - door_width - 0.2, 0.2))
+                self.clear_box(door, y, door + door_width, y + wall_thickness)
+
+    def add_corridors(self, spacing=6.0, corridor_width=1.6):
+        # Alanı doldurup yatay koridorlar ve bunları bağlayan dikey geçitler aç
+        margin = self.resolution
+        self.add_box(margin, margin, self.width - margin, self.height - margin)
+        rows = np.arange(spacing / 2, self.height - corridor_width, spacing)
+        for y in rows:
+            self.clear_box(1.0, y, self.width - 1.0, y + corridor_width)
+        # Sol kenarda tüm koridorları birleştiren dikey koridor
+        self.clear_box(1.0, rows[0], 1.0 + corridor_width, rows[-1] + corridor_width)
+        for y0, y1 in zip(rows, rows[1:]):
+            for _ in range(2):
+                x = self.rng.uniform(3.0, max(self.width - 3.0 - corridor_width, 3.0))
+                self.clear_box(x, y0, x + corridor_width, y1 + corridor_width)
+
+    def add_clutter(self, count, min_size=0.2, max_size=1.0):
+        # Rastgele konumlu ve boyutlu kutu engeller
+        sizes = self.rng.uniform(min_size, max_size, (count, 2))
+        corners = self.rng.uniform(0, 1, (count, 2)) * ([self.width, self.height] - sizes)
+        for (x, y), (w, h) in zip(corners, sizes):
+            self.add_box(x, y, x + w, y + h)
+
+    def add_moving_obstacles(self, count, speed=0.5, radius=0.3):
+        # Sabit hızla hareket eden ve duvarlardan seken dairesel engeller
+        positions = self.random_free_positions(count, clearance=radius)
+        headings = self.rng.uniform(0, 2 * math.pi, count)
+        movers = np.column_stack([positions, speed * np.cos(headings), speed * np.sin(headings),
+                                  np.full(count, radius)])
+        self.movers = np.concatenate([self.movers, movers])
+
+    def step(self, dt):
+        # Hareketli engelleri ilerlet; sabit engele veya sınıra çarpanlar geri döner
+        if not len(self.movers):
+            return
+        new_xy = self.movers[:, :2] + dt * self.movers[:, 2:4]
+        hit = self.is_occupied(new_xy[:, 0], new_xy[:, 1], include_movers=False)
+        self.movers[hit, 2:4] *= -1
+        self.movers[~hit, :2] = new_xy[~hit]
+
+    def _flat(self, xs, ys):
+        gx = np.floor(np.asarray(xs) / self.resolution).astype(np.int64)
+        gy = np.floor(np.asarray(ys) / self.resolution).astype(np.int64)
+        inside = (gx >= 0) & (gx < self.cells_x) & (gy >= 0) & (gy < self.cells_y)
+        return gy, gx, inside
+
+    def is_occupied(self, xs, ys, include_movers=True):
+        # Noktalar dolu mu (dünya dışı dolu sayılır)
+        xs = np.atleast_1d(np.asarray(xs, dtype=float))
+        ys = np.atleast_1d(np.asarray(ys, dtype=float))
+        gy, gx, inside = self._flat(xs, ys)
+        result = ~inside
+        result[inside] = self.occupied[gy[inside], gx[inside]]
+        if include_movers and len(self.movers):
+            dx = xs[:, None] - self.movers[:, 0]
+            dy = ys[:, None] - self.movers[:, 1]
+            result |= (dx * dx + dy * dy < self.movers[:, 4]**2).any(axis=1)
+        return result
+
+    def clearance_mask(self, clearance):
+        # Engellere clearance metreden yakın hücreler (kare genişletme)
+        radius = int(math.ceil(clearance / self.resolution))
+        mask = self.occupied.copy()
+        for axis in (0, 1):
+            grown = mask.copy()
+            for shift in range(1, radius + 1):
+                grown |= np.roll(mask, shift, axis=axis)
+                grown |= np.roll(mask, -shift, axis=axis)
+            mask = grown
+        return mask
+
+    def random_free_positions(self, count, clearance=0.3, mask=None):
+        # Engellerden en az clearance uzaklıkta rastgele konumlar
+        if mask is None:
+            mask = self.clearance_mask(clearance)
+        free_y, free_x = np.nonzero(~mask)
+        if not free_x.size:
+            raise ValueError("Dünyada boş konum yok")
+        picks = self.rng.integers(0, free_x.size, count)
+        jitter = self.rng.uniform(0, 1, (count, 2))
+        return np.column_stack([(free_x[picks] + jitter[:, 0]) * self.resolution,
+                                (free_y[picks] + jitter[:, 1]) * self.resolution])
+
+    def cast_rays(self, x, y, angles, max_range=4.0, noise=0.0):
+        # Her ışın için ilk engele olan mesafe; menzilde engel yoksa NaN
+        angles = np.asarray(angles, dtype=float)
+        cos, sin = np.cos(angles), np.sin(angles)
+        steps = np.arange(1, int(max_range / self.resolution) + 1) * self.resolution
+        xs = x + cos[:, None] * steps
+        ys = y + sin[:, None] * steps
+        gy, gx, inside = self._flat(xs, ys)
+        hit = ~inside
+        hit[inside] = self.occupied[gy[inside], gx[inside]]
+        any_hit = hit.any(axis=1)
+        distances = np.full(angles.shape, np.inf)
+        distances[any_hit] = steps[hit[any_hit].argmax(axis=1)]
+
+        # Hareketli engeller: ışın-daire kesişimi
+        if len(self.movers):
+            cx = self.movers[:, 0] - x
+            cy = self.movers[:, 1] - y
+            b = cos[:, None] * cx + sin[:, None] * cy
+            disc = b * b - (cx * cx + cy * cy - self.movers[:, 4]**2)
+            with np.errstate(invalid='ignore'):
+                t = b - np.sqrt(disc)
+            t[(disc < 0) | (t <= 0)] = np.inf
+            distances = np.minimum(distances, t.min(axis=1))
+
+        if noise > 0:
+            distances = distances + self.rng.normal(0, noise, distances.shape)
+        distances[distances > max_range] = np.nan
+        return np.maximum(distances, 0.0)
+
+
+def build_world(kind='mixed', width=30.0, height=30.0, seed=0, resolution=0.05,
+                clutter_density=0.02, movers=3):
+    # Hazır dünya türleri: 'open' (boş salon), 'rooms', 'corridors', 'clutter', 'mixed' (oda + dağınıklık)
+    world = SimulatedWorld(width, height, resolution, seed)
+    if kind == 'open':
+        pass  # Sadece dış duvarlar: boş salonda yürüyen insanlar
+    elif kind == 'rooms':
+        world.add_rooms()
+    elif kind == 'corridors':
+        world.add_corridors()
+    elif kind == 'clutter':
+        world.add_clutter(int(clutter_density * width * height))
+    elif kind == 'mixed':
+        world.add_rooms(room_size=8.0)
+        world.add_clutter(int(clutter_density * width * height), max_size=0.6)
+    else:
+        raise ValueError(f"Bilinmeyen dünya türü: {kind}")
+    if movers:
+        world.add_moving_obstacles(movers)
+    return world
+
+
+# Dünya + NavigationSystem + basit diferansiyel sürüş kinematiği
+# Her adımda: engeller hareket eder, sensörler okunur, navigasyon aşamaları
+# çalışır ve robot hesaplanan hız komutlarıyla ilerler. Aşama süreleri kaydedilir.
+class Simulation:
+    STAGES = ('position', 'sensor', 'navigate', 'control')
+
+    def __init__(self, world, num_sensors=36, num_nodes=500, resolution=0.1, storage='probability',
+                 planner='greedy', max_range=4.0, noise=0.02, dt=0.2, goal_timeout=600, seed=0,
+                 storage_options=None, instrumentation=None, robot_radius=None, pyramid=False,
+                 async_sensors=False, roadmap=False, ray_tables=False, tracker=False, record=None):
+        self.world = world
+        self.rng = np.random.default_rng(seed)
+        self.nav = NavigationSystem(world.width, world.height, resolution, storage, planner,
+                                    storage_options, num_sensors=num_sensors,
+                                    instrumentation=instrumentation, robot_radius=robot_radius,
+                                    pyramid=pyramid, roadmap=roadmap, ray_tables=ray_tables,
+                                    tracker=tracker, tracker_dt=dt)
+        self.max_range = max_range
+        self.noise = noise
+        self.dt = dt
+        self.goal_timeout = goal_timeout  # Bu kadar adımda ulaşılamayan hedef bırakılır
+
+        # async_sensors=True: taramalar SensorPipeline ile arka planda işlenir
+        # (sonuçlar iş parçacığı zamanlamasına bağlı olduğu için tohumla birebir tekrarlanmaz)
+        # Senkron modda kilit hiç çekişmez
+        self.pipeline = None
+        self.lock = threading.Lock()
+        if async_sensors:
+            self.pipeline = SensorPipeline(self.nav)
+            self.lock = self.pipeline.lock
+            self.pipeline.start()
+
+        # Yol haritası: engellerden uzak rastgele nodeler (2m içindekiler otomatik bağlanır)
+        # roadmap=True ise kenarlar grid'e göre kontrol edilir ve harita grid'den tamamlanır
+        self.free_mask = world.clearance_mask(0.3)
+        positions = world.random_free_positions(num_nodes, mask=self.free_mask)
+        self.nav.hybrid_map.add_nodes(positions[:, 0], positions[:, 1])
+        self.node_ids = list(self.nav.hybrid_map.nodes)
+
+        # record: navigasyon girdilerinin yazılacağı görev kaydı dosyası (bkz. mission_log.py)
+        # Kayıt yol haritası kurulduktan sonra açılır; başlangıç haritası kayda eklenir
+        self.recorder = None
+        if record is not None:
+            self.recorder = MissionRecorder(record, self.nav)
+            self.nav.recorder = self.recorder
+
+        # Robot durumu
+        x, y = world.random_free_positions(1, mask=self.free_mask)[0]
+        self.pose = [float(x), float(y), 0.0]
+        self.nav.update_position(*self.pose)
+
+        # İstatistikler
+        self.ticks = 0
+        self.goal_ticks = 0
+        self.goals_reached = 0
+        self.goals_abandoned = 0
+        self.collisions = 0
+        self.timings = {stage: [] for stage in self.STAGES}
+        self.new_goal()
+
+    def new_goal(self):
+        # Rastgele bir yol haritası node'unu yeni hedef yap
+        # set_goal haritayı okur (roadmap=True ise yeni node'ların kenar kontrolleri): kilit altında
+        node = self.nav.hybrid_map.nodes[self.node_ids[self.rng.integers(len(self.node_ids))]]
+        with self.lock:
+            self.nav.set_goal(node.x, node.y)
+        self.goal_ticks = 0
+
+    def step(self):
+        # Tek simülasyon adımı; navigasyon durum mesajını döndürür
+        nav = self.nav
+        timings = self.timings
+        self.world.step(self.dt)
+        readings = self.world.cast_rays(self.pose[0], self.pose[1], nav.obstacle_detector.angle_array,
+                                        self.max_range, self.noise)
+
+        begin = time.perf_counter()
+        with self.lock:
+            nav.update_position(*self.pose)
+        after_position = time.perf_counter()
+        if self.pipeline is not None:
+            self.pipeline.submit(readings, self.pose[:2])
+        else:
+            nav.update_sensor_data(readings)
+        after_sensor = time.perf_counter()
+        with self.lock:
+            status = nav.navigate_to_goal()
+            after_navigate = time.perf_counter()
+            linear, angular = nav.calculate_movement_commands()
+        end = time.perf_counter()
+        timings['position'].append(after_position - begin)
+        timings['sensor'].append(after_sensor - after_position)
+        timings['navigate'].append(after_navigate - after_sensor)
+        timings['control'].append(end - after_navigate)
+
+        # Kinematik: önce dön, sonra ilerle; engele girecekse yerinde kal
+        x, y, theta = self.pose
+        theta = (theta + angular * self.dt + math.pi) % (2 * math.pi) - math.pi
+        new_x = x + linear * math.cos(theta) * self.dt
+        new_y = y + linear * math.sin(theta) * self.dt
+        if linear and self.world.is_occupied(new_x, new_y)[0]:
+            self.collisions += 1
+            new_x, new_y = x, y
+        self.pose = [new_x, new_y, theta]
+
+        self.ticks += 1
+        self.goal_ticks += 1
+        if status == "Hedefe ulaşıldı":
+            self.goals_reached += 1
+            self.new_goal()
+        elif self.goal_ticks >= self.goal_timeout:
+            self.goals_abandoned += 1
+            self.new_goal()
+        return status
+
+    def run(self, ticks, quiet=True):
+        # quiet=True: planlayıcıların "yol bulunamadı" çıktıları bastırılır
+        if quiet:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                for _ in range(ticks):
+                    self.step()
+        else:
+            for _ in range(ticks):
+                self.step()
+        if self.pipeline is not None:
+            self.pipeline.flush()
+        return self.summary()
+
+    def close(self):
+        # Arka plan sensör hattını durdur ve görev kaydını kapat
+        if self.pipeline is not None:
+            self.pipeline.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+
+    def summary(self):
+        # Aşama başına gecikme yüzdelikleri (ms) ve genel istatistikler
+        stages = {}
+        for stage, values in self.timings.items():
+            values = np.array(values) * 1e3
+            if values.size:
+                stages[stage] = {'mean_ms': float(values.mean()),
+                                 'p50_ms': float(np.percentile(values, 50)),
+                                 'p95_ms': float(np.percentile(values, 95)),
+                                 'p99_ms': float(np.percentile(values, 99))}
+        total = sum(np.array(values) for values in self.timings.values()) if self.ticks else np.zeros(1)
+        return {
+            'ticks': self.ticks,
+            'ticks_per_second': float(len(total) / total.sum()) if total.sum() > 0 else 0.0,
+            'tick_p99_ms': float(np.percentile(total, 99) * 1e3),
+            'stages': stages,
+            'goals_reached': self.goals_reached,
+            'goals_abandoned': self.goals_abandoned,
+            'collisions': self.collisions,
+            'nodes': len(self.nav.hybrid_map.nodes),
+            'pipeline': self.pipeline.stats() if self.pipeline is not None else None,
+            'roadmap': self.nav.roadmap.stats() if self.nav.roadmap is not None else None,
+        }
@@ -0,0 +1,92 @@
+import math
+import heapq
+
+# Topolojik nodeler için düzgün (uniform) hash grid uzamsal indeksi
+# Her hücre cell_size x cell_size metrelik bir kovadır; ekleme O(1),
+# yarıçap ve en yakın komşu sorguları sadece çevredeki kovalara bakar
+class SpatialHashGrid:
+    def __init__(self, cell_size=2.0):
+        self.cell_size = cell_size
+        self.buckets = {}    # (hücre_x, hücre_y) -> node ID listesi
+        self.positions = {}  # node ID -> (x, y)
+
+    def __len__(self):
+        return len(self.positions)
+
+    def _key(self, x, y):
+        return (math.floor(x / self.cell_size), math.floor(y / self.cell_size))
+
+    def insert(self, item_id, x, y):
+        # Yeni bir noktayı indekse ekle
+        self.positions[item_id] = (x, y)
+        self.buckets.setdefault(self._key(x, y), []).append(item_id)
+
+    def remove(self, item_id):
+        # Bir noktayı indeksten çıkar
+        x, y = self.positions.pop(item_id)
+        key = self._key(x, y)
+        bucket = self.buckets[key]
+        bucket.remove(item_id)
+        if not bucket:
+            del self.buckets[key]
+
+    def _ring_keys(self, center, ring):
+        # Merkez kovanın etrafındaki 'ring' uzaklığındaki kare halkanın kovaları
+        cx, cy = center
+        if ring == 0:
+            yield center
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
+
+    def _distances(self, keys, x, y):
+        # Verilen kovalardaki tüm noktaların (mesafe, ID) listesi
+        result = []
+        for key in keys:
+            for item_id in self.buckets.get(key, ()):
+                px, py = self.positions[item_id]
+                result.append((math.sqrt((px - x)**2 + (py - y)**2), item_id))
+        return result
+
+    def within_radius(self, x, y, radius):
+        # Yarıçaptan (kesin olarak) yakın tüm noktalar, ID sırasıyla (ID, mesafe)
+        cx0, cy0 = self._key(x - radius, y - radius)
+        cx1, cy1 = self._key(x + radius, y + radius)
+        keys = ((cx, cy) for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1))
+        found = [(item_id, dist) for dist, item_id in self._distances(keys, x, y) if dist < radius]
+        found.sort()
+        return found
+
+    def k_nearest(self, x, y, k):
+        # En yakın k nokta, artan mesafeye göre (ID, mesafe); eşitlikte küçük ID önce
+        if k <= 0 or not self.positions:
+            return []
+        k = min(k, len(self.positions))
+        center = self._key(x, y)
+        # Sorgu noktasının kendi kovasının en yakın kenarına uzaklığı
+        edge = min(x - center[0] * self.cell_size, (center[0] + 1) * self.cell_size - x,
+                   y - center[1] * self.cell_size, (center[1] + 1) * self.cell_size - y)
+        candidates = []
+        ring = 0
+        while True:
+            # Halka, dolu kova sayısından büyüdüyse doğrudan dolu kovaları tara
+            if 8 * ring > len(self.buckets):
+                candidates = self._distances(self.buckets.keys(), x, y)
+                break
+            candidates.extend(self._distances(self._ring_keys(center, ring), x, y))
+            # Taranmamış noktalar, taranan karenin kenarına olan mesafeden daha uzaktadır
+            if len(candidates) >= k and heapq.nsmallest(k, candidates)[-1][0] <= edge + ring * self.cell_size:
+                break
+            ring += 1
+        return [(item_id, dist) for dist, item_id in heapq.nsmallest(k, candidates)]
+
+    def nearest(self, x, y):
+        # En yakın nokta (ID, mesafe); indeks boşsa (None, inf)
+        result = self.k_nearest(x, y, 1)
+        if not result:
+            return None, float('inf')
+        return result[0]
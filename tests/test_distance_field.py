@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+from occupancy_grid import OccupancyGrid
+
+
+def brute_force_clearance(grid, max_distance):
+    # Her hücreden en yakın dolu hücreye Öklid mesafesi (metre), max_distance ile sınırlı
+    occupied = np.flatnonzero(grid.to_probability().ravel() >= grid.occupied_threshold)
+    cells_y, cells_x = np.divmod(np.arange(grid.cells_x * grid.cells_y), grid.cells_x)
+    if not occupied.size:
+        return np.full(cells_x.size, max_distance)
+    obstacle_y, obstacle_x = np.divmod(occupied, grid.cells_x)
+    distance = np.hypot(cells_x[:, None] - obstacle_x, cells_y[:, None] - obstacle_y).min(axis=1)
+    return np.minimum(distance * grid.resolution, max_distance)
+
+
+@pytest.mark.parametrize('max_distance', [0.6, 1.0])
+@pytest.mark.parametrize('seed', range(3))
+def test_incremental_updates_match_brute_force(max_distance, seed):
+    rng = np.random.default_rng(seed)
+    grid = OccupancyGrid(4.0, 3.0, 0.1)
+    field = grid.enable_distance_field(max_distance)
+    all_cells = np.arange(grid.cells_x * grid.cells_y)
+    for step in range(60):
+        # Rastgele hücreleri doldur veya boşalt (bazı adımlarda birkaç parti birikir)
+        for _ in range(int(rng.integers(1, 4))):
+            count = int(rng.integers(1, 25))
+            xs, ys = rng.uniform(0, grid.width, count), rng.uniform(0, grid.height, count)
+            occupied = rng.random() < 0.55
+            for _ in range(3):
+                grid.update_cells(xs, ys, occupied, 0.95)
+        # Mesafeler float32 tutulur: max_distance'ta (0.6 -> 0.6000000238) küçük yuvarlama farkı
+        np.testing.assert_allclose(field.clearance_cells(all_cells),
+                                   brute_force_clearance(grid, max_distance), rtol=0, atol=1e-6)
+
+
+def test_occupy_then_free_everything():
+    rng = np.random.default_rng(5)
+    grid = OccupancyGrid(3.0, 3.0, 0.1)
+    field = grid.enable_distance_field(1.0)
+    xs, ys = rng.uniform(0, 3, 80), rng.uniform(0, 3, 80)
+    for _ in range(3):
+        grid.update_cells(xs, ys, True, 0.95)
+    all_cells = np.arange(grid.cells_x * grid.cells_y)
+    np.testing.assert_allclose(field.clearance_cells(all_cells), brute_force_clearance(grid, 1.0), atol=1e-6)
+    for _ in range(6):
+        grid.update_cells(xs, ys, False, 0.95)
+    np.testing.assert_array_equal(field.clearance_cells(all_cells), 1.0)
+    assert not field.is_obstacle.any()
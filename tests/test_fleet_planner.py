@@ -0,0 +1,92 @@
+import math
+import random
+import pytest
+from fleet_planner import FleetPlanner
+from greedy_algorithm import GreedyBestFirst
+from topological_mapping import HybridMap
+
+
+def build_map(seed=0, num_nodes=300):
+    # Engelli kenar ve node içeren, bir kısmı kopuk olabilen rastgele yol haritası
+    rng = random.Random(seed)
+    hybrid_map = HybridMap(30.0, 30.0, 0.5)
+    hybrid_map.add_nodes([rng.uniform(0, 30) for _ in range(num_nodes)],
+                         [rng.uniform(0, 30) for _ in range(num_nodes)])
+    for node_id in rng.sample(range(num_nodes), num_nodes // 8):
+        neighbors = list(hybrid_map.graph.neighbors(node_id)[0])
+        if neighbors:
+            hybrid_map.set_edge_blocked(node_id, rng.choice(neighbors))
+    for node_id in rng.sample(range(num_nodes), num_nodes // 60):
+        hybrid_map.set_node_blocked(node_id)
+    return hybrid_map
+
+
+def path_cost(hybrid_map, path):
+    cost = 0.0
+    for node1_id, node2_id in zip(path, path[1:]):
+        targets, lengths = hybrid_map.graph.neighbors(node1_id)
+        cost += hybrid_map.edge_cost(node1_id, node2_id, lengths[list(targets).index(node2_id)])
+    return cost
+
+
+@pytest.mark.parametrize('workers', [0, 2])
+@pytest.mark.parametrize('num_starts, num_goals', [(3, 7), (7, 3)])
+def test_cost_matrix_matches_astar(workers, num_starts, num_goals):
+    hybrid_map = build_map()
+    rng = random.Random(1)
+    start_ids = rng.sample(range(hybrid_map.next_node_id), num_starts)
+    goal_ids = rng.sample(range(hybrid_map.next_node_id), num_goals)
+    astar = GreedyBestFirst(hybrid_map, mode='astar')
+    with FleetPlanner(hybrid_map, workers=workers) as planner:
+        costs, paths = planner.cost_matrix(start_ids, goal_ids)
+    assert costs.shape == (num_starts, num_goals)
+    for i, start_id in enumerate(start_ids):
+        for j, goal_id in enumerate(goal_ids):
+            expected = astar.find_path(start_id, goal_id)
+            if expected is None:
+                assert math.isinf(costs[i, j]) and paths[i][j] is None
+                continue
+            path = paths[i][j]
+            assert path[0] == start_id and path[-1] == goal_id
+            assert costs[i, j] == pytest.approx(path_cost(hybrid_map, expected))
+            assert path_cost(hybrid_map, path) == pytest.approx(costs[i, j])
+
+
+def test_serial_and_parallel_agree():
+    hybrid_map = build_map(seed=2)
+    rng = random.Random(3)
+    pairs = [(rng.randrange(hybrid_map.next_node_id), rng.randrange(hybrid_map.next_node_id))
+             for _ in range(30)]
+    with FleetPlanner(hybrid_map, workers=0) as serial, FleetPlanner(hybrid_map, workers=2) as parallel:
+        assert [cost for cost, _ in serial.plan_pairs(pairs)] == \
+            pytest.approx([cost for cost, _ in parallel.plan_pairs(pairs)])
+
+
+def test_snapshot_ignores_later_edits_until_updated():
+    hybrid_map = build_map(seed=4)
+    astar = GreedyBestFirst(hybrid_map, mode='astar')
+    # Ara node'u olan bir yol seç; ilk kenarı anlık görüntüden sonra engellenir
+    start_id = 0
+    goal_id = next(node_id for node_id in range(1, hybrid_map.next_node_id)
+                   if len(astar.find_path(start_id, node_id) or ()) > 2)
+    with FleetPlanner(hybrid_map, workers=0) as planner:
+        before = planner.cost_matrix([start_id], [goal_id])[0][0, 0]
+        path = astar.find_path(start_id, goal_id)
+        hybrid_map.set_edge_blocked(path[0], path[1])
+        assert planner.cost_matrix([start_id], [goal_id])[0][0, 0] == before
+        planner.update_snapshot()
+        after = planner.cost_matrix([start_id], [goal_id])[0][0, 0]
+    expected = astar.find_path(start_id, goal_id)
+    assert after == (pytest.approx(path_cost(hybrid_map, expected)) if expected else math.inf)
+
+
+def test_invalid_use():
+    hybrid_map = build_map(num_nodes=20)
+    with pytest.raises(ValueError):
+        FleetPlanner(hybrid_map, workers=-1)
+    planner = FleetPlanner(hybrid_map, workers=0)
+    with pytest.raises(ValueError):
+        planner.cost_matrix([0], [hybrid_map.next_node_id])
+    planner.close()
+    with pytest.raises(ValueError):
+        planner.cost_matrix([0], [1])
@@ -0,0 +1,94 @@
+import random
+import numpy as np
+from graph_store import GraphStore
+
+
+def build_random(seed, num_nodes=60, num_edges=600):
+    # Rastgele graf ve sıralı referans komşuluk listeleri (node -> [(hedef, uzunluk), ...])
+    rng = random.Random(seed)
+    store = GraphStore()
+    reference = []
+    for _ in range(num_nodes):
+        store.add_node(rng.uniform(0, 20), rng.uniform(0, 20))
+        reference.append([])
+    for _ in range(num_edges):
+        a, b = rng.randrange(num_nodes), rng.randrange(num_nodes)
+        if a == b:
+            continue
+        added = store.add_edge(a, b)
+        known = any(target == b for target, _ in reference[a])
+        assert added != known
+        if not known:
+            length = np.hypot(store.xs[a] - store.xs[b], store.ys[a] - store.ys[b])
+            reference[a].append((b, length))
+            reference[b].append((a, length))
+    return store, reference
+
+
+def assert_matches(store, reference):
+    assert store.num_nodes == len(reference)
+    assert store.num_edges == sum(len(edges) for edges in reference) // 2
+    for node_id, edges in enumerate(reference):
+        targets, lengths = store.neighbors(node_id)
+        assert list(targets) == [target for target, _ in edges]
+        np.testing.assert_allclose(list(lengths), [length for _, length in edges])
+
+
+def test_blocks_move_and_compact_without_losing_edges():
+    store, reference = build_random(0)
+    assert store.pool_garbage > 0  # Yoğun ekleme blokları taşıdı
+    assert_matches(store, reference)
+    store._compact()
+    assert store.pool_garbage == 0
+    assert_matches(store, reference)
+    # Sıkıştırmadan sonra eklemeler de doğru bloklara yazılır
+    store.add_edge(0, 1)
+    store.add_edge(0, 2)
+    for a, b in ((0, 1), (0, 2)):
+        if not any(target == b for target, _ in reference[a]):
+            length = np.hypot(store.xs[a] - store.xs[b], store.ys[a] - store.ys[b])
+            reference[a].append((b, length))
+            reference[b].append((a, length))
+    assert_matches(store, reference)
+
+
+def test_compaction_runs_when_garbage_dominates_pool():
+    store = GraphStore()
+    hub = store.add_node(0.0, 0.0)
+    for i in range(200):
+        store.add_edge(hub, store.add_node(float(i), 1.0))
+    # Hub bloğu defalarca taşındı; çöp havuzun yarısını geçmeden sıkıştırılmış olmalı
+    assert store.pool_garbage * 2 <= len(store.targets)
+    assert list(store.neighbors(hub)[0]) == list(range(1, 201))
+
+
+def test_csr_preserves_insertion_order():
+    store, reference = build_random(1)
+    offsets, targets, lengths = store.csr()
+    assert offsets[0] == 0 and offsets[-1] == targets.size == store.num_arcs
+    for node_id, edges in enumerate(reference):
+        begin, end = offsets[node_id], offsets[node_id + 1]
+        assert targets[begin:end].tolist() == [target for target, _ in edges]
+        np.testing.assert_allclose(lengths[begin:end], [length for _, length in edges])
+    # Graf değişmedikçe aynı kopya döner, değişince yenilenir
+    assert store.csr() is store.csr()
+    version = store.version
+    store.add_node(5.0, 5.0)
+    assert store.version != version
+    assert store.csr()[0].size == store.num_nodes + 1
+
+
+def test_from_csr_round_trip_and_growth():
+    store, reference = build_random(2)
+    xs, ys = store.coordinates().T
+    copy = GraphStore.from_csr(xs, ys, *store.csr())
+    assert_matches(copy, reference)
+    # Yüklenen graf tam dolu bloklarla başlar; yeni kenarlar blokları taşır
+    new_id = copy.add_node(1.0, 1.0)
+    reference.append([])
+    for other_id in range(0, 10):
+        copy.add_edge(new_id, other_id)
+        length = np.hypot(copy.xs[new_id] - copy.xs[other_id], copy.ys[new_id] - copy.ys[other_id])
+        reference[new_id].append((other_id, length))
+        reference[other_id].append((new_id, length))
+    assert_matches(copy, reference)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+from occupancy_grid import OccupancyGrid
+
+
+class ChangeRecorder:
+    # Grid eşik geçişlerini adım adım toplayan dinleyici
+    def __init__(self):
+        self.occupied = set()
+        self.freed = set()
+
+    def on_cells_changed(self, became_occupied, became_free):
+        self.occupied.update(became_occupied.tolist())
+        self.freed.update(became_free.tolist())
+
+    def take(self):
+        changes = (self.occupied, self.freed)
+        self.occupied, self.freed = set(), set()
+        return changes
+
+
+def random_writes(grid, rng, count=60):
+    xs, ys = rng.uniform(0, grid.width, count), rng.uniform(0, grid.height, count)
+    grid.update_cells(xs, ys, rng.random(count) < 0.7, rng.uniform(0.6, 0.95, count))
+
+
+@pytest.mark.parametrize('storage, tolerance', [('log_odds', 1e-9), ('tiled', 1e-5)])
+def test_lazy_decay_matches_eager_decay(storage, tolerance):
+    rng = np.random.default_rng(0)
+    eager = OccupancyGrid(8.0, 8.0, 0.1, 'probability')
+    lazy = OccupancyGrid(8.0, 8.0, 0.1, storage)
+    for step in range(120):
+        if step == 60:
+            # Bozunma oranı değişince bekleyen bozunma eski oranla işlenir
+            eager.decay_factor = lazy.decay_factor = 0.03
+        state = rng.bit_generator.state
+        random_writes(eager, rng)
+        rng.bit_generator.state = state
+        random_writes(lazy, rng)
+        steps = int(rng.integers(1, 4))
+        eager.apply_time_decay(steps)
+        lazy.apply_time_decay(steps)
+        np.testing.assert_allclose(lazy.to_probability(), eager.to_probability(), atol=tolerance)
+
+
+@pytest.mark.parametrize('storage', ['probability', 'log_odds'])
+@pytest.mark.parametrize('steps', [1, 3])
+def test_listeners_fire_when_cells_decay_below_threshold(storage, steps):
+    rng = np.random.default_rng(1)
+    grid = OccupancyGrid(6.0, 6.0, 0.1, storage)
+    grid.decay_factor = 0.05
+    random_writes(grid, rng, 200)  # Dinleyiciden önce dolu olan hücreler de zamanlanır
+    recorder = ChangeRecorder()
+    grid.add_change_listener(recorder)
+    threshold = grid.occupied_threshold
+    total_freed = 0
+    for step in range(150 // steps):
+        before = grid.to_probability().ravel() >= threshold
+        if step % 10 == 0:
+            # Bazı hücreler tekrar yazılır: eski zamanlamalar elenmeli, yenileri geçerli olmalı
+            random_writes(grid, rng)
+        written = grid.to_probability().ravel() >= threshold
+        occupied, freed = recorder.take()
+        assert occupied == set(np.flatnonzero(written & ~before).tolist())
+        assert freed == set(np.flatnonzero(before & ~written).tolist())
+
+        grid.apply_time_decay(steps)  # steps > 1: birleştirilmiş taramalar
+        after = grid.to_probability().ravel() >= threshold
+        occupied, freed = recorder.take()
+        assert occupied == set()
+        assert freed == set(np.flatnonzero(written & ~after).tolist())
+        total_freed += len(freed)
+    assert total_freed > 0
@@ -0,0 +1,76 @@
+import random
+import pytest
+from greedy_algorithm import GreedyBestFirst
+from incremental_planner import DStarLite
+from topological_mapping import HybridMap
+
+
+def path_cost(hybrid_map, path):
+    # Yolun toplam uzunluğu; engelli kenar içeriyorsa inf
+    cost = 0.0
+    for node1_id, node2_id in zip(path, path[1:]):
+        targets, lengths = hybrid_map.graph.neighbors(node1_id)
+        cost += hybrid_map.edge_cost(node1_id, node2_id, lengths[list(targets).index(node2_id)])
+    return cost
+
+
+def build_map(seed, num_nodes=150):
+    rng = random.Random(seed)
+    hybrid_map = HybridMap(20.0, 20.0, 0.5)
+    hybrid_map.add_nodes([rng.uniform(0, 20) for _ in range(num_nodes)],
+                         [rng.uniform(0, 20) for _ in range(num_nodes)])
+    return rng, hybrid_map
+
+
+def assert_same_cost(hybrid_map, planner, astar, start_id, goal_id):
+    expected = astar.find_path(start_id, goal_id)
+    path = planner.find_path(start_id, goal_id)
+    if expected is None:
+        assert path is None
+        return None
+    assert path is not None
+    assert path[0] == start_id and path[-1] == goal_id
+    assert path_cost(hybrid_map, path) == pytest.approx(path_cost(hybrid_map, expected))
+    return path
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_astar_under_edge_changes(seed):
+    rng, hybrid_map = build_map(seed)
+    planner = DStarLite(hybrid_map)
+    astar = GreedyBestFirst(hybrid_map, mode='astar')
+    start_id, goal_id = rng.sample(range(hybrid_map.next_node_id), 2)
+
+    for step in range(80):
+        path = assert_same_cost(hybrid_map, planner, astar, start_id, goal_id)
+        operation = rng.random()
+        if operation < 0.4 and path and len(path) > 1:
+            # Yol üzerindeki bir kenarı engelle (onarım gerektirir)
+            index = rng.randrange(len(path) - 1)
+            planner.block_edge(path[index], path[index + 1])
+        elif operation < 0.6 and hybrid_map.blocked_edges:
+            planner.unblock_edge(*rng.choice(sorted(hybrid_map.blocked_edges)))
+        elif operation < 0.7:
+            hybrid_map.add_node(rng.uniform(0, 20), rng.uniform(0, 20))
+        elif operation < 0.8 and path and len(path) > 2:
+            planner.block_node(path[rng.randrange(1, len(path) - 1)])
+        elif operation < 0.85 and hybrid_map.blocked_nodes:
+            planner.unblock_node(rng.choice(sorted(hybrid_map.blocked_nodes)))
+        elif operation < 0.95 and path and len(path) > 1:
+            start_id = path[1]  # Robot yol boyunca ilerler (km düzeltmesi)
+        else:
+            goal_id = rng.randrange(hybrid_map.next_node_id)  # Yeni hedef: arama sıfırlanır
+
+
+def test_unchanged_map_needs_no_expansions():
+    rng, hybrid_map = build_map(0)
+    planner = DStarLite(hybrid_map)
+    first = planner.find_path(0, 100)
+    assert planner.last_expansions > 0
+    assert planner.find_path(0, 100) == first
+    assert planner.last_expansions == 0
+
+
+def test_invalid_nodes():
+    _, hybrid_map = build_map(0, num_nodes=10)
+    assert DStarLite(hybrid_map).find_path(0, hybrid_map.next_node_id) is None
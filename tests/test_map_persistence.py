@@ -0,0 +1,59 @@
+import numpy as np
+import pytest
+from greedy_algorithm import GreedyBestFirst
+from map_persistence import load_map, save_map
+from topological_mapping import HybridMap
+
+
+def build_map(storage, seed=0):
+    # Gözlenmiş grid, rastgele yol haritası ve engellenmiş kenar/node içeren harita
+    rng = np.random.default_rng(seed)
+    hybrid_map = HybridMap(20.0, 20.0, 0.1, storage)
+    angles = np.linspace(-np.pi, np.pi, 36, endpoint=False)
+    for _ in range(5):
+        hybrid_map.update_grid(tuple(rng.uniform(3, 17, 2)), (angles, rng.uniform(0.5, 4.0, 36)))
+    for x, y in rng.uniform(0, 20, (200, 2)):
+        hybrid_map.add_node(x, y)
+    hybrid_map.set_edge_blocked(0, hybrid_map.graph.neighbors(0)[0][0])
+    hybrid_map.set_node_blocked(5)
+    return hybrid_map
+
+
+def assert_same_map(loaded, original):
+    np.testing.assert_array_equal(loaded.occupancy_grid.to_probability(),
+                                  original.occupancy_grid.to_probability())
+    np.testing.assert_array_equal(loaded.graph.coordinates(), original.graph.coordinates())
+    for loaded_array, original_array in zip(loaded.graph.csr(), original.graph.csr()):
+        np.testing.assert_array_equal(loaded_array, original_array)
+    assert loaded.blocked_edges == original.blocked_edges
+    assert loaded.blocked_nodes == original.blocked_nodes
+    assert loaded.next_node_id == original.next_node_id
+
+
+@pytest.mark.parametrize('storage', ['probability', 'log_odds', 'tiled'])
+@pytest.mark.parametrize('mmap', [True, False])
+def test_round_trip_then_add_nodes(tmp_path, storage, mmap):
+    original = build_map(storage)
+    path = tmp_path / 'map.bin'
+    save_map(original, path)
+    loaded = load_map(path, mmap=mmap)
+    assert_same_map(loaded, original)
+
+    # Yüklenen haritada büyümeye devam etmek orijinaldekiyle aynı grafı vermeli
+    rng = np.random.default_rng(1)
+    for x, y in rng.uniform(0, 20, (30, 2)):
+        assert loaded.add_node(x, y) == original.add_node(x, y)
+    assert_same_map(loaded, original)
+
+    # Aramalar da aynı yolları bulur
+    original_planner = GreedyBestFirst(original, mode='astar')
+    loaded_planner = GreedyBestFirst(loaded, mode='astar')
+    for start_id, goal_id in rng.integers(0, original.next_node_id, (20, 2)).tolist():
+        assert loaded_planner.find_path(start_id, goal_id) == original_planner.find_path(start_id, goal_id)
+
+
+def test_rejects_foreign_file(tmp_path):
+    path = tmp_path / 'not_a_map.bin'
+    path.write_bytes(b'\x00' * 64)
+    with pytest.raises(ValueError):
+        load_map(path)
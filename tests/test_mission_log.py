@@ -0,0 +1,68 @@
+import pytest
+from mission_log import MissionLog, MissionReplay
+from simulation import Simulation, build_world
+
+TICKS = 300
+
+
+def record_mission(path, **options):
+    world = build_world('mixed', 20.0, 20.0, seed=0)
+    simulation = Simulation(world, num_nodes=200, seed=0, record=str(path), **options)
+    simulation.run(TICKS)
+    simulation.close()
+    return simulation
+
+
+@pytest.mark.parametrize('options', [
+    {},
+    {'planner': 'dstar_lite', 'storage': 'log_odds'},
+    {'robot_radius': 0.2, 'pyramid': True, 'ray_tables': True},
+    {'tracker': True, 'dt': 0.1},
+    {'roadmap': True, 'planner': 'path_tree'},
+], ids=['default', 'dstar_log_odds', 'radius_pyramid_rays', 'tracker', 'roadmap_path_tree'])
+def test_replay_reproduces_recorded_outputs(tmp_path, options):
+    path = tmp_path / 'mission.navlog'
+    record_mission(path, **options)
+    summary = MissionReplay(str(path)).run()
+    assert summary['navigations'] == TICKS
+    assert summary['path_checks'] == TICKS
+    assert summary['path_mismatches'] == 0
+    assert summary['grid_checks'] > 0
+    assert summary['grid_mismatches'] == 0
+    assert summary['max_occupied_diff'] == 0
+
+
+def test_header_records_navigation_options(tmp_path):
+    path = tmp_path / 'mission.navlog'
+    record_mission(path, planner='path_tree', tracker=True, dt=0.1)
+    navigation = MissionLog(str(path)).header['navigation']
+    assert navigation['planner'] == 'path_tree'
+    assert navigation['tracker'] is True
+    assert navigation['tracker_dt'] == 0.1
+
+
+def test_batched_replay_and_limit(tmp_path):
+    path = tmp_path / 'mission.navlog'
+    record_mission(path)
+    summary = MissionReplay(str(path), batch=4).run()
+    assert summary['navigations'] == TICKS
+    assert summary['path_checks'] == TICKS
+    limited = MissionReplay(str(path)).run(limit=50)
+    assert limited['inputs'] == 50
+    assert limited['path_mismatches'] == 0
+    with pytest.raises(ValueError):
+        MissionReplay(str(path), batch=0)
+
+
+def test_rejects_truncated_and_foreign_logs(tmp_path):
+    path = tmp_path / 'mission.navlog'
+    record_mission(path)
+    data = path.read_bytes()
+    truncated = tmp_path / 'truncated.navlog'
+    truncated.write_bytes(data[:-3])
+    with pytest.raises(ValueError):
+        list(MissionLog(str(truncated)))
+    foreign = tmp_path / 'foreign.navlog'
+    foreign.write_bytes(b'\x00' * 64)
+    with pytest.raises(ValueError):
+        MissionLog(str(foreign))
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+from instrumentation import Instrumentation
+from navigation_system import NavigationSystem
+
+MODES = {'footprint': {}, 'distance_field': {'robot_radius': 0.2}, 'pyramid': {'pyramid': True}}
+
+
+def build_nav(seed, **options):
+    rng = np.random.default_rng(seed)
+    nav = NavigationSystem(12.0, 12.0, instrumentation=Instrumentation(), **options)
+    nav.hybrid_map.add_nodes(rng.uniform(0.5, 11.5, 120), rng.uniform(0.5, 11.5, 120))
+    return rng, nav
+
+
+def full_check(nav):
+    # Önbelleksiz tam kontrol; doğrulama durumu korunur
+    saved = nav.verified_path, nav.verified_cells, nav.verified_version
+    nav.verified_path = ()
+    valid = nav._check_path_validity()
+    nav.verified_path, nav.verified_cells, nav.verified_version = saved
+    return valid
+
+
+def write_cells(nav, rng, path, occupied):
+    # Yolun yakınına ve haritanın geri kalanına birkaç kez aynı yönde ölçüm yaz
+    nodes = nav.hybrid_map.nodes
+    node = nodes[path[rng.integers(len(path))]]
+    xs = np.concatenate([node.x + rng.normal(0, 0.3, 3), rng.uniform(0, 12, 5)])
+    ys = np.concatenate([node.y + rng.normal(0, 0.3, 3), rng.uniform(0, 12, 5)])
+    for _ in range(4):
+        nav.hybrid_map.occupancy_grid.update_cells(xs, ys, occupied, 0.95)
+
+
+@pytest.mark.parametrize('mode', MODES)
+@pytest.mark.parametrize('seed', range(3))
+def test_incremental_validity_matches_full_check(mode, seed):
+    rng, nav = build_nav(seed, **MODES[mode])
+    counters = nav.instrumentation.counters
+    checks = 0
+    while checks < 60:
+        start_id, goal_id = rng.choice(nav.hybrid_map.next_node_id, 2, replace=False)
+        path = nav.path_planner.find_path(int(start_id), int(goal_id))
+        if not path or len(path) < 3:
+            continue
+        nav.current_path = path
+        while len(nav.current_path) > 1 and checks < 60:
+            expected = full_check(nav)
+            assert nav.check_path_validity() == expected
+            checks += 1
+            write_cells(nav, rng, nav.current_path, rng.random() < 0.6)
+            if rng.random() < 0.3:
+                nav.current_path = nav.current_path[1:]  # Robot ilerledi: kalan kısım
+    # Kısayol (değişiklik günlüğü) gerçekten kullanıldı
+    assert counters.get('nav.validity_incremental', 0) > 0
+
+
+def test_path_invalidated_by_cell_on_path():
+    _, nav = build_nav(0)
+    nav.current_path = nav.path_planner.find_path(0, 50)
+    assert nav.check_path_validity()
+    full_checks = nav.instrumentation.counters['nav.validity_full']
+    node1, node2 = (nav.hybrid_map.nodes[node_id] for node_id in nav.current_path[:2])
+    # Yoldan uzak bir engel: sadece değişiklik günlüğüne bakılır
+    far_x, far_y = (11.9, 0.1) if node1.x < 6 else (0.1, 11.9)
+    for _ in range(4):
+        nav.hybrid_map.occupancy_grid.update_cell(far_x, far_y, True, 0.95)
+    assert nav.check_path_validity()
+    assert nav.instrumentation.counters['nav.validity_full'] == full_checks
+    # İlk segmentin ortasına engel
+    for _ in range(4):
+        nav.hybrid_map.occupancy_grid.update_cell((node1.x + node2.x) / 2, (node1.y + node2.y) / 2, True, 0.95)
+    assert not nav.check_path_validity()
+
+
+def test_segment_footprint_cache_is_bounded():
+    _, nav = build_nav(0)
+    nav.footprint_cache_size = 8
+    edges = [(node_id, int(other_id)) for node_id in range(30)
+             for other_id in nav.hybrid_map.graph.neighbors(node_id)[0][:1]]
+    footprints = [nav.segment_footprint(*edge).copy() for edge in edges]
+    assert len(nav.segment_footprints) == 8
+    assert list(nav.segment_footprints) == edges[-8:]
+    # Atılan segmentler yeniden hesaplanınca aynı hücreleri verir
+    for edge, cells in zip(edges, footprints):
+        np.testing.assert_array_equal(nav.segment_footprint(*edge), cells)
+    assert len(nav.segment_footprints) == 8
+
+
+@pytest.mark.parametrize('mode', MODES)
+def test_batched_edge_checks_match_single_edges(mode):
+    rng, nav = build_nav(3, **MODES[mode])
+    grid = nav.hybrid_map.occupancy_grid
+    for _ in range(4):
+        grid.update_cells(rng.uniform(0, 12, 150), rng.uniform(0, 12, 150), True, 0.95)
+    edges = [(node_id, int(other_id)) for node_id in range(nav.hybrid_map.next_node_id)
+             for other_id in nav.hybrid_map.graph.neighbors(node_id)[0]]
+    blocked = nav._edges_blocked(edges)
+    assert 0 < blocked.sum() < len(edges)
+    if mode != 'pyramid':
+        # Piramitte alt parçalara bölünme partideki en uzun kenara bağlıdır; muhafazakâr
+        # sonuç hücre köşelerinde partiden partiye değişebilir (bkz. occupancy_pyramid.py)
+        assert blocked.tolist() == [nav.is_segment_blocked(*edge) for edge in edges]
+
+    # Engelli kenarlar toplu sorguyla geri açılır, yoldakiler toplu sorguyla engellenir
+    unique_edges = sorted({tuple(sorted(edge)) for edge in edges})
+    for edge in unique_edges:
+        nav.hybrid_map.set_edge_blocked(*edge, True)
+    nav.current_path = None
+    nav.update_blocked_edges()
+    still_blocked = {edge for edge, is_blocked in zip(unique_edges, nav._edges_blocked(unique_edges)) if is_blocked}
+    assert nav.hybrid_map.blocked_edges == still_blocked
+    nav.current_path = [node_id for edge in unique_edges[:20] for node_id in edge]
+    nav.update_blocked_edges()
+    path_edges = list(zip(nav.current_path, nav.current_path[1:]))
+    assert nav.hybrid_map.blocked_edges == still_blocked | {
+        tuple(sorted(edge)) for edge, is_blocked in zip(path_edges, nav._edges_blocked(path_edges)) if is_blocked}
@@ -0,0 +1,150 @@
+import numpy as np
+from navigation_system import NavigationSystem
+from obstacle_tracker import ObstacleTracker
+from simulation import SimulatedWorld
+
+
+def test_cluster_splits_on_gaps_in_beam_order():
+    tracker = ObstacleTracker(cluster_radius=0.4)
+    # İki ayrı engel: ardışık noktalar arası 0.1m, engeller arası 2m
+    xs = np.array([1.0, 1.1, 1.2, 3.2, 3.3])
+    ys = np.zeros(5)
+    measurements, labels = tracker._cluster(xs, ys)
+    assert labels.tolist() == [0, 0, 0, 1, 1]
+    np.testing.assert_allclose(measurements, [[1.1, 0.0], [3.25, 0.0]])
+
+
+def test_cluster_merges_across_wrap_around():
+    tracker = ObstacleTracker(cluster_radius=0.4)
+    # Işın sırası 0 radyanda başlar: 0 radyan civarındaki engelin uç noktaları listenin
+    # başına ve sonuna düşer
+    angles = np.array([0.0, 0.05, np.pi / 2, 2 * np.pi - 0.1, 2 * np.pi - 0.05])
+    xs, ys = 5 + 2 * np.cos(angles), 5 + 2 * np.sin(angles)
+    measurements, labels = tracker._cluster(xs, ys)
+    assert labels.tolist() == [0, 0, 1, 0, 0]
+    np.testing.assert_allclose(measurements[0], [xs[[0, 1, 3, 4]].mean(), ys[[0, 1, 3, 4]].mean()])
+    np.testing.assert_allclose(measurements[1], [xs[2], ys[2]])
+
+
+def test_cluster_empty():
+    measurements, labels = ObstacleTracker()._cluster(np.empty(0), np.empty(0))
+    assert measurements.shape == (0, 2) and labels.size == 0
+
+
+def walk(tracker, start, velocity, steps):
+    # Tek noktalı engel sabit hızla yürür; her taramada bir uç nokta
+    tracked = []
+    for step in range(steps):
+        x, y = np.add(start, np.multiply(velocity, step * tracker.dt))
+        tracked.append(bool(tracker.update(np.array([x]), np.array([y]))[0]))
+    return tracked
+
+
+def test_constant_velocity_track_converges_and_predicts():
+    tracker = ObstacleTracker(dt=0.2)
+    tracked = walk(tracker, (1.0, 2.0), (0.5, 0.0), 20)
+    # Doğrulanıp hızı kestirilene kadar noktalar grid'e yazılmaya devam eder
+    assert not tracked[0] and tracked[-1]
+    positions, velocities, sigma = tracker.moving_tracks()
+    assert len(positions) == 1
+    np.testing.assert_allclose(velocities[0], [0.5, 0.0], atol=0.05)
+    np.testing.assert_allclose(positions[0], [1.0 + 0.5 * 19 * 0.2, 2.0], atol=0.05)
+    assert sigma[0] < 0.1
+
+    # Engelin 2 saniye sonra geçeceği dikey segment: 2.5s ufukta engelli, 0.5s ufukta değil
+    x = positions[0, 0] + 1.0
+    assert tracker.segments_blocked(x, 0.0, x, 4.0, horizon=2.5)[0]
+    assert not tracker.segments_blocked(x, 0.0, x, 4.0, horizon=0.5)[0]
+    # Engelin arkasında kalan segment hiçbir ufukta engelli değil
+    assert not tracker.segments_blocked(x - 2.5, 0.0, x - 2.5, 1.0, horizon=2.5)[0]
+    # start: sadece ufkun sonundaki tahmin; engel o zamana segmenti geçmiş olur
+    assert not tracker.segments_blocked(x, 0.0, x, 4.0, horizon=5.0, start=5.0)[0]
+
+
+def test_stationary_track_is_not_moving():
+    tracker = ObstacleTracker()
+    assert not any(walk(tracker, (3.0, 3.0), (0.0, 0.0), 10))
+    assert tracker.stats()['tracks'] == 1 and not tracker.has_moving_tracks()
+    assert not tracker.segments_blocked(2.0, 3.0, 4.0, 3.0, horizon=2.0)[0]
+
+
+def test_measurement_outside_gate_starts_new_track():
+    tracker = ObstacleTracker()
+    walk(tracker, (0.0, 0.0), (0.5, 0.0), 10)
+    states = tracker.states.copy()
+    # Tahmini konumun yakınındaki ölçüm ize eşleşir, uzaktaki yeni (geçici) iz açar
+    predicted = states[0, :2] + states[0, 2:] * tracker.dt
+    tracker.update(np.array([predicted[0] + 0.05, 4.0]), np.array([predicted[1], 4.0]))
+    assert tracker.stats()['tracks'] == 2 and tracker.stats()['created'] == 2
+    assert tracker.misses.tolist() == [0, 0] and tracker.hits[1] == 1
+    # Tahminden 1m sapan ölçüm (bir adımda 5 m/s sıçrama) kapı dışında: eşleşmez
+    tracker = ObstacleTracker()
+    walk(tracker, (0.0, 0.0), (0.5, 0.0), 10)
+    predicted = tracker.states[0, :2] + tracker.states[0, 2:] * tracker.dt
+    tracker.update(np.array([predicted[0] + 1.0]), np.array([predicted[1]]))
+    assert tracker.stats()['created'] == 2 and tracker.misses.tolist() == [1, 0]
+
+
+def test_unseen_tracks_expire_after_max_misses():
+    tracker = ObstacleTracker(max_misses=3)
+    walk(tracker, (0.0, 0.0), (0.5, 0.0), 5)
+    for _ in range(3):
+        tracker.update(np.empty(0), np.empty(0))
+        assert tracker.stats()['tracks'] == 1
+    # Görülmediği sürece tahmin ilerler, belirsizlik büyür
+    assert tracker.moving_tracks()[2][0] > 0.1
+    tracker.update(np.empty(0), np.empty(0))
+    assert tracker.stats() == {'tracks': 0, 'moving': 0, 'updates': 9, 'created': 1, 'deleted': 1}
+    assert not tracker.has_moving_tracks()
+
+
+def nav_with_track(position, velocity):
+    # Robot (2, 5)'te, yol +x yönünde; engel 'position'a 'velocity' ile yürüyerek gelmiş
+    nav = NavigationSystem(10.0, 10.0, num_sensors=8, tracker=True)
+    for x in (2.0, 3.0, 6.0):
+        nav.hybrid_map.add_node(x, 5.0)
+    nav.update_position(2.0, 5.0, 0.0)
+    nav.current_path = [0, 1, 2]
+    tracker = nav.tracker
+    start = np.subtract(position, np.multiply(velocity, 9 * tracker.dt))
+    walk(tracker, start, velocity, 10)
+    return nav
+
+
+def test_crossing_obstacle_clears_path_within_horizon():
+    nav = nav_with_track((2.3, 4.2), (0.0, 1.2))
+    horizon = nav.prediction_horizon
+    # Engel ufuk içinde yolu keser ama ufkun sonunda yoldan çıkmıştır: beklenir
+    assert nav.predicted_conflict(horizon)
+    assert not nav.predicted_conflict(horizon, horizon)
+
+
+def test_oncoming_obstacle_stays_on_path():
+    nav = nav_with_track((4.0, 5.0), (-0.5, 0.0))
+    horizon = nav.prediction_horizon
+    # Karşıdan gelen engel ufkun sonunda hâlâ yolda: beklemek çözüm değil
+    assert nav.predicted_conflict(horizon)
+    assert nav.predicted_conflict(horizon, horizon)
+    # Yolun ulaşılabilen kısmından uzak engel çakışma sayılmaz
+    assert not nav_with_track((5.5, 8.0), (0.0, 0.5)).predicted_conflict(horizon)
+
+
+def test_walking_person_leaves_no_trail_in_grid():
+    # Robot duruyor, bir kişi önünden 0.5 m/s ile geçiyor (varyans tespiti yavaş yürüyüşü
+    # ancak ışına girip çıkarken yakalar; boş gözlenmiş bölgeye düşen uç noktalar da izlenir)
+    trails = {}
+    for tracker in (False, True):
+        world = SimulatedWorld(8.0, 8.0, seed=0)
+        world.movers = np.array([[2.0, 2.5, 0.5, 0.0, 0.3]])
+        nav = NavigationSystem(8.0, 8.0, num_sensors=72, tracker=tracker)
+        nav.update_position(4.0, 5.0, 0.0)
+        for _ in range(40):
+            world.step(0.2)
+            nav.update_sensor_data(world.cast_rays(4.0, 5.0, nav.obstacle_detector.angle_array, 4.0, 0.02))
+        probabilities = nav.hybrid_map.occupancy_grid.to_probability()
+        trails[tracker] = int((probabilities[5:-5, 5:-5] >= 0.7).sum())  # Dış duvarlar hariç
+    assert trails[True] * 3 <= trails[False]
+    positions, velocities, _ = nav.tracker.moving_tracks()
+    person = np.hypot(*(positions - world.movers[0, :2]).T) < 0.5
+    assert person.any()
+    np.testing.assert_allclose(velocities[person][0], [0.5, 0.0], atol=0.15)
@@ -0,0 +1,91 @@
+import math
+import numpy as np
+import pytest
+from occupancy_grid import OccupancyGrid
+
+
+def scalar_ray_cells(resolution, x, y, angle, length):
+    # Tek ışının geçtiği hücreler (skaler Amanatides-Woo), başlangıç hücresinden itibaren
+    dx, dy = math.cos(angle), math.sin(angle)
+    cell_x, cell_y = math.floor(x / resolution), math.floor(y / resolution)
+    step_x, step_y = (1 if dx >= 0 else -1), (1 if dy >= 0 else -1)
+    next_x = ((cell_x + (step_x > 0)) * resolution - x) / dx if dx else math.inf
+    next_y = ((cell_y + (step_y > 0)) * resolution - y) / dy if dy else math.inf
+    delta_x = resolution / abs(dx) if dx else math.inf
+    delta_y = resolution / abs(dy) if dy else math.inf
+    cells = [(cell_x, cell_y)]
+    while min(next_x, next_y) < length:
+        if next_x <= next_y:  # Eşitlikte önce x sınırı (traverse_rays ile aynı)
+            cell_x += step_x
+            next_x += delta_x
+        else:
+            cell_y += step_y
+            next_y += delta_y
+        cells.append((cell_x, cell_y))
+    return cells
+
+
+def scalar_scan(grid, robot_pos, angles, distances, max_range=4.0):
+    # Taramayı update_cell ile hücre hücre uygula (harita dışındaki hücreler atlanır)
+    def update(cell_x, cell_y, occupied):
+        if 0 <= cell_x < grid.cells_x and 0 <= cell_y < grid.cells_y:
+            grid.update_cell((cell_x + 0.5) * grid.resolution, (cell_y + 0.5) * grid.resolution, occupied)
+
+    for angle, distance in zip(angles, distances):
+        if not distance <= max_range:
+            continue
+        cells = scalar_ray_cells(grid.resolution, robot_pos[0], robot_pos[1], angle, min(distance, max_range))
+        for cell_x, cell_y in cells[:-1]:
+            update(cell_x, cell_y, False)
+        if distance < max_range:
+            update(*cells[-1], True)
+
+
+@pytest.mark.parametrize('storage', ['probability', 'log_odds'])
+def test_update_cells_matches_update_cell(storage):
+    rng = np.random.default_rng(0)
+    batch = OccupancyGrid(5.0, 5.0, 0.1, storage)
+    scalar = OccupancyGrid(5.0, 5.0, 0.1, storage)
+    # Tekrarlanan hücreler ve harita dışı (sınıra kırpılan) koordinatlar
+    xs = np.concatenate([rng.uniform(-1, 6, 300), np.full(20, 2.55)])
+    ys = np.concatenate([rng.uniform(-1, 6, 300), np.full(20, 1.05)])
+    occupied = rng.random(xs.size) < 0.6
+    batch.update_cells(xs, ys, occupied)
+    for x, y, is_occupied in zip(xs, ys, occupied):
+        scalar.update_cell(x, y, is_occupied)
+    np.testing.assert_allclose(batch.to_probability(), scalar.to_probability(), atol=1e-9)
+
+
+@pytest.mark.parametrize('storage', ['probability', 'log_odds'])
+def test_batch_scans_match_scalar_updates(storage):
+    rng = np.random.default_rng(1)
+    batch = OccupancyGrid(6.0, 6.0, 0.1, storage)
+    scalar = OccupancyGrid(6.0, 6.0, 0.1, storage)
+    angles = np.linspace(-math.pi, math.pi, 72, endpoint=False)
+    scans = []
+    for _ in range(6):
+        # Kenara yakın başlangıçlar: ışınların bir kısmı harita dışına çıkar
+        robot_pos = tuple(rng.uniform(0.2, 5.8, 2))
+        distances = rng.uniform(0.05, 5.0, angles.size)
+        distances[rng.random(angles.size) < 0.1] = np.nan  # Okuma yok
+        distances[:3] = 4.0  # Tam menzilde: boş hücreler var, dolu hücre yok
+        scans.append((robot_pos, (angles, distances)))
+    batch.update_from_scans(scans)
+    for robot_pos, (scan_angles, distances) in scans:
+        scalar_scan(scalar, robot_pos, scan_angles, distances)
+    np.testing.assert_allclose(batch.to_probability(), scalar.to_probability(), atol=1e-9)
+    assert batch.change_version > 0
+    np.testing.assert_array_equal(batch.to_probability() >= batch.occupied_threshold,
+                                  scalar.to_probability() >= scalar.occupied_threshold)
+
+
+def test_single_scan_matches_scalar_updates():
+    grid = OccupancyGrid(4.0, 4.0, 0.1)
+    scalar = OccupancyGrid(4.0, 4.0, 0.1)
+    readings = [(angle, 1.5) for angle in np.linspace(0, 2 * math.pi, 16, endpoint=False)]
+    readings.append((0.3, None))
+    # Başlangıç hücre köşesinde değil: köşeden geçen köşegen ışınlarda eşitlik yuvarlamaya kalır
+    grid.update_from_sensor_data((2.03, 1.97), readings)
+    angles, distances = zip(*[(angle, math.nan if distance is None else distance) for angle, distance in readings])
+    scalar_scan(scalar, (2.03, 1.97), angles, distances)
+    np.testing.assert_allclose(grid.to_probability(), scalar.to_probability(), atol=1e-9)
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from occupancy_grid import OccupancyGrid
+from occupancy_pyramid import OccupancyPyramid
+
+
+def random_map(seed, side=12.0, walls=12):
+    rng = np.random.default_rng(seed)
+    grid = OccupancyGrid(side, side * 0.75, 0.1)
+    for _ in range(walls):
+        # Kısa duvarlar ve dağınık tek hücreler
+        x, y = rng.uniform(0, grid.width), rng.uniform(0, grid.height)
+        xs = x + np.arange(0, rng.uniform(0.2, 3.0), 0.05)
+        grid.update_cells(xs, np.full(xs.size, y), True, 0.95)
+        grid.update_cells(rng.uniform(0, grid.width, 3), rng.uniform(0, grid.height, 3), True, 0.95)
+    return rng, grid
+
+
+def occupied_mask(grid):
+    return grid.to_probability() >= grid.occupied_threshold
+
+
+def dense_free(grid, x0, y0, x1, y1, step=0.005):
+    # Hücrenin 1/20'si aralıklı örneklerle (uç noktalar dahil) dolu hücre yok mu
+    mask = occupied_mask(grid).ravel()
+    free = np.ones(x0.size, dtype=bool)
+    for i in range(x0.size):
+        steps = int(np.hypot(x1[i] - x0[i], y1[i] - y0[i]) / step) + 1
+        ratios = np.linspace(0.0, 1.0, steps + 1)
+        cells = grid.world_to_flat(x0[i] + ratios * (x1[i] - x0[i]), y0[i] + ratios * (y1[i] - y0[i]))
+        free[i] = not mask[cells].any()
+    return free
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_incremental_levels_match_rebuild(seed):
+    rng, grid = random_map(seed)
+    pyramid = grid.enable_pyramid()
+    for _ in range(40):
+        count = int(rng.integers(1, 40))
+        xs, ys = rng.uniform(0, grid.width, count), rng.uniform(0, grid.height, count)
+        occupied = rng.random() < 0.5
+        for _ in range(3):
+            grid.update_cells(xs, ys, occupied, 0.95)
+        grid.apply_time_decay(int(rng.integers(0, 3)))
+        if rng.random() < 0.5:
+            pyramid.flush()  # Bazen birkaç adımın geçişleri birikir
+    pyramid.flush()
+    rebuilt = OccupancyPyramid(grid)
+    assert len(rebuilt.levels) == len(pyramid.levels)
+    for level, expected in zip(pyramid.levels, rebuilt.levels):
+        np.testing.assert_array_equal(level, expected)
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_segments_free_is_conservative(seed):
+    rng, grid = random_map(seed)
+    pyramid = grid.enable_pyramid()
+    count = 1500
+    x0, y0 = rng.uniform(0, grid.width, count), rng.uniform(0, grid.height, count)
+    length = rng.choice([0.05, 0.3, 1.5, 6.0], count)
+    angle = rng.uniform(0, 2 * np.pi, count)
+    # Bir kısmı hücre köşelerinden tam geçen köşegenler
+    corners = rng.random(count) < 0.2
+    x0[corners], y0[corners] = np.round(x0[corners], 1), np.round(y0[corners], 1)
+    angle[corners] = np.pi / 4 + rng.integers(0, 4, corners.sum()) * np.pi / 2
+    x1 = np.clip(x0 + length * np.cos(angle), 0, grid.width - 1e-9)
+    y1 = np.clip(y0 + length * np.sin(angle), 0, grid.height - 1e-9)
+
+    free = pyramid.segments_free(x0, y0, x1, y1)
+    expected = dense_free(grid, x0, y0, x1, y1)
+    assert not (free & ~expected).any()
+    # Muhafazakârlık sadece köşeye yakın geçen parçalarda: sonuçların çoğu aynı
+    assert (free == expected).mean() > 0.95
+    # Tek tek sorgular da muhafazakâr (bölünme partiye bağlı olsa da)
+    for i in rng.choice(count, 100, replace=False):
+        single = pyramid.segments_free(x0[i], y0[i], x1[i], y1[i])[0]
+        assert expected[i] or not single
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_box_free_matches_cells(seed):
+    rng, grid = random_map(seed)
+    pyramid = grid.enable_pyramid()
+    mask = occupied_mask(grid)
+    for _ in range(300):
+        x0, x1 = rng.uniform(-0.5, grid.width + 0.5, 2)
+        y0, y1 = rng.uniform(-0.5, grid.height + 0.5, 2)
+        cells_x = np.clip((np.sort([x0, x1]) / grid.resolution).astype(int), 0, grid.cells_x - 1)
+        cells_y = np.clip((np.sort([y0, y1]) / grid.resolution).astype(int), 0, grid.cells_y - 1)
+        expected = not mask[cells_y[0]:cells_y[1] + 1, cells_x[0]:cells_x[1] + 1].any()
+        assert pyramid.box_free(x0, y0, x1, y1) == expected
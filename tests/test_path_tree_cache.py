@@ -0,0 +1,74 @@
+import random
+import pytest
+from greedy_algorithm import GreedyBestFirst
+from path_tree_cache import PathTreeCache
+from topological_mapping import HybridMap
+
+
+def path_cost(hybrid_map, path):
+    # Yolun toplam uzunluğu; engelli kenar içeriyorsa inf
+    cost = 0.0
+    for node1_id, node2_id in zip(path, path[1:]):
+        targets, lengths = hybrid_map.graph.neighbors(node1_id)
+        cost += hybrid_map.edge_cost(node1_id, node2_id, lengths[list(targets).index(node2_id)])
+    return cost
+
+
+def assert_same_costs(hybrid_map, cache, astar, pairs):
+    for start_id, goal_id in pairs:
+        expected = astar.find_path(start_id, goal_id)
+        path = cache.find_path(start_id, goal_id)
+        if expected is None:
+            assert path is None
+            continue
+        assert path is not None
+        assert path[0] == start_id and path[-1] == goal_id
+        assert path_cost(hybrid_map, path) == pytest.approx(path_cost(hybrid_map, expected))
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_matches_astar_under_random_edits(seed):
+    rng = random.Random(seed)
+    hybrid_map = HybridMap(20.0, 20.0, 0.5)
+    hybrid_map.add_nodes([rng.uniform(0, 20) for _ in range(150)], [rng.uniform(0, 20) for _ in range(150)])
+    cache = PathTreeCache(hybrid_map, capacity=3)
+    astar = GreedyBestFirst(hybrid_map, mode='astar')
+    # Az sayıda hedef: ağaçlar önbellekte kalır ve düzenlemelerle onarılır (ayrıca çıkarma)
+    goals = rng.sample(range(150), 4)
+
+    for _ in range(60):
+        operation = rng.random()
+        node_id = rng.randrange(hybrid_map.next_node_id)
+        neighbors = list(hybrid_map.graph.neighbors(node_id)[0])
+        if operation < 0.35 and neighbors:
+            hybrid_map.set_edge_blocked(node_id, rng.choice(neighbors))
+        elif operation < 0.55 and hybrid_map.blocked_edges:
+            hybrid_map.set_edge_blocked(*rng.choice(sorted(hybrid_map.blocked_edges)), blocked=False)
+        elif operation < 0.7:
+            hybrid_map.add_node(rng.uniform(0, 20), rng.uniform(0, 20))
+        elif operation < 0.85:
+            hybrid_map.set_node_blocked(node_id)
+        elif hybrid_map.blocked_nodes:
+            hybrid_map.set_node_blocked(rng.choice(sorted(hybrid_map.blocked_nodes)), blocked=False)
+        pairs = [(rng.randrange(hybrid_map.next_node_id), rng.choice(goals)) for _ in range(4)]
+        assert_same_costs(hybrid_map, cache, astar, pairs)
+
+    stats = cache.stats()
+    assert stats['trees'] <= 3
+    assert stats['hits'] > 0 and stats['evictions'] > 0
+
+
+def test_repeated_query_is_answered_from_tree():
+    rng = random.Random(0)
+    hybrid_map = HybridMap(20.0, 20.0, 0.5)
+    hybrid_map.add_nodes([rng.uniform(0, 20) for _ in range(100)], [rng.uniform(0, 20) for _ in range(100)])
+    cache = PathTreeCache(hybrid_map)
+    first = cache.find_path(3, 40)
+    assert cache.find_path(3, 40) == first
+    assert cache.last_expansions == 0
+    assert cache.stats()['builds'] == 1
+
+
+def test_invalid_capacity():
+    with pytest.raises(ValueError):
+        PathTreeCache(HybridMap(5.0, 5.0, 0.5), capacity=0)
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+from navigation_system import NavigationSystem
+from sensor_pipeline import SensorPipeline
+
+
+def make_scans(count, seed=0):
+    rng = np.random.default_rng(seed)
+    return [(tuple(rng.uniform(3, 7, 2)), rng.uniform(0.5, 3.0, 8)) for _ in range(count)]
+
+
+def new_nav():
+    return NavigationSystem(10.0, 10.0, num_sensors=8)
+
+
+def test_queued_scans_coalesce_into_one_update():
+    nav = new_nav()
+    pipeline = SensorPipeline(nav, max_pending=8)
+    # Okumalar değişmez: hareketli engel işaretlemesi devreye girmez
+    readings = np.linspace(0.8, 2.5, 8)
+    scans = [(robot_pos, readings) for robot_pos, _ in make_scans(5)]
+    for robot_pos, readings in scans:
+        assert pipeline.submit(readings, robot_pos)
+    assert all(item[2] is None for item in list(pipeline.queue.queue))
+    pipeline.start()
+    pipeline.flush()
+    pipeline.stop()
+    stats = pipeline.stats()
+    assert (stats['submitted'], stats['applied'], stats['batches']) == (5, 5, 1)
+    assert stats['mean_batch'] == 5.0 and stats['pending'] == 0
+
+    # Tek partide: tüm ışınlar birlikte uygulanır, ardından 5 adımlık bozunma
+    reference = new_nav().hybrid_map.occupancy_grid
+    angles = nav.obstacle_detector.angle_array
+    reference.update_from_scans([(robot_pos, (angles, readings)) for robot_pos, readings in scans])
+    reference.apply_time_decay(len(scans))
+    np.testing.assert_allclose(nav.hybrid_map.occupancy_grid.to_probability(),
+                               reference.to_probability(), atol=1e-12)
+
+
+def test_batches_are_limited_to_max_batch():
+    nav = new_nav()
+    pipeline = SensorPipeline(nav, max_pending=10, max_batch=4)
+    for robot_pos, readings in make_scans(10):
+        pipeline.submit(readings, robot_pos)
+    pipeline.start()
+    pipeline.flush()
+    pipeline.stop()
+    assert pipeline.stats()['applied'] == 10
+    assert pipeline.stats()['batches'] == 3
+
+
+def test_full_queue_drops_after_timeout():
+    pipeline = SensorPipeline(new_nav(), max_pending=2)
+    results = [pipeline.submit(readings, robot_pos, timeout=0.01) for robot_pos, readings in make_scans(4)]
+    assert results == [True, True, False, False]
+    stats = pipeline.stats()
+    assert (stats['submitted'], stats['dropped'], stats['pending']) == (4, 2, 2)
+    pipeline.flush()
+    assert pipeline.stats()['applied'] == 2
+
+
+def test_drop_oldest_keeps_newest_scans():
+    nav = new_nav()
+    pipeline = SensorPipeline(nav, max_pending=2, drop_oldest=True)
+    scans = make_scans(5)
+    for robot_pos, readings in scans:
+        assert pipeline.submit(readings, robot_pos)
+    assert pipeline.stats()['dropped'] == 3
+    assert [item[0] for item in list(pipeline.queue.queue)] == [robot_pos for robot_pos, _ in scans[-2:]]
+
+
+def test_flush_and_drain_without_worker():
+    nav = new_nav()
+    pipeline = SensorPipeline(nav, max_pending=8, max_batch=3)
+    for robot_pos, readings in make_scans(4):
+        pipeline.submit(readings, robot_pos)
+    pipeline.drain()
+    assert pipeline.stats()['applied'] == 4 and pipeline.stats()['batches'] == 2
+    pipeline.submit(*make_scans(1, seed=1)[0][::-1])
+    pipeline.flush()  # İşçi yok: bloklamadan bu iş parçacığında işlenir
+    assert pipeline.stats()['applied'] == 5 and pipeline.queue.unfinished_tasks == 0
+
+
+def test_submit_after_stop_is_rejected():
+    pipeline = SensorPipeline(new_nav())
+    pipeline.start()
+    robot_pos, readings = make_scans(1)[0]
+    pipeline.submit(readings, robot_pos)
+    pipeline.stop()
+    assert pipeline.worker is None and pipeline.stats()['applied'] == 1
+    with pytest.raises(RuntimeError):
+        pipeline.submit(readings, robot_pos)
+    pipeline.flush()
+    # Yeniden başlatılınca tekrar kabul eder
+    pipeline.start()
+    assert pipeline.submit(readings, robot_pos)
+    pipeline.stop()
+    assert pipeline.stats()['applied'] == 2
+
+
+def test_wrong_reading_count():
+    with pytest.raises(ValueError):
+        SensorPipeline(new_nav()).submit([1.0] * 5, (5.0, 5.0))
@@ -0,0 +1,35 @@
+import math
+import pytest
+from graph_store import NodeView
+from topological_mapping import HybridMap, TopologicalNode
+
+
+def test_topological_node_old_constructor():
+    node = TopologicalNode(1.0, 2.0, 0)
+    assert isinstance(node, NodeView)
+    assert (node.x, node.y, node.id) == (1.0, 2.0, 0)
+    assert node.connections == [] and node.get_connections() == []
+    node.add_connection(3, 1.5)
+    node.add_connection(7, 2.5)
+    node.add_connection(3, 1.5)  # Var olan bağlantı tekrar eklenmez
+    assert node.connections == [(3, 1.5), (7, 2.5)]
+    assert node.get_connections() == node.connections
+    assert node.connected_ids == {3, 7}
+
+
+def test_topological_node_with_later_id():
+    node = TopologicalNode(4.0, 5.0, 6)
+    assert (node.x, node.y, node.id) == (4.0, 5.0, 6)
+    node.add_connection(2, math.sqrt(2))
+    assert node.get_connections() == [(2, math.sqrt(2))]
+
+
+def test_topological_node_in_map_graph():
+    hybrid_map = HybridMap(10.0, 10.0, 0.5)
+    first_id = hybrid_map.add_node(1.0, 1.0)
+    node = TopologicalNode(8.0, 8.0, hybrid_map.next_node_id, hybrid_map.graph)
+    node.add_connection(first_id, 9.9)
+    assert hybrid_map.nodes[node.id].x == 8.0
+    assert hybrid_map.nodes[node.id].connections == [(first_id, 9.9)]
+    with pytest.raises(ValueError):
+        TopologicalNode(0.0, 0.0, first_id, hybrid_map.graph)
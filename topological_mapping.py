@@ -1,90 +1,191 @@
-import math
+import time
+import numpy as np
 from occupancy_grid import OccupancyGrid
+from spatial_index import SpatialHashGrid
+from graph_store import GraphStore, NodeMapping, NodeView
 
-# Topolojik haritalama için node sınıfı (Niijima vd. [14])
-class TopologicalNode:
-    def __init__(self, x, y, node_id):
-        self.x = x
-        self.y = y
-        self.id = node_id
-        self.connections = []  # Bağlantılı node ID'leri ve aralarındaki mesafeler
-    
-    def add_connection(self, target_id, distance):
-        # Başka bir nodee bağlantı ekle
-        # Bağlantı zaten varsa, tekrar eklemeyi önle
-        for conn_id, _ in self.connections:
-            if conn_id == target_id:
-                return
-        
-        self.connections.append((target_id, distance))
-    
-    def get_connections(self):
-        # Bağlantılı nodelerin listesini döndür
-        return self.connections
+# Topolojik haritalama için node (Niijima vd. [14]); eski (x, y, node_id) kurucusu
+# Node graph'ta (verilmezse node'a ait yeni bir GraphStore'da) ayrılır ve bir NodeView'dur:
+# x, y, id, connections, add_connection, get_connections eskisi gibi çalışır.
+# ID'ler ardışık olduğundan node_id graph'ın sıradaki ID'si olmalı; node'a ait GraphStore'da
+# önceki ID'ler bağlantısız yer tutuculardır. Haritaya node eklemek için HybridMap.add_node.
+class TopologicalNode(NodeView):
+    __slots__ = ()
+
+    def __init__(self, x, y, node_id, graph=None):
+        if graph is None:
+            graph = GraphStore()
+            while graph.num_nodes < node_id:
+                graph.add_node(float('nan'), float('nan'))
+        if node_id != graph.num_nodes:
+            raise ValueError(f"Node ID grafın sıradaki ID'si olmalı: {node_id} (beklenen {graph.num_nodes})")
+        graph.add_node(x, y)
+        super().__init__(graph, node_id)
 
 
 # Niijima vd. [14] tarafından önerilen Hibrit Grid-Topolojik haritalama
 # Detaylı occupancy grid'i yüksek seviyeli topolojik grafik ile birleştirir
 class HybridMap:
-    def __init__(self, width, height, resolution=0.1):
-        self.occupancy_grid = OccupancyGrid(width, height, resolution)
-        self.nodes = {}  # Topolojik nodeler
-        self.next_node_id = 0
+    def __init__(self, width, height, resolution=0.1, storage='probability', storage_options=None):
+        self.occupancy_grid = OccupancyGrid(width, height, resolution, storage, storage_options)
+        # Topolojik graf: koordinat dizileri ve kenar uzunluklarıyla birlikte komşuluk
+        self.graph = GraphStore()
+        self.nodes = NodeMapping(self.graph)  # Node ID -> NodeView (salt okunur)
+        
+        # Node konumları için uzamsal indeks (en yakın node ve komşu sorguları)
+        self.link_distance = 2.0  # Bu mesafeden yakın nodeler otomatik bağlanır
+        self.node_index = SpatialHashGrid(cell_size=self.link_distance)
+        
+        # Geçici olarak engellenmiş kenarlar (küçük ID, büyük ID) ve nodeler
+        self.blocked_edges = set()
+        self.blocked_nodes = set()
+        
+        # Kenar değişikliklerinden haberdar edilecek nesneler (ör. artımlı planlayıcılar)
+        # Her dinleyici on_edges_changed([(node1_id, node2_id), ...]) metoduna sahip olmalı
+        self.listeners = []
+        
+        # İsteğe bağlı kenar çakışma kontrolü: edge_checker(x0, y0, x1, y1) -> engelsiz maskesi
+        # (vektörel). None iken yakın nodeler kontrolsüz bağlanır; verilirse (ör. RoadmapBuilder)
+        # add_node/add_nodes/connect_nodes sadece engelsiz kenarları ekler
+        self.edge_checker = None
+        
+        # İsteğe bağlı ölçüm katmanı (bkz. instrumentation.py)
+        self.instrumentation = None
+    
+    @property
+    def next_node_id(self):
+        # Node ID'leri ardışık olduğundan sıradaki ID node sayısıdır
+        return self.graph.num_nodes
+    
+    def add_listener(self, listener):
+        # Kenar eklenmesi/engellenmesi bildirimlerini alacak nesneyi kaydet
+        self.listeners.append(listener)
+    
+    def _notify_edges_changed(self, edges):
+        if edges:
+            for listener in self.listeners:
+                listener.on_edges_changed(edges)
     
     def add_node(self, x, y):
         # Verilen koordinatlarda yeni bir topolojik node ekle
-        node = TopologicalNode(x, y, self.next_node_id)
-        self.nodes[self.next_node_id] = node
-        
         # Yakında olan mevcut nodelerle bağlantı kurmaya çalış
         # Bu, grafın daha bağlantılı olmasını ve daha fazla yol seçeneği olmasını sağlar
-        for node_id, other_node in self.nodes.items():
-            if node_id == self.next_node_id:
-                continue  # Kendisiyle bağlantı kurma
-                
-            # nodeler arasındaki mesafeyi hesapla
-            dist = math.sqrt((node.x - other_node.x)**2 + (node.y - other_node.y)**2)
-            
-            # Eşik değeri içindeyse bağla (uyarlanabilir olabilir)
-            if dist < 2.0:  # 2 metre içindeki nodeleri bağla
-                node.add_connection(node_id, dist)
-                other_node.add_connection(self.next_node_id, dist)
+        # Eşik değeri içindeki nodeler uzamsal indeksten alınır (2 metre içindeki nodeler)
+        return self.add_nodes((x,), (y,))[0]
+    
+    def add_nodes(self, xs, ys):
+        # Birden çok node'u ekle ve yakın nodelere bağla; yeni ID'lerin listesini döndür
+        # Aday kenarlar önce toplanır, edge_checker varsa tek bir vektörel çağrıyla elenir
+        new_ids = []
+        candidates = []  # (mevcut node, yeni node, mesafe)
+        for x, y in zip(xs, ys):
+            x, y = float(x), float(y)
+            node_id = self.graph.add_node(x, y)
+            for other_id, dist in self.node_index.within_radius(x, y, self.link_distance):
+                candidates.append((other_id, node_id, dist))
+            self.node_index.insert(node_id, x, y)
+            new_ids.append(node_id)
+        
+        rejected = 0
+        if candidates and self.edge_checker is not None:
+            free = self._edges_free([(node1_id, node2_id) for node1_id, node2_id, _ in candidates])
+            rejected = len(candidates) - int(free.sum())
+            candidates = [candidate for candidate, is_free in zip(candidates, free) if is_free]
+        
+        # Yeni node'ların henüz bağlantısı yok, tekrar kontrolüne gerek yok
+        for other_id, node_id, dist in candidates:
+            self.graph.add_edge(node_id, other_id, dist, check=False)
+        new_edges = [(other_id, node_id) for other_id, node_id, _ in candidates]
         
-        # node sayacını artır ve ID'yi döndür
-        current_id = self.next_node_id
-        self.next_node_id += 1
-        return current_id
+        if self.instrumentation is not None:
+            self.instrumentation.count('map.nodes_added', len(new_ids))
+            self.instrumentation.count('map.edges_added', len(new_edges))
+            if rejected:
+                self.instrumentation.count('map.edges_rejected', rejected)
+        self._notify_edges_changed(new_edges)
+        return new_ids
+    
+    def _edges_free(self, edges):
+        # (node1_id, node2_id) kenarlarının edge_checker ile engelsiz maskesi
+        xs, ys = self.graph.xs, self.graph.ys
+        coords = np.array([(xs[node1_id], ys[node1_id], xs[node2_id], ys[node2_id])
+                           for node1_id, node2_id in edges], dtype=float).reshape(-1, 4)
+        return np.asarray(self.edge_checker(coords[:, 0], coords[:, 1], coords[:, 2], coords[:, 3]),
+                          dtype=bool)
     
     def connect_nodes(self, node1_id, node2_id):
         # Topolojik grafikteki iki nodeü birbirine bağla
+        # edge_checker varsa ve aradaki doğru parçası engelliyse bağlanmaz (False)
         if node1_id not in self.nodes or node2_id not in self.nodes:
             return False
+        if self.edge_checker is not None and not self.graph.has_arc(node1_id, node2_id) and \
+                not self._edges_free([(node1_id, node2_id)])[0]:
+            return False
         
-        node1 = self.nodes[node1_id]
-        node2 = self.nodes[node2_id]
-        
-        # nodeler arasındaki Öklid mesafesini hesapla
-        distance = math.sqrt((node1.x - node2.x)**2 + (node1.y - node2.y)**2)
-        
-        # Çift yönlü bağlantı ekle
-        node1.add_connection(node2_id, distance)
-        node2.add_connection(node1_id, distance)
+        # Çift yönlü bağlantı ekle (mesafe node koordinatlarından hesaplanır)
+        if self.graph.add_edge(node1_id, node2_id):
+            self._notify_edges_changed([(node1_id, node2_id)])
+        return True
+    
+    def set_edge_blocked(self, node1_id, node2_id, blocked=True):
+        # Bir kenarı engelle veya engeli kaldır (ör. yol üzerinde engel algılandığında)
+        edge = (min(node1_id, node2_id), max(node1_id, node2_id))
+        if blocked == (edge in self.blocked_edges):
+            return False
+        if blocked:
+            self.blocked_edges.add(edge)
+        else:
+            self.blocked_edges.discard(edge)
+        self._notify_edges_changed([edge])
+        return True
+    
+    def set_node_blocked(self, node_id, blocked=True):
+        # Bir node'u (ve dolayısıyla tüm kenarlarını) engelle veya engeli kaldır
+        if node_id not in self.nodes or blocked == (node_id in self.blocked_nodes):
+            return False
+        if blocked:
+            self.blocked_nodes.add(node_id)
+        else:
+            self.blocked_nodes.discard(node_id)
+        self._notify_edges_changed([(node_id, other_id)
+                                    for other_id in self.graph.neighbors(node_id)[0]])
         return True
     
-    def update_grid(self, robot_pos, sensor_readings):
+    def is_edge_blocked(self, node1_id, node2_id):
+        # Kenar kendisi veya uç nodelerinden biri engellendiyse True
+        return (node1_id in self.blocked_nodes or node2_id in self.blocked_nodes or
+                (min(node1_id, node2_id), max(node1_id, node2_id)) in self.blocked_edges)
+    
+    def edge_cost(self, node1_id, node2_id, distance):
+        # Kenarın geçiş maliyeti - engellenmiş kenarlar için sonsuz
+        if self.blocked_nodes and (node1_id in self.blocked_nodes or node2_id in self.blocked_nodes):
+            return float('inf')
+        if self.blocked_edges:
+            edge = (node1_id, node2_id) if node1_id < node2_id else (node2_id, node1_id)
+            if edge in self.blocked_edges:
+                return float('inf')
+        return distance
+    
+    def update_grid(self, robot_pos, sensor_readings, extra_updates=None):
         # Sensör okumalarına göre occupancy grid'i güncelle
-        self.occupancy_grid.update_from_sensor_data(robot_pos, sensor_readings)
+        # extra_updates (ör. hareketli engel işaretleri) aynı toplu güncellemeye eklenir
+        self.occupancy_grid.update_from_sensor_data(robot_pos, sensor_readings, extra_updates)
         self.occupancy_grid.apply_time_decay()
     
     def find_nearest_node(self, x, y):
         # Verilen koordinatlara en yakın topolojik nodeü bul
-        nearest_id = None
-        min_distance = float('inf')
-        
-        for node_id, node in self.nodes.items():
-            distance = math.sqrt((node.x - x)**2 + (node.y - y)**2)
-            if distance < min_distance:
-                min_distance = distance
-                nearest_id = node_id
-        
-        return nearest_id, min_distance
\ No newline at end of file
+        # Node yoksa (None, inf) döner
+        if self.instrumentation is None:
+            return self.node_index.nearest(x, y)
+        begin = time.perf_counter()
+        result = self.node_index.nearest(x, y)
+        self.instrumentation.record('map.find_nearest_node', time.perf_counter() - begin)
+        return result
+    
+    def find_nodes_within(self, x, y, radius):
+        # Yarıçap içindeki nodelerin (ID, mesafe) listesi
+        return self.node_index.within_radius(x, y, radius)
+    
+    def find_k_nearest_nodes(self, x, y, k):
+        # En yakın k node'un artan mesafeye göre (ID, mesafe) listesi
+        return self.node_index.k_nearest(x, y, k)